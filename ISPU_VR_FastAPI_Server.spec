@@ -1,7 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+from src.templating import compile_templates
+
 block_cipher = None
 
+# Шаблоны компилируются в байткод при сборке, станция не компилирует их при открытии страниц.
+# UPX выключен: сжатые библиотеки распаковываются при каждом запуске и замедляют старт станции
+compile_templates(os.path.join(SPECPATH, 'src', 'templates'), os.path.join(SPECPATH, 'build', 'compiled_templates'))
+
 a = Analysis(
     ['src/main.py'],
     pathex=['.'],
@@ -11,6 +21,7 @@ a = Analysis(
         ('src/static/img', 'static/img'),
         ('src/static', 'static'),
         ('src/templates', 'src/templates'),
+        ('build/compiled_templates', 'src/compiled_templates'),
     ],
     hiddenimports=[
         'argon2_cffi',
@@ -26,6 +37,8 @@ a = Analysis(
         'PyYAML',
         'SQLAlchemy',
         'aiomysql',
+        'aiosqlite',
+        'sqlalchemy.dialects.sqlite.aiosqlite',
         'altgraph',
         'annotated_types',
         'anyio',
@@ -89,7 +102,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     console=True,
     disable_windowed_traceback=False,
     target_arch=None,
@@ -102,7 +115,7 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     name='ISPU_VR_FastAPI_Server'
 )
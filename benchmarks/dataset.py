@@ -0,0 +1,340 @@
+"""
+Генератор синтетических данных масштаба станции для нагрузочных тестов.
+
+    python -m benchmarks.dataset --users 50000 --sensors 20000 --models 2000 \\
+        --locations 500 --scenarios 5000 --admissions 1000000 --skew 1.1 --truncate
+
+Заполняет таблицы из src/sensor/models.py и src/auth/models.py в базе из переменных DB_*.
+Идентификаторы назначаются здесь же (продолжая MAX(id)), поэтому связи строятся без чтения
+вставленных строк, а строки пишутся многострочными INSERT по CHUNK_SIZE штук на одном
+соединении с отключенными проверками внешних ключей и уникальности. Популярность моделей,
+приборов, сценариев и активность пользователей распределены по Ципфу с показателем --skew.
+После загрузки пересчитываются итоги (user/scenario_training_stats) и статистика таблиц.
+
+Все пользователи получают пароль BENCH_PASSWORD, хэш считается один раз.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from random import Random
+from typing import Iterable, Iterator, Sequence
+
+import orjson
+from fastapi_users.password import PasswordHelper
+
+from benchmarks.fixture import BENCH_PASSWORD
+from src.database import engine
+
+CHUNK_SIZE = 5000
+
+MODEL_TYPE_NAMES = ("Датчик давления", "Датчик температуры", "Расходомер", "Уровнемер", "Задвижка",
+                    "Регулирующий клапан", "Насос", "Вентилятор", "Термопара", "Манометр")
+PARAMETERS = ("pressure", "temperature", "flow", "level", "position", "current", "voltage", "speed",
+              "vibration", "density")
+MEASUREMENTS = ("МПа", "°C", "м3/ч", "мм", "%", "А", "В", "об/мин", "мм/с", "кг/м3")
+ACCIDENT_NAMES = ("Обрыв линии", "Дрейф нуля", "Залипание", "Утечка", "Перегрев", "Заклинивание",
+                  "Короткое замыкание", "Потеря питания", "Засорение", "Износ уплотнения")
+# Системы и оборудование для кодов ККС вида 10LAB12CP001
+KKS_SYSTEMS = ("LAB", "LAC", "LBA", "LCA", "PAB", "QFA", "RHA", "JEA", "KBA", "UJA")
+KKS_EQUIPMENT = ("CP", "CT", "CF", "CL", "AA", "AP", "AN", "CG")
+FIRST_NAMES = ("Александр", "Дмитрий", "Максим", "Сергей", "Андрей", "Алексей", "Иван", "Елена", "Ольга",
+               "Наталья", "Анна", "Мария")
+LAST_NAMES = ("Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов",
+              "Новиков", "Федоров", "Морозов", "Волков")
+DIVISIONS = ("РЦ-1", "РЦ-2", "ТЦ", "ЭЦ", "ЦТАИ", "ХЦ", "ОРБ", "УТП")
+
+# Доли статусов задач: завершено, активно, проверяется, не активно
+ADMISSION_STATUSES = (("COMPLETED", 60), ("ACTIVE", 25), ("EXAMINATION", 10), ("INACTIVE", 5))
+LOCATION_STATUSES = (("COMPLETED", 80), ("DEVELOPING", 15), ("INACTIVE", 5))
+
+
+class Sampler:
+    """Выбор идентификаторов с перекосом по Ципфу: вес ранга r равен 1 / r**skew, ранги перемешаны."""
+
+    def __init__(self, ids: Sequence[int], skew: float, rng: Random):
+        self.ids = list(ids)
+        weights = [1 / rank ** skew for rank in range(1, len(self.ids) + 1)]
+        rng.shuffle(weights)
+        self.weights = weights
+        self.cum_weights = list(accumulate(weights))
+        self.rng = rng
+
+    def one(self) -> int:
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights)[0]
+
+    def distinct(self, k: int) -> list[int]:
+        k = min(k, len(self.ids))
+        if k * 10 >= len(self.ids):
+            # Почти все значения: выборка с весами без повторов сходилась бы слишком долго
+            return self.rng.sample(self.ids, k)
+        chosen: dict[int, None] = {}
+        while len(chosen) < k:
+            for item in self.rng.choices(self.ids, cum_weights=self.cum_weights, k=k - len(chosen)):
+                chosen[item] = None
+        return list(chosen)
+
+
+def distribute(total: int, weights: Sequence[float], cap: int) -> list[int]:
+    """Делит total пропорционально весам, не больше cap на каждого; излишек достается остальным."""
+    counts = [0.0] * len(weights)
+    remaining = float(total)
+    open_indexes = [index for index in range(len(weights)) if weights[index] > 0]
+    while remaining > 0.5 and open_indexes:
+        scale = remaining / sum(weights[index] for index in open_indexes)
+        still_open = []
+        for index in open_indexes:
+            share = min(weights[index] * scale, cap - counts[index])
+            counts[index] += share
+            remaining -= share
+            if counts[index] < cap:
+                still_open.append(index)
+        if len(still_open) == len(open_indexes):
+            break
+        open_indexes = still_open
+    # Округление с переносом дробной части, чтобы сумма совпала с total
+    result, carry, assigned = [], 0.0, 0
+    for count in counts:
+        carry += count
+        value = int(carry + 0.5) - assigned
+        result.append(value)
+        assigned += value
+    return result
+
+
+def weighted(values: Sequence[tuple[str, int]], rng: Random) -> str:
+    return rng.choices([value for value, _ in values], weights=[weight for _, weight in values])[0]
+
+
+def chunks(rows: Iterable[tuple], size: int = CHUNK_SIZE) -> Iterator[list[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Loader:
+    def __init__(self, connection):
+        self.connection = connection
+        self.counts: dict[str, int] = {}
+
+    async def next_id(self, table: str) -> int:
+        result = await self.connection.exec_driver_sql(f"SELECT COALESCE(MAX(id), 0) + 1 FROM `{table}`")
+        return int(result.scalar())
+
+    async def insert(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        # Без ORM и обработки параметров SQLAlchemy: драйвер сам собирает многострочный INSERT
+        sql = (f"INSERT INTO `{table}` ({', '.join(f'`{column}`' for column in columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        start = time.perf_counter()
+        total = 0
+        for chunk in chunks(rows):
+            await self.connection.exec_driver_sql(sql, chunk)
+            total += len(chunk)
+        self.counts[table] = self.counts.get(table, 0) + total
+        print(f"{table:<32}{total:>10} строк за {time.perf_counter() - start:.1f} с")
+        return total
+
+
+def json(value) -> str:
+    return orjson.dumps(value).decode()
+
+
+def kks_code(index: int) -> str:
+    unit, rest = divmod(index, len(KKS_SYSTEMS) * 100 * len(KKS_EQUIPMENT) * 1000)
+    system, rest = divmod(rest, 100 * len(KKS_EQUIPMENT) * 1000)
+    group, rest = divmod(rest, len(KKS_EQUIPMENT) * 1000)
+    equipment, number = divmod(rest, 1000)
+    return f"{10 + unit:02d}{KKS_SYSTEMS[system]}{group:02d}{KKS_EQUIPMENT[equipment]}{number:03d}"
+
+
+async def generate(args) -> None:
+    rng = Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    async with engine.connect() as connection:
+        await connection.exec_driver_sql("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        loader = Loader(connection)
+        if args.truncate:
+            for table in ("telemetry_event", "user_training_stats", "scenario_training_stats", "admission",
+                          "scenario_accident_association", "scenario", "sensor_location_association", "location",
+                          "sensor", "model_accident_association", "accident", "model", "model_type",
+                          "model_value", "user"):
+                await connection.exec_driver_sql(f"TRUNCATE TABLE `{table}`")
+        started = time.perf_counter()
+
+        # Типы моделей и справочник параметров
+        first = await loader.next_id("model_type")
+        model_type_ids = list(range(first, first + args.model_types))
+        await loader.insert("model_type", ("id", "name"), (
+            (type_id, f"{MODEL_TYPE_NAMES[index % len(MODEL_TYPE_NAMES)]} {index // len(MODEL_TYPE_NAMES) + 1}")
+            for index, type_id in enumerate(model_type_ids)
+        ))
+        await loader.insert("model_value", ("model_type", "field", "name_eng_param", "value", "measurement"), (
+            (f"bench-{type_id}", parameter, parameter, str(rng.randint(1, 100)), MEASUREMENTS[index])
+            for type_id in model_type_ids for index, parameter in enumerate(PARAMETERS[:rng.randint(2, 6)])
+        ))
+
+        # Ошибки и модели, у каждой модели 2-6 ошибок
+        first = await loader.next_id("accident")
+        accident_ids = list(range(first, first + args.accidents))
+        await loader.insert("accident", ("id", "name", "mechanical_accident", "change_value", "param_mapping_names"), (
+            (accident_id, f"{ACCIDENT_NAMES[index % len(ACCIDENT_NAMES)]} {index + 1}", rng.random() < 0.3,
+             json({"p1": rng.randint(0, 100)}), json({"p1": rng.choice(PARAMETERS)}))
+            for index, accident_id in enumerate(accident_ids)
+        ))
+        type_sampler = Sampler(model_type_ids, args.skew, rng)
+        first = await loader.next_id("model")
+        model_ids = list(range(first, first + args.models))
+        model_accidents: dict[int, list[int]] = {}
+
+        def model_rows():
+            for model_id in model_ids:
+                parameters = rng.sample(PARAMETERS, rng.randint(2, 6))
+                specification = {f"p{index}": str(rng.randint(1, 500)) for index in range(len(parameters))}
+                mapping = {f"p{index}": parameter for index, parameter in enumerate(parameters)}
+                model_accidents[model_id] = rng.sample(accident_ids, min(rng.randint(2, 6), len(accident_ids)))
+                yield model_id, json(specification), json(mapping), type_sampler.one()
+
+        await loader.insert("model", ("id", "specification", "param_mapping_names", "model_type_id"), model_rows())
+        await loader.insert("model_accident_association", ("model_id", "accident_id"), (
+            (model_id, accident_id) for model_id, accidents in model_accidents.items() for accident_id in accidents
+        ))
+
+        # Приборы КИП с уникальными кодами ККС, модели популярны неравномерно
+        model_sampler = Sampler(model_ids, args.skew, rng)
+        first = await loader.next_id("sensor")
+        sensor_ids = list(range(first, first + args.sensors))
+        sensor_models: dict[int, int] = {}
+
+        def sensor_rows():
+            for sensor_id in sensor_ids:
+                kks = kks_code(sensor_id)
+                model_id = sensor_models[sensor_id] = model_sampler.one()
+                yield sensor_id, kks, f"Прибор {kks}", model_id
+
+        await loader.insert("sensor", ("id", "KKS", "name", "model_id"), sensor_rows())
+
+        # Локации по 10-80 приборов
+        first = await loader.next_id("location")
+        location_ids = list(range(first, first + args.locations))
+        location_sensors = {location_id: rng.sample(sensor_ids, min(rng.randint(10, 80), len(sensor_ids)))
+                            for location_id in location_ids}
+        await loader.insert("location", ("id", "status", "name", "prefab"), (
+            (location_id, weighted(LOCATION_STATUSES, rng), f"Помещение {location_id}",
+             f"Prefabs/Locations/Room{location_id}")
+            for location_id in location_ids
+        ))
+        await loader.insert("sensor_location_association", ("sensor_id", "location_id"), (
+            (sensor_id, location_id) for location_id, sensors in location_sensors.items() for sensor_id in sensors
+        ))
+
+        # Сценарии: прибор из выбранной локации, 1-3 ошибки его модели
+        location_sampler = Sampler(location_ids, args.skew, rng)
+        first = await loader.next_id("scenario")
+        scenario_ids = list(range(first, first + args.scenarios))
+        scenario_accidents: dict[int, list[int]] = {}
+
+        def scenario_rows():
+            for scenario_id in scenario_ids:
+                location_id = location_sampler.one()
+                sensor_id = rng.choice(location_sensors[location_id])
+                accidents = model_accidents[sensor_models[sensor_id]]
+                scenario_accidents[scenario_id] = rng.sample(accidents, min(rng.randint(1, 3), len(accidents)))
+                yield scenario_id, f"Сценарий {scenario_id}", sensor_id, location_id
+
+        await loader.insert("scenario", ("id", "name", "sensor_id", "location_id"), scenario_rows())
+        await loader.insert("scenario_accident_association", ("scenario_id", "accident_id"), (
+            (scenario_id, accident_id)
+            for scenario_id, accidents in scenario_accidents.items() for accident_id in accidents
+        ))
+
+        # Пользователи, около 1% - сотрудники
+        hashed_password = PasswordHelper().hash(BENCH_PASSWORD)
+        first = await loader.next_id("user")
+        user_ids = list(range(first, first + args.users))
+        division_sampler = Sampler(range(len(DIVISIONS)), args.skew, rng)
+        await loader.insert("user", (
+            "id", "email", "username", "registered_at", "first_name", "last_name", "is_staff", "hashed_password",
+            "is_active", "is_superuser", "is_verified", "division",
+        ), (
+            (user_id, f"user{user_id}@bench.local", f"user{user_id}", now - timedelta(days=rng.randint(0, 1500)),
+             rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.random() < 0.01, hashed_password,
+             True, False, True, DIVISIONS[division_sampler.one()])
+            for user_id in user_ids
+        ))
+
+        # Задачи: активность пользователей и популярность сценариев по Ципфу, без повторов пары
+        await loader.insert("admission", (
+            "id", "user_id", "scenario_id", "status", "rating", "is_ready", "assigned_at",
+        ), admission_rows(await loader.next_id("admission"), user_ids, scenario_ids, args, rng, now))
+
+        print("Пересчет итогов и статистики таблиц...")
+        await rebuild_stats(connection)
+        for table in loader.counts:
+            await connection.exec_driver_sql(f"ANALYZE TABLE `{table}`")
+        await connection.exec_driver_sql("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        await connection.commit()
+    await engine.dispose()
+    print(f"Готово за {time.perf_counter() - started:.1f} с")
+
+
+def admission_rows(first_id: int, user_ids: list[int], scenario_ids: list[int], args, rng: Random,
+                   now: datetime) -> Iterator[tuple]:
+    scenario_sampler = Sampler(scenario_ids, args.skew, rng)
+    activity = [1 / rank ** args.skew for rank in range(1, len(user_ids) + 1)]
+    rng.shuffle(activity)
+    counts = distribute(args.admissions, activity, min(args.max_per_user, len(scenario_ids)))
+    admission_id = first_id
+    for user_id, count in zip(user_ids, counts):
+        for scenario_id in scenario_sampler.distinct(count):
+            status = weighted(ADMISSION_STATUSES, rng)
+            assigned_at = now - timedelta(seconds=rng.randint(3600, 365 * 86400))
+            rating, is_ready = None, None
+            if status == "COMPLETED":
+                rating = Decimal(rng.randint(10, 50)) / 10
+                is_ready = assigned_at + timedelta(seconds=rng.randint(300, 14 * 86400))
+            yield admission_id, user_id, scenario_id, status, rating, is_ready, assigned_at
+            admission_id += 1
+
+
+async def rebuild_stats(connection) -> None:
+    # Те же итоги, что копит src.stats.crud.record_result_change, но одним проходом по admission
+    for table, key in (("user_training_stats", "user_id"), ("scenario_training_stats", "scenario_id")):
+        await connection.exec_driver_sql(f"DELETE FROM `{table}`")
+        await connection.exec_driver_sql(
+            f"INSERT INTO `{table}` ({key}, completed_count, rated_count, rating_sum, average_rating, timed_count, "
+            f"completion_seconds, last_completed_at) "
+            f"SELECT {key}, COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0), AVG(rating), "
+            f"COUNT(CASE WHEN is_ready >= assigned_at THEN 1 END), "
+            f"COALESCE(SUM(CASE WHEN is_ready >= assigned_at "
+            f"THEN TIMESTAMPDIFF(SECOND, assigned_at, is_ready) END), 0), "
+            f"MAX(is_ready) "
+            f"FROM admission WHERE status = 'COMPLETED' GROUP BY {key}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетические данные для нагрузочных тестов")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--sensors", type=int, default=20000)
+    parser.add_argument("--models", type=int, default=2000)
+    parser.add_argument("--model-types", type=int, default=40)
+    parser.add_argument("--accidents", type=int, default=300)
+    parser.add_argument("--locations", type=int, default=500)
+    parser.add_argument("--scenarios", type=int, default=5000)
+    parser.add_argument("--admissions", type=int, default=1000000, help="Примерное общее число задач")
+    parser.add_argument("--max-per-user", type=int, default=500, help="Не больше задач на пользователя")
+    parser.add_argument("--skew", type=float, default=1.1, help="Показатель Ципфа, 0 - равномерно")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--truncate", action="store_true", help="Очистить таблицы перед загрузкой")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(generate(parse_args()))
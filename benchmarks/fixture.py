@@ -0,0 +1,114 @@
+"""
+Учетные записи и идентификаторы, по которым ходит нагрузочный тест.
+
+База берется из тех же переменных окружения DB_*, что и у сервера (.env). Это должна быть
+одноразовая локальная база с примененными миграциями (alembic upgrade head) и данными:
+локации с приборами и сценарии. Тестовые пользователи создаются здесь, если их еще нет,
+и получают задачи по всем сценариям.
+
+Прогон пишет в базу (результаты задач, итоги, телеметрия), поэтому перед каждым прогоном
+задачи тестового обучаемого возвращаются в исходное состояние (reset_trainee): следующий
+прогон начинается с тех же данных и сравним с базовой линией.
+"""
+import os
+from typing import NamedTuple
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import delete, select, update
+
+from src.admission.crud import assign_scenarios
+from src.auth.models import Admission, AdmissionStatus, Scenario, User
+from src.database import async_session_maker
+from src.sensor import sensor_location_association
+from src.stats.crud import NO_CONTRIBUTION, record_result_change, result_contribution
+from src.stats.models import UserTrainingStats
+from src.telemetry.models import TelemetryEvent
+
+BENCH_PASSWORD = os.environ.get("BENCH_PASSWORD", "bench-password")
+TRAINEE_USERNAME = os.environ.get("BENCH_TRAINEE", "bench_trainee")
+STAFF_USERNAME = os.environ.get("BENCH_STAFF", "bench_staff")
+# Сколько идентификаторов каждого вида брать в выборку для запросов
+SAMPLE_SIZE = 200
+
+
+class Fixture(NamedTuple):
+    trainee_username: str
+    staff_username: str
+    password: str
+    admission_ids: list[int]
+    scenario_ids: list[int]
+    # Пары (локация, прибор) для шагов мастера создания сценария
+    location_sensors: list[tuple[int, int]]
+
+
+async def ensure_user(session, username: str, is_staff: bool) -> int:
+    result = await session.execute(select(User.id).where(username == User.username))
+    user_id = result.scalar_one_or_none()
+    if user_id is not None:
+        return user_id
+    user = User(
+        username=username,
+        email=f"{username}@bench.local",
+        first_name="Bench",
+        last_name=username,
+        division="bench",
+        is_staff=is_staff,
+        is_superuser=is_staff,
+        is_active=True,
+        is_verified=True,
+        hashed_password=PasswordHelper().hash(BENCH_PASSWORD),
+    )
+    session.add(user)
+    await session.commit()
+    return user.id
+
+
+async def reset_trainee(session, user_id: int) -> None:
+    """Снимает все, что записали прошлые прогоны: результаты задач, их вклад в итоги и телеметрию."""
+    result = await session.execute(select(Admission).where(user_id == Admission.user_id))
+    admissions = result.scalars().all()
+    # Вклад в итоги сценариев общий с настоящими пользователями - вычитается по каждой задаче
+    for admission in admissions:
+        before = result_contribution(admission)
+        if before != NO_CONTRIBUTION:
+            await record_result_change(session=session, user_id=user_id, scenario_id=admission.scenario_id,
+                                       before=before, after=NO_CONTRIBUTION)
+    await session.execute(delete(UserTrainingStats).where(user_id == UserTrainingStats.user_id))
+    await session.execute(
+        update(Admission)
+        .where(user_id == Admission.user_id)
+        .values(status=AdmissionStatus.ACTIVE, rating=0, is_ready=None, result_key=None, result_seq=None)
+        .execution_options(synchronize_session=False)
+    )
+    admission_ids = [admission.id for admission in admissions]
+    if admission_ids:
+        await session.execute(delete(TelemetryEvent).where(TelemetryEvent.admission_id.in_(admission_ids)))
+    await session.commit()
+
+
+async def load_fixture() -> Fixture:
+    async with async_session_maker() as session:
+        trainee_id = await ensure_user(session, TRAINEE_USERNAME, is_staff=False)
+        await ensure_user(session, STAFF_USERNAME, is_staff=True)
+        await reset_trainee(session, trainee_id)
+
+        result = await session.execute(select(Scenario.id).order_by(Scenario.id).limit(SAMPLE_SIZE))
+        scenario_ids = list(result.scalars().all())
+        await assign_scenarios(session=session, user_ids=[trainee_id], scenario_ids=scenario_ids)
+
+        result = await session.execute(
+            select(Admission.id).where(trainee_id == Admission.user_id).order_by(Admission.id).limit(SAMPLE_SIZE)
+        )
+        admission_ids = list(result.scalars().all())
+
+        result = await session.execute(
+            select(sensor_location_association.c.location_id, sensor_location_association.c.sensor_id)
+            .order_by(sensor_location_association.c.location_id)
+            .limit(SAMPLE_SIZE)
+        )
+        location_sensors = [(location_id, sensor_id) for location_id, sensor_id in result]
+
+    if not admission_ids or not location_sensors:
+        raise SystemExit("В базе нет сценариев или локаций с приборами - сначала заполните ее данными")
+    return Fixture(TRAINEE_USERNAME, STAFF_USERNAME, BENCH_PASSWORD, admission_ids, scenario_ids,
+                   location_sensors)
@@ -0,0 +1,197 @@
+"""
+Нагрузочный тест сервера.
+
+Запуск из корня проекта, база - одноразовая локальная MySQL из переменных DB_* (.env):
+
+    alembic upgrade head
+    python -m benchmarks.load_test --mix mixed --concurrency 20 --duration 60
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/baseline.json
+
+Без --base-url сервер (app из src/main.py) запускается отдельным процессом uvicorn на свободном
+порту с тем же окружением и останавливается после прогона. Данные тестового обучаемого
+сбрасываются до запуска сервера, поэтому каждый прогон начинается с одинаковой базы и холодных
+кэшей; с --base-url кэши уже запущенного сервера остаются от прошлых прогонов. Число запросов
+к БД на запрос берется из заголовка Server-Timing. С --compare код выхода 1, если есть регрессии.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import orjson
+
+from benchmarks.fixture import Fixture, load_fixture
+from benchmarks.mixes import MIXES, USERS, Operation
+from benchmarks.report import OperationSamples, summarize, format_report, compare
+
+READY_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen | None) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise SystemExit(f"Сервер завершился с кодом {server.returncode}")
+            try:
+                await client.get(f"{USERS}/login/user")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise SystemExit("Сервер не ответил за отведенное время")
+
+
+async def login(base_url: str, username: str, password: str) -> httpx.AsyncClient:
+    client = httpx.AsyncClient(base_url=base_url, timeout=30)
+    response = await client.post(f"{USERS}/login/user", data={"username": username, "password": password})
+    if "user-cookie" not in response.cookies:
+        await client.aclose()
+        raise SystemExit(f"Не удалось войти как {username}: {response.status_code}")
+    return client
+
+
+async def worker(clients: dict[str, httpx.AsyncClient], operations: tuple[Operation, ...], fixture: Fixture,
+                 samples: dict[str, OperationSamples], rng: random.Random, deadline: float) -> None:
+    weights = [operation.weight for operation in operations]
+    while time.monotonic() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        request = operation.build(fixture, rng)
+        start = time.perf_counter()
+        try:
+            response = await clients[operation.role].request(**request)
+            status_code, server_timing = response.status_code, response.headers.get("server-timing")
+        except httpx.HTTPError:
+            status_code, server_timing = None, None
+        samples[operation.name].record(time.perf_counter() - start, status_code, server_timing)
+
+
+async def run(args) -> dict:
+    server = None
+    base_url = args.base_url
+    fixture = await load_fixture()
+    if base_url is None:
+        port = free_port()
+        server = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(base_url, server)
+        operations = MIXES[args.mix]
+        samples = {operation.name: OperationSamples() for operation in operations}
+
+        clients_per_worker = []
+        for _ in range(args.concurrency):
+            clients = {
+                "anonymous": httpx.AsyncClient(base_url=base_url, timeout=30),
+                "unity": httpx.AsyncClient(base_url=base_url, timeout=30),
+            }
+            roles = {operation.role for operation in operations}
+            if "trainee" in roles:
+                clients["trainee"] = await login(base_url, fixture.trainee_username, fixture.password)
+            if "staff" in roles:
+                clients["staff"] = await login(base_url, fixture.staff_username, fixture.password)
+            clients_per_worker.append(clients)
+
+        # Прогрев: кэши сценариев, пользователей и пул соединений
+        warmup_deadline = time.monotonic() + args.warmup
+        warmup_samples = {operation.name: OperationSamples() for operation in operations}
+        await asyncio.gather(*(
+            worker(clients, operations, fixture, warmup_samples, random.Random(args.seed + index), warmup_deadline)
+            for index, clients in enumerate(clients_per_worker)
+        ))
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(clients, operations, fixture, samples, random.Random(args.seed + index), deadline)
+            for index, clients in enumerate(clients_per_worker)
+        ))
+        elapsed = time.monotonic() - started
+
+        for clients in clients_per_worker:
+            for client in clients.values():
+                await client.aclose()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+
+    summary = summarize(samples, elapsed)
+    summary["meta"] = {
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "commit": git_commit(),
+    }
+    return summary
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест ISPU VR сервера")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=10, help="Число одновременных виртуальных клиентов")
+    parser.add_argument("--duration", type=float, default=30, help="Длительность замера, сек")
+    parser.add_argument("--warmup", type=float, default=5, help="Прогрев перед замером, сек")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="Уже запущенный сервер вместо запуска своего")
+    parser.add_argument("--output", help="Записать сводку в JSON")
+    parser.add_argument("--save-baseline", help="Записать сводку как базовую линию")
+    parser.add_argument("--compare", help="Сравнить с базовой линией")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимый рост p95 (доля)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    summary = asyncio.run(run(args))
+    print(format_report(summary))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "wb") as file:
+                file.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+
+    if args.compare:
+        with open(args.compare, "rb") as file:
+            baseline = orjson.loads(file.read())
+        regressions = compare(summary, baseline, args.threshold)
+        base_commit = baseline.get("meta", {}).get("commit")
+        if regressions:
+            print(f"\nРегрессии относительно {base_commit}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nРегрессий относительно {base_commit} нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Микро-бенчмарки чистого Python без базы данных: сборка данных сценария для VR клиента,
+переименование параметров по param_mapping_names, кодирование JSON и разбор справочника
+параметров моделей.
+
+    python -m benchmarks.micro --sensors 80 --accidents 6 --params 8 --types 200 --fields 10
+    python -m benchmarks.micro --record          # дописать результат в историю
+
+Объекты моделей строятся в памяти (без сессии) нужного размера. Каждый замер - лучшее и
+медианное время одного вызова из нескольких повторов. Результат сравнивается с последней
+записью истории с теми же размерами, --record дописывает текущий прогон в историю.
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import timeit
+from datetime import datetime
+from random import Random
+from typing import Callable
+
+# Соединение с БД не открывается, но URL движка собирается при импорте src.database
+for name, value in (("DB_HOST", "localhost"), ("DB_PORT", "3306"), ("DB_USER", "bench"), ("DB_PASS", "bench"),
+                    ("DB_NAME", "bench")):
+    os.environ.setdefault(name, value)
+
+import orjson  # noqa: E402
+
+from src.auth.models import Admission, Scenario  # noqa: E402
+from src.launcher.handoff import render_handoff_message  # noqa: E402
+from src.model.crud import parse_model_values  # noqa: E402
+from src.scenario.cache import iter_scenario_payload, render_admission_payload  # noqa: E402
+from src.sensor.models import Accident, Location, Model, ModelType, Sensor  # noqa: E402
+from src.telemetry.batch import decode_batch  # noqa: E402
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_history.jsonl")
+REPEAT = 5
+
+
+def build_model(model_id: int, model_type: ModelType, params: int, rng: Random) -> Model:
+    keys = [f"p{index}" for index in range(params)]
+    return Model(
+        id=model_id,
+        model_type=model_type,
+        specification={key: str(rng.randint(1, 500)) for key in keys},
+        param_mapping_names={key: f"Parameter{index}" for index, key in enumerate(keys)},
+    )
+
+
+def build_admission(sensors: int, accidents: int, params: int, seed: int) -> Admission:
+    """Задача со сценарием: локация с sensors приборами, у каждого своя модель с params параметрами."""
+    rng = Random(seed)
+    model_type = ModelType(id=1, name="Датчик давления")
+    location = Location(id=1, name="Помещение 1", prefab="Prefabs/Locations/Room1")
+    location.sensors = [
+        Sensor(id=index, KKS=f"10LAB{index % 100:02d}CP{index:03d}", name=f"Прибор {index}",
+               model=build_model(index, model_type, params, rng))
+        for index in range(1, sensors + 1)
+    ]
+    scenario = Scenario(id=1, name="Сценарий 1", location=location, sensor=location.sensors[0])
+    scenario.accidents = [
+        Accident(id=index, name=f"Ошибка {index}", mechanical_accident=bool(index % 2),
+                 change_value={key: rng.randint(0, 100) for key in list(location.sensors[0].model.specification)},
+                 param_mapping_names=location.sensors[0].model.param_mapping_names)
+        for index in range(1, accidents + 1)
+    ]
+    return Admission(id=1, scenario=scenario)
+
+
+def build_model_value_rows(types: int, fields: int) -> list[tuple[str, str]]:
+    # Та же форма строк, что возвращает GROUP_CONCAT в get_model_values_group_by_type
+    return [
+        (f"Тип {type_index}", ",".join(f"field{index}: {index * 10} МПа" for index in range(fields)))
+        for type_index in range(types)
+    ]
+
+
+def build_telemetry_body(events: int, seed: int) -> bytes:
+    rng = Random(seed)
+    return gzip.compress(orjson.dumps([
+        {"t": index * 0.02, "kind": "sensor", "sensor_id": rng.randint(1, 50), "value": rng.random()}
+        for index in range(events)
+    ]))
+
+
+def build_cases(args) -> dict[str, Callable[[], object]]:
+    admission = build_admission(args.sensors, args.accidents, args.params, args.seed)
+    scenario = admission.scenario
+    sensors = scenario.location.sensors
+    scenario_payload = b"".join(iter_scenario_payload(scenario))
+    model_value_rows = build_model_value_rows(args.types, args.fields)
+    telemetry_body = build_telemetry_body(args.events, args.seed)
+    return {
+        "admission.json_obj": lambda: admission.json_obj(),
+        "admission.json_obj+orjson": lambda: orjson.dumps(admission.json_obj()),
+        "admission.json_obj+json": lambda: json.dumps(admission.json_obj(), ensure_ascii=False),
+        "location_sensor_json_obj x sensors": lambda: [scenario.location_sensor_json_obj(sensor) for sensor in sensors],
+        "accidents_json_obj": lambda: scenario.accidents_json_obj(),
+        "iter_scenario_payload": lambda: b"".join(iter_scenario_payload(scenario)),
+        "render_admission_payload": lambda: render_admission_payload(1, scenario_payload),
+        "render_handoff_message": lambda: render_handoff_message(1, render_admission_payload(1, scenario_payload)),
+        "parse_model_values": lambda: parse_model_values(model_value_rows),
+        "telemetry.decode_batch": lambda: decode_batch(telemetry_body, "gzip", 1, args.events),
+    }
+
+
+def measure(func: Callable[[], object]) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [total / number for total in timer.repeat(repeat=REPEAT, number=number)]
+    return {"best_us": min(timings) * 1e6, "median_us": statistics.median(timings) * 1e6}
+
+
+def load_previous(path: str, sizes: dict) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, "rb") as file:
+        for line in file:
+            entry = orjson.loads(line)
+            if entry["sizes"] == sizes:
+                previous = entry
+    return previous
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Микро-бенчмарки сериализации и сборки данных")
+    parser.add_argument("--sensors", type=int, default=50, help="Приборов в локации сценария")
+    parser.add_argument("--accidents", type=int, default=5, help="Ошибок в сценарии")
+    parser.add_argument("--params", type=int, default=8, help="Параметров у модели")
+    parser.add_argument("--types", type=int, default=100, help="Типов в справочнике параметров")
+    parser.add_argument("--fields", type=int, default=10, help="Полей у типа в справочнике")
+    parser.add_argument("--events", type=int, default=500, help="Событий в пачке телеметрии")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--filter", help="Только замеры, в имени которых есть эта строка")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--record", action="store_true", help="Дописать результат в историю")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    sizes = {"sensors": args.sensors, "accidents": args.accidents, "params": args.params, "types": args.types,
+             "fields": args.fields, "events": args.events}
+    previous = load_previous(args.history, sizes)
+    previous_results = previous["results"] if previous else {}
+
+    results = {}
+    print(f"{'case':<38}{'best us':>12}{'median us':>12}{'vs prev':>10}")
+    for name, func in build_cases(args).items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = result = measure(func)
+        delta = ""
+        if name in previous_results:
+            delta = f"{(result['best_us'] / previous_results[name]['best_us'] - 1) * 100:+.1f}%"
+        print(f"{name:<38}{result['best_us']:>12.1f}{result['median_us']:>12.1f}{delta:>10}")
+    if previous:
+        print(f"\nСравнение с {previous['commit']} от {previous['recorded_at']}")
+
+    if args.record:
+        entry = {"recorded_at": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                 "sizes": sizes, "results": results}
+        with open(args.history, "ab") as file:
+            file.write(orjson.dumps(entry) + b"\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Операции нагрузочного теста и их наборы (mix).
+
+Операция - один HTTP запрос от имени роли: trainee и staff ходят с cookie после входа,
+anonymous - без cookie (вход), unity - API VR клиента. Вес задает долю операции в наборе.
+"""
+import gzip
+import random
+import uuid
+from typing import Callable, NamedTuple
+
+import orjson
+
+from benchmarks.fixture import Fixture
+
+USERS = "/pages/users213123123"
+SCENARIOS = "/pages/scenarios123"
+MODELS = "/pages/models31321"
+SENSORS = "/pages/sensors12321"
+LOCATIONS = "/pages/locations123213"
+API = "/api/v1"
+
+TELEMETRY_BATCH_SIZE = 500
+
+
+class Operation(NamedTuple):
+    name: str
+    role: str
+    weight: int
+    # (фикстура, генератор случайных чисел) -> аргументы httpx.AsyncClient.request
+    build: Callable[[Fixture, random.Random], dict]
+
+
+def get(path: str) -> Callable[[Fixture, random.Random], dict]:
+    return lambda fixture, rng: {"method": "GET", "url": path}
+
+
+def trainee_login(fixture: Fixture, rng: random.Random) -> dict:
+    return {"method": "POST", "url": f"{USERS}/login/user",
+            "data": {"username": fixture.trainee_username, "password": fixture.password}}
+
+
+def wizard_choose_model(fixture: Fixture, rng: random.Random) -> dict:
+    location_id, _ = rng.choice(fixture.location_sensors)
+    return {"method": "POST", "url": f"{SCENARIOS}/create/model/", "data": {"location_selected": location_id}}
+
+
+def wizard_choose_accident(fixture: Fixture, rng: random.Random) -> dict:
+    location_id, sensor_id = rng.choice(fixture.location_sensors)
+    return {"method": "POST", "url": f"{SCENARIOS}/create/accident/{location_id}",
+            "data": {"sensor_selected": sensor_id}}
+
+
+def scenario_info(fixture: Fixture, rng: random.Random) -> dict:
+    return {"method": "GET", "url": f"{SCENARIOS}/id/{rng.choice(fixture.scenario_ids)}"}
+
+
+def unity_admission(fixture: Fixture, rng: random.Random) -> dict:
+    return {"method": "GET", "url": f"{API}/admission/", "json": {"id": rng.choice(fixture.admission_ids)}}
+
+
+def unity_result(fixture: Fixture, rng: random.Random) -> dict:
+    # Каждый пятый запрос - повтор отправки (тот же ключ), как при обрыве Wi-Fi
+    admission_id = rng.choice(fixture.admission_ids)
+    rating = rng.randint(1, 5)
+    key = f"bench-{admission_id}-{rating}" if rng.random() < 0.2 else uuid.uuid4().hex
+    return {"method": "POST", "url": f"{API}/admission-result/update/",
+            "json": {"admission_id": admission_id, "rating": rating, "status": "COMPLETED", "idempotency_key": key}}
+
+
+def unity_telemetry(fixture: Fixture, rng: random.Random) -> dict:
+    events = [{"t": index * 0.02, "kind": "sensor", "sensor_id": rng.randint(1, 50), "value": rng.random()}
+              for index in range(TELEMETRY_BATCH_SIZE)]
+    return {"method": "POST", "url": f"{API}/telemetry/{rng.choice(fixture.admission_ids)}/",
+            "content": gzip.compress(orjson.dumps(events)),
+            "headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"}}
+
+
+TRAINEE = (
+    Operation("trainee_login", "anonymous", 1, trainee_login),
+    Operation("trainee_home", "trainee", 6, get(f"{USERS}/home")),
+    Operation("trainee_tasks", "trainee", 6, get(f"{USERS}/tasks")),
+)
+
+STAFF = (
+    Operation("staff_users", "staff", 4, get(f"{USERS}/")),
+    Operation("staff_models", "staff", 2, get(f"{MODELS}/")),
+    Operation("staff_sensors", "staff", 2, get(f"{SENSORS}/")),
+    Operation("staff_locations", "staff", 2, get(f"{LOCATIONS}/")),
+    Operation("staff_scenarios", "staff", 3, get(f"{SCENARIOS}/")),
+    Operation("staff_leaderboard", "staff", 1, get(f"{USERS}/leaderboard")),
+    Operation("staff_scenario_info", "staff", 2, scenario_info),
+    # Мастер создания сценария без последнего шага, чтобы прогон не менял данные
+    Operation("wizard_locations", "staff", 1, get(f"{SCENARIOS}/create")),
+    Operation("wizard_models", "staff", 1, wizard_choose_model),
+    Operation("wizard_accidents", "staff", 1, wizard_choose_accident),
+)
+
+UNITY = (
+    Operation("unity_admission", "unity", 6, unity_admission),
+    Operation("unity_result", "unity", 2, unity_result),
+    Operation("unity_telemetry", "unity", 4, unity_telemetry),
+)
+
+MIXES: dict[str, tuple[Operation, ...]] = {
+    "trainee": TRAINEE,
+    "staff": STAFF,
+    "unity": UNITY,
+    "mixed": TRAINEE + STAFF + UNITY,
+}
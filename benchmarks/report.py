@@ -0,0 +1,102 @@
+"""Сводка прогона: перцентили, пропускная способность, запросы к БД и сравнение с базовой линией."""
+import math
+import re
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+# Допустимый рост доли ошибок (абсолютный, 0.005 - полпроцента запросов)
+ERROR_RATE_TOLERANCE = 0.005
+
+
+class OperationSamples:
+    __slots__ = ("latencies", "queries", "statuses", "errors")
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.queries: list[int] = []
+        self.statuses: dict[int, int] = {}
+        self.errors = 0
+
+    def record(self, seconds: float, status_code: int | None, server_timing: str | None) -> None:
+        self.latencies.append(seconds)
+        if status_code is None or status_code >= 500:
+            self.errors += 1
+        if status_code is not None:
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        match = SERVER_TIMING_QUERIES.search(server_timing or "")
+        if match:
+            self.queries.append(int(match.group(1)))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Метод ближайшего ранга: значение, ниже или равно которому q процентов замеров
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples: dict[str, OperationSamples], elapsed: float) -> dict:
+    operations = {}
+    total = 0
+    for name, operation in sorted(samples.items()):
+        latencies = sorted(operation.latencies)
+        total += len(latencies)
+        operations[name] = {
+            "requests": len(latencies),
+            "errors": operation.errors,
+            "error_rate": operation.errors / len(latencies) if latencies else 0.0,
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+            "queries_avg": sum(operation.queries) / len(operation.queries) if operation.queries else None,
+            "queries_max": max(operation.queries) if operation.queries else None,
+            "statuses": {str(code): count for code, count in sorted(operation.statuses.items())},
+        }
+    return {"elapsed_s": elapsed, "requests": total, "rps": total / elapsed if elapsed else 0.0,
+            "operations": operations}
+
+
+def format_report(summary: dict) -> str:
+    header = f"{'operation':<22}{'req':>7}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+    lines = [header, "-" * len(header)]
+    for name, operation in summary["operations"].items():
+        queries = operation["queries_avg"]
+        lines.append(
+            f"{name:<22}{operation['requests']:>7}{operation['errors']:>5}{operation['rps']:>9.1f}"
+            f"{operation['p50_ms']:>9.1f}{operation['p95_ms']:>9.1f}{operation['p99_ms']:>9.1f}"
+            f"{queries if queries is not None else float('nan'):>9.1f}"
+        )
+    lines.append("-" * len(header))
+    lines.append(f"total: {summary['requests']} requests in {summary['elapsed_s']:.1f}s, {summary['rps']:.1f} rps")
+    return "\n".join(lines)
+
+
+def error_rate_of(operation: dict) -> float:
+    # В базовых линиях, записанных до появления error_rate, есть только счетчики
+    if "error_rate" in operation:
+        return operation["error_rate"]
+    return operation["errors"] / operation["requests"] if operation["requests"] else 0.0
+
+
+def compare(summary: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Регрессии относительно базовой линии: p95 выросло больше чем на threshold (доля),
+    среднее число запросов к БД выросло, доля ошибок выросла больше чем на ERROR_RATE_TOLERANCE.
+    Сравнивается доля, а не число ошибок: длина прогонов и число запросов в них разные.
+    """
+    regressions = []
+    for name, operation in summary["operations"].items():
+        base = baseline["operations"].get(name)
+        if base is None:
+            continue
+        if base["p95_ms"] and operation["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.1f} -> {operation['p95_ms']:.1f} ms")
+        if base["queries_avg"] is not None and operation["queries_avg"] is not None \
+                and operation["queries_avg"] > base["queries_avg"] + 0.5:
+            regressions.append(f"{name}: queries {base['queries_avg']:.1f} -> {operation['queries_avg']:.1f}")
+        error_rate, base_error_rate = error_rate_of(operation), error_rate_of(base)
+        if error_rate > base_error_rate + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name}: error rate {base_error_rate:.2%} -> {error_rate:.2%}")
+    return regressions
@@ -0,0 +1,156 @@
+"""
+Время холодного старта сервера и профиль импортов.
+
+    python -m benchmarks.startup                                  # импорт src.main и готовность uvicorn
+    python -m benchmarks.startup --profile                        # самые дорогие импорты (-X importtime)
+    python -m benchmarks.startup --command dist\\ISPU_VR_FastAPI_Server\\ISPU_VR_FastAPI_Server.exe \\
+        --base-url http://127.0.0.1:8000                          # собранный exe
+    python -m benchmarks.startup --save-baseline benchmarks/startup_baseline.json
+    python -m benchmarks.startup --compare benchmarks/startup_baseline.json
+
+Каждый замер - новый процесс. import_s - импорт src.main без запуска сервера, ready_s - от запуска
+процесса до первого ответа на страницу входа. С --compare код выхода 1, если медиана выросла
+больше допустимого.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import orjson
+
+from benchmarks.load_test import free_port, git_commit
+from benchmarks.mixes import USERS
+
+READY_TIMEOUT = 120
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| +(\S+)")
+
+
+def measure_import() -> float:
+    code = "import time; start = time.perf_counter(); import src.main; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(command: list[str] | None, base_url: str | None) -> float:
+    if command is None:
+        port = free_port()
+        command = [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--log-level", "warning"]
+        base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(command, env=os.environ.copy(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+    try:
+        deadline = start + READY_TIMEOUT
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise SystemExit(f"Сервер завершился с кодом {server.returncode}")
+            try:
+                httpx.get(f"{base_url}{USERS}/login/user", timeout=5)
+                return time.perf_counter() - start
+            except httpx.TransportError:
+                time.sleep(0.02)
+        raise SystemExit("Сервер не ответил за отведенное время")
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def import_profile(top: int) -> str:
+    """Самые дорогие импорты src.main по накопленному времени и итог по пакетам верхнего уровня."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"], capture_output=True,
+                            text=True, check=True)
+    modules = []
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(3)
+        modules.append((cumulative_us, self_us, name))
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    total = sum(packages.values())
+    lines = [f"{'cumulative ms':>14}{'self ms':>10}  module"]
+    lines += [f"{cumulative / 1000:>14.1f}{self_time / 1000:>10.1f}  {name}"
+              for cumulative, self_time, name in sorted(modules, reverse=True)[:top]]
+    lines.append("")
+    lines.append(f"{'self ms':>14}{'share':>10}  package")
+    lines += [f"{self_time / 1000:>14.1f}{self_time / total:>10.1%}  {package}"
+              for package, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]]
+    lines.append(f"\ntotal: {total / 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+def summarize(samples: list[float]) -> dict:
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "max_s": max(samples),
+            "runs": len(samples)}
+
+
+def compare(summary: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in summary["results"].items():
+        base = baseline["results"].get(name)
+        if base is not None and result["median_s"] > base["median_s"] * (1 + threshold):
+            regressions.append(f"{name}: median {base['median_s']:.3f} -> {result['median_s']:.3f} s")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Время холодного старта ISPU VR сервера")
+    parser.add_argument("--runs", type=int, default=5, help="Число запусков на замер")
+    parser.add_argument("--profile", action="store_true", help="Только профиль импортов")
+    parser.add_argument("--top", type=int, default=25, help="Строк в профиле импортов")
+    parser.add_argument("--command", nargs="+", help="Запускать эту команду (собранный exe) вместо uvicorn")
+    parser.add_argument("--base-url", help="Адрес сервера, запущенного через --command")
+    parser.add_argument("--output", help="Записать сводку в JSON")
+    parser.add_argument("--save-baseline", help="Записать сводку как базовую линию")
+    parser.add_argument("--compare", help="Сравнить с базовой линией")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимый рост медианы (доля)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.profile:
+        print(import_profile(args.top))
+        return 0
+    if args.command and not args.base_url:
+        raise SystemExit("Для --command нужен --base-url")
+
+    results = {}
+    if args.command is None:
+        results["import_s"] = summarize([measure_import() for _ in range(args.runs)])
+    results["ready_s"] = summarize([measure_ready(args.command, args.base_url) for _ in range(args.runs)])
+    summary = {"results": results, "meta": {"command": args.command or "uvicorn src.main:app",
+                                            "commit": git_commit()}}
+
+    for name, result in results.items():
+        print(f"{name:<10} median {result['median_s']:.3f} s  min {result['min_s']:.3f} s  "
+              f"max {result['max_s']:.3f} s  ({result['runs']} runs)")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "wb") as file:
+                file.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+
+    if args.compare:
+        with open(args.compare, "rb") as file:
+            baseline = orjson.loads(file.read())
+        regressions = compare(summary, baseline, args.threshold)
+        base_commit = baseline.get("meta", {}).get("commit")
+        if regressions:
+            print(f"\nРегрессии относительно {base_commit}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nРегрессий относительно {base_commit} нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
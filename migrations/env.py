@@ -14,6 +14,8 @@ from src.database import Base
 from src.config import DB_HOST, DB_PORT, DB_USER, DB_NAME, DB_PASS
 from src.auth.models import User, Admission, Scenario
 from src.sensor.models import Model, ModelType, Accident, Location, Sensor, ModelValue
+from src.stats.models import UserTrainingStats, ScenarioTrainingStats, DivisionTrainingStats
+from src.telemetry.models import TelemetryEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
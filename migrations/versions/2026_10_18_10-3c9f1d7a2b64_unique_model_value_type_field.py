@@ -0,0 +1,32 @@
+"""Unique model value type field
+
+Revision ID: 3c9f1d7a2b64
+Revises: e447a5c5e750
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f1d7a2b64'
+down_revision: Union[str, None] = 'e447a5c5e750'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Оставляем последнюю запись для каждой пары (model_type, field), иначе ключ не создать
+    op.execute(
+        "DELETE older FROM model_value AS older "
+        "JOIN model_value AS newer "
+        "ON older.model_type = newer.model_type AND older.field = newer.field AND older.id < newer.id"
+    )
+    op.create_unique_constraint('uq_model_value_model_type_field', 'model_value', ['model_type', 'field'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_model_value_model_type_field', 'model_value', type_='unique')
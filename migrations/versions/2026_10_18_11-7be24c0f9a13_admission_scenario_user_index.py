@@ -0,0 +1,26 @@
+"""Admission scenario user index
+
+Revision ID: 7be24c0f9a13
+Revises: 3c9f1d7a2b64
+Create Date: 2026-10-18 11:03:27.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7be24c0f9a13'
+down_revision: Union[str, None] = '3c9f1d7a2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_admission_scenario_id_user_id', 'admission', ['scenario_id', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_admission_scenario_id_user_id', table_name='admission')
@@ -0,0 +1,52 @@
+"""Admission rating numeric
+
+Revision ID: 5e81c2d4f0a7
+Revises: 7be24c0f9a13
+Create Date: 2026-10-18 12:14:52.406133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e81c2d4f0a7'
+down_revision: Union[str, None] = '7be24c0f9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Число в строковой оценке: "4", "4.75", "10", ".5", "-1"
+NUMERIC_RATING = "TRIM(rating) REGEXP '^[-+]?([0-9]+([.][0-9]*)?|[.][0-9]+)$'"
+ROUNDED_RATING = "ROUND(CAST(TRIM(rating) AS DECIMAL(10, 4)), 1)"
+# Numeric(3, 1) вмещает числа до 99.9
+RATING_LIMIT = 100
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # Числа, которые не поместятся в колонку, не теряются молча: миграция останавливается со списком задач
+    too_large = connection.execute(sa.text(
+        f"SELECT id, rating FROM admission WHERE {NUMERIC_RATING} AND ABS({ROUNDED_RATING}) >= {RATING_LIMIT}"
+    )).all()
+    if too_large:
+        listed = ", ".join(f"{admission_id}: {rating!r}" for admission_id, rating in too_large[:50])
+        raise RuntimeError(f"Оценки задач не помещаются в Numeric(3, 1), исправьте их вручную ({len(too_large)}): "
+                           f"{listed}")
+    # Пустые строки и текст, который не является числом, оценкой не были
+    op.execute(f"UPDATE admission SET rating = NULL WHERE rating IS NOT NULL AND NOT ({NUMERIC_RATING})")
+    # Остальные округляются до десятых здесь, а не при смене типа: "4.75" -> "4.8", "10" -> "10.0"
+    op.execute(f"UPDATE admission SET rating = CAST({ROUNDED_RATING} AS CHAR) WHERE rating IS NOT NULL")
+    op.alter_column('admission', 'rating',
+                    existing_type=sa.String(length=4),
+                    type_=sa.Numeric(precision=3, scale=1),
+                    existing_nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column('admission', 'rating',
+                    existing_type=sa.Numeric(precision=3, scale=1),
+                    type_=sa.String(length=4),
+                    existing_nullable=True)
@@ -0,0 +1,63 @@
+"""Training stats
+
+Revision ID: 9d2b7e41c6f8
+Revises: 5e81c2d4f0a7
+Create Date: 2026-10-18 13:40:06.551290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2b7e41c6f8'
+down_revision: Union[str, None] = '5e81c2d4f0a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATS_TABLES = (
+    ('user_training_stats', 'user_id', 'user'),
+    ('scenario_training_stats', 'scenario_id', 'scenario'),
+)
+
+
+def upgrade() -> None:
+    # Для старых задач время назначения неизвестно, они не участвуют в среднем времени выполнения
+    op.add_column('admission', sa.Column('assigned_at', sa.DateTime(), nullable=True))
+
+    for table_name, key, referred_table in STATS_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('rated_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('rating_sum', sa.Numeric(precision=12, scale=1), server_default='0', nullable=False),
+            sa.Column('average_rating', sa.Numeric(precision=4, scale=2), nullable=True),
+            sa.Column('timed_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('completion_seconds', sa.BigInteger(), server_default='0', nullable=False),
+            sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.ForeignKeyConstraint([key], [f'{referred_table}.id'],
+                                    name=op.f(f'fk_{table_name}_{key}_{referred_table}'), ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id', name=op.f(f'pk_{table_name}')),
+            sa.UniqueConstraint(key, name=op.f(f'uq_{table_name}_{key}')),
+        )
+        # Начальное заполнение из уже выставленных оценок
+        op.execute(
+            f"INSERT INTO {table_name} ({key}, completed_count, rated_count, rating_sum, average_rating, "
+            f"last_completed_at) "
+            f"SELECT {key}, COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0), AVG(rating), MAX(is_ready) "
+            f"FROM admission WHERE status = 'COMPLETED' GROUP BY {key}"
+        )
+
+    op.create_index('ix_user_training_stats_average_rating', 'user_training_stats',
+                    ['average_rating', 'completed_count'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_training_stats_average_rating', table_name='user_training_stats')
+    for table_name, _, _ in reversed(STATS_TABLES):
+        op.drop_table(table_name)
+    op.drop_column('admission', 'assigned_at')
@@ -0,0 +1,40 @@
+"""List sort indexes
+
+Revision ID: c47a0e9b3d15
+Revises: 9d2b7e41c6f8
+Create Date: 2026-10-18 14:22:41.870315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a0e9b3d15'
+down_revision: Union[str, None] = '9d2b7e41c6f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# InnoDB дописывает первичный ключ в каждый вторичный индекс, поэтому индекс по колонке
+# покрывает и порядок (колонка, id) курсорной пагинации
+SORT_INDEXES = (
+    ('user', 'last_name'),
+    ('user', 'registered_at'),
+    ('user', 'division'),
+    ('sensor', 'name'),
+    ('sensor', 'KKS'),
+    ('location', 'name'),
+    ('scenario', 'name'),
+)
+
+
+def upgrade() -> None:
+    for table_name, column_name in SORT_INDEXES:
+        op.create_index(op.f(f'ix_{table_name}_{column_name}'), table_name, [column_name], unique=False)
+
+
+def downgrade() -> None:
+    for table_name, column_name in reversed(SORT_INDEXES):
+        op.drop_index(op.f(f'ix_{table_name}_{column_name}'), table_name=table_name)
@@ -0,0 +1,39 @@
+"""Telemetry event
+
+Revision ID: e83a6f1c2d90
+Revises: c47a0e9b3d15
+Create Date: 2026-10-18 15:05:12.408117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83a6f1c2d90'
+down_revision: Union[str, None] = 'c47a0e9b3d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'telemetry_event',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('admission_id', sa.Integer(), nullable=False),
+        sa.Column('client_time', sa.Float(), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('sensor_id', sa.Integer(), nullable=True),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_telemetry_event')),
+    )
+    op.create_index(op.f('ix_telemetry_event_admission_id'), 'telemetry_event', ['admission_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_telemetry_event_admission_id'), table_name='telemetry_event')
+    op.drop_table('telemetry_event')
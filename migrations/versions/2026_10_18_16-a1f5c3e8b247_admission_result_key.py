@@ -0,0 +1,28 @@
+"""Admission result key
+
+Revision ID: a1f5c3e8b247
+Revises: e83a6f1c2d90
+Create Date: 2026-10-18 16:12:37.194520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f5c3e8b247'
+down_revision: Union[str, None] = 'e83a6f1c2d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('admission', sa.Column('result_key', sa.String(length=64), nullable=True))
+    op.add_column('admission', sa.Column('result_seq', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('admission', 'result_seq')
+    op.drop_column('admission', 'result_key')
@@ -0,0 +1,49 @@
+"""Division training stats
+
+Revision ID: b6d94e2a7c13
+Revises: a1f5c3e8b247
+Create Date: 2026-10-18 17:05:42.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d94e2a7c13'
+down_revision: Union[str, None] = 'a1f5c3e8b247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'division_training_stats',
+        sa.Column('division', sa.String(length=50), nullable=False),
+        sa.Column('users_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rated_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rating_sum', sa.Numeric(precision=12, scale=1), server_default='0', nullable=False),
+        sa.Column('average_rating', sa.Numeric(precision=4, scale=2), nullable=True),
+        sa.Column('timed_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completion_seconds', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_division_training_stats')),
+        sa.UniqueConstraint('division', name=op.f('uq_division_training_stats_division')),
+    )
+    # Начальное заполнение из итогов пользователей
+    op.execute(
+        "INSERT INTO division_training_stats (division, users_count, completed_count, rated_count, rating_sum, "
+        "average_rating, timed_count, completion_seconds, last_completed_at) "
+        "SELECT u.division, COUNT(*), SUM(s.completed_count), SUM(s.rated_count), SUM(s.rating_sum), "
+        "SUM(s.rating_sum) / NULLIF(SUM(s.rated_count), 0), SUM(s.timed_count), SUM(s.completion_seconds), "
+        "MAX(s.last_completed_at) "
+        "FROM user_training_stats s JOIN `user` u ON u.id = s.user_id GROUP BY u.division"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('division_training_stats')
@@ -1,21 +1,27 @@
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.auth import AdmissionStatus, Admission
-from sqlalchemy import select
+from src.auth import AdmissionStatus, Admission, User, Scenario
+from src.database import EMBEDDED_DB
+from src.load_profiles import ADMISSION_LIST, ADMISSION_DETAIL
+from sqlalchemy import select, exists, true, func, case, insert, literal
 
+from datetime import datetime
 from typing import Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Пользователей в одном INSERT ... SELECT при массовой выдаче
+ASSIGN_BATCH_SIZE = 500
+
 
 async def get_admissions_by_user(user_id: int, session: AsyncSession,
                                     include_completed: bool = True) -> Sequence[Admission]:
     try:
         if include_completed:
-            query = select(Admission).where(user_id == Admission.user_id)
+            query = select(Admission).options(*ADMISSION_LIST).where(user_id == Admission.user_id)
         else:
-            query = select(Admission).where(user_id == Admission.user_id,
-                                            AdmissionStatus.COMPLETED != Admission.status)
+            query = select(Admission).options(*ADMISSION_LIST).where(user_id == Admission.user_id,
+                                                                     AdmissionStatus.COMPLETED != Admission.status)
         result = await session.execute(query)
         admission = result.scalars().all()
         return admission
@@ -24,28 +30,107 @@ async def get_admissions_by_user(user_id: int, session: AsyncSession,
         raise SQLAlchemyError("Ошибка при получении задач.")
 
 
-def get_last_admission_task(list_admission_tasks: Sequence[Admission]) -> Admission | None:
+def _user_statistics(count, average_rating, last_completed_at, last_admission_id, *status_counts) -> dict:
+    return {
+        'count': count,
+        'average_rating': round(float(average_rating or 0), 2),
+        'last_completed_at': last_completed_at,
+        # Без завершенных задач first_value вернул бы id первой попавшейся
+        'last_admission_id': last_admission_id if last_completed_at is not None else None,
+        'statuses': {status: int(value or 0) for status, value in zip(AdmissionStatus, status_counts)},
+    }
+
+
+async def get_admissions_with_statistics(user_id: int, session: AsyncSession) -> tuple[Sequence[Admission], dict]:
+    """
+    Задачи пользователя и их статистика одним запросом.
+
+    Итоги считаются оконными функциями по всем задачам пользователя и приходят в каждой строке
+    вместе с задачей, поэтому страница не делает отдельный агрегирующий запрос. Последняя
+    завершенная задача - первая по is_ready DESC (NULL в MySQL и SQLite идут в конце).
+    """
+    query = select(
+        Admission,
+        func.count().over(),
+        func.avg(Admission.rating).over(),
+        func.max(Admission.is_ready).over(),
+        func.first_value(Admission.id).over(order_by=Admission.is_ready.desc()),
+        *(func.sum(case((status == Admission.status, 1), else_=0)).over() for status in AdmissionStatus),
+    ).options(*ADMISSION_LIST).where(user_id == Admission.user_id)
     try:
-        if not list_admission_tasks:
-            return None
-        filtered_admissions = [admission for admission in list_admission_tasks if admission.is_ready is not None]
-        if not filtered_admissions:
-            return None
-        last_admission = max(filtered_admissions, key=lambda admission: admission.is_ready)
-        return last_admission
+        rows = (await session.execute(query)).all()
     except SQLAlchemyError as e:
-        print(f"SQLAlchemy ошибка при получении задачи: {e}")
-        raise SQLAlchemyError("Ошибка при получении задачи.")
+        print(f"SQLAlchemy ошибка при получении задач и статистики: {e}")
+        raise SQLAlchemyError("Ошибка при получении задач и статистики.")
+    if not rows:
+        return [], _user_statistics(0, None, None, None, *(0 for _ in AdmissionStatus))
+    return [row[0] for row in rows], _user_statistics(*rows[0][1:])
+
 
 async def get_admission_for_id(admission_id: int, session: AsyncSession) -> Admission:
-    query = select(Admission).where(admission_id == Admission.id)
+    query = select(Admission).options(*ADMISSION_DETAIL).where(admission_id == Admission.id)
     result = await session.execute(query)
     admission = result.scalar_one_or_none()
     return admission
 
 
 async def get_admissions(user_id: int, session: AsyncSession) -> Sequence[Admission]:
-    query = select(Admission).where(user_id == Admission.user_id).order_by("status")
+    query = select(Admission).options(*ADMISSION_LIST).where(user_id == Admission.user_id).order_by("status")
     result = await session.execute(query)
     admission = result.scalars().all()
-    return admission
\ No newline at end of file
+    return admission
+
+
+async def assign_scenarios(session: AsyncSession, user_ids: list[int], scenario_ids: list[int],
+                           return_ids: bool = False) -> int | list[int]:
+    """
+    Выдает пользователям сценарии, которых у них еще нет.
+
+    Пачка из ASSIGN_BATCH_SIZE пользователей - один INSERT ... SELECT: пары пользователь x сценарий
+    строятся и сверяются с уже выданными задачами (NOT EXISTS) в самой БД. Возвращает число
+    созданных задач, с return_ids=True - их id (на MySQL это еще один SELECT на пачку).
+    """
+    user_ids = sorted(set(user_ids or []))
+    scenario_ids = sorted(set(scenario_ids or []))
+    if not user_ids or not scenario_ids:
+        return [] if return_ids else 0
+
+    assigned_at = datetime.utcnow()
+    created = 0
+    admission_ids = []
+    for i in range(0, len(user_ids), ASSIGN_BATCH_SIZE):
+        batch = user_ids[i:i + ASSIGN_BATCH_SIZE]
+        candidates = (
+            select(
+                User.id,
+                Scenario.id,
+                literal(AdmissionStatus.ACTIVE, Admission.status.type),
+                literal(0, Admission.rating.type),
+                literal(assigned_at, Admission.assigned_at.type),
+            )
+            .select_from(User)
+            .join(Scenario, true())
+            .where(User.id.in_(batch), Scenario.id.in_(scenario_ids))
+            .where(~exists().where(Admission.user_id == User.id, Admission.scenario_id == Scenario.id))
+        )
+        stmt = insert(Admission.__table__).from_select(
+            ["user_id", "scenario_id", "status", "rating", "assigned_at"], candidates)
+        if return_ids and EMBEDDED_DB:
+            result = await session.execute(stmt.returning(Admission.id))
+            admission_ids.extend(result.scalars().all())
+            continue
+        result = await session.execute(stmt)
+        created += result.rowcount
+        if not return_ids or not result.rowcount:
+            continue
+        # MySQL 8 не умеет RETURNING. lastrowid - id первой вставленной строки, id растут монотонно,
+        # поэтому задачи пачки с id не меньше него созданы этим запросом
+        query = select(Admission.id).where(
+            Admission.id >= result.lastrowid,
+            Admission.user_id.in_(batch),
+            Admission.scenario_id.in_(scenario_ids),
+        )
+        result = await session.execute(query)
+        admission_ids.extend(result.scalars().all())
+    await session.commit()
+    return sorted(admission_ids) if return_ids else created
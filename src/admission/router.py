@@ -1,6 +1,6 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Form, Request, Depends, HTTPException
+from fastapi import APIRouter, Body, Form, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from pydantic import ValidationError
 from sqlalchemy import select
@@ -15,8 +15,11 @@ from src.database import get_async_session
 from src.pages.router import templates
 from src.pages.utils import user_menu
 from src.scenario.crud import get_scenario_for_id as get_scenario_for_id_func, get_active_scenarios
-from src.users.crud import get_users_without_scenario
-from src.admission.crud import get_admission_for_id as get_admission_for_id_func
+from src.users.crud import get_users_without_scenario, USERS_PAGE_SIZE
+from src.admission.crud import get_admission_for_id as get_admission_for_id_func, assign_scenarios
+from src.api.v1.admission.crud import forget_admission_result
+from src.api.v1.session.hub import notify_assignments_changed
+from src.stats.crud import result_contribution, record_result_change, NO_CONTRIBUTION
 
 router = APIRouter(
     prefix='/pages/admission',
@@ -25,17 +28,21 @@ router = APIRouter(
 
 
 @router.get("/scenario/add/{scenario_id}", response_class=HTMLResponse)
-async def get_task_assignment(request: Request, scenario_id: int, current_user: User = Depends(staff_user),
+async def get_task_assignment(request: Request, scenario_id: int, after_id: Optional[int] = None,
+                              current_user: User = Depends(staff_user),
                               session: AsyncSession = Depends(get_async_session)):
     try:
         scenario = await get_scenario_for_id_func(scenario_id=scenario_id, session=session)
-        users = await get_users_without_scenario(scenario_id=scenario_id, session=session)
+        users = await get_users_without_scenario(scenario_id=scenario_id, session=session, after_id=after_id,
+                                                 limit=USERS_PAGE_SIZE + 1)
+        next_after_id = users[USERS_PAGE_SIZE - 1].id if len(users) > USERS_PAGE_SIZE else None
         return templates.TemplateResponse(
             "/staff/assignment_task/add_task_user.html",
             {
                 'request': request,
                 'user': current_user,
-                'users': users,
+                'users': users[:USERS_PAGE_SIZE],
+                'next_after_id': next_after_id,
                 'scenario': scenario,
                 'title': "ISPU - Добавление задачи!",
                 'menu': user_menu,
@@ -68,10 +75,8 @@ async def post_task_assignment(request: Request, scenario_id: int, user_ids: lis
                                     status_code=HTTPStatus.MOVED_PERMANENTLY)
         if not user_ids:
             return response
-        for user_id in user_ids:
-            admission = Admission(status=AdmissionStatus.ACTIVE, user_id=user_id, rating="0", scenario_id=scenario_id)
-            session.add(admission)
-        await session.commit()
+        if await assign_scenarios(session=session, user_ids=user_ids, scenario_ids=[scenario_id]):
+            notify_assignments_changed(user_ids)
         return response
     except SQLAlchemyError as e:
         print(f"SQLAlchemy ошибка при создании задачи для пользователя: {e}")
@@ -93,6 +98,26 @@ async def post_task_assignment(request: Request, scenario_id: int, user_ids: lis
         })
 
 
+@router.post("/bulk/", name="post_bulk_assignment")
+async def post_bulk_assignment(user_ids: list[int] = Body(...), scenario_ids: list[int] = Body(...),
+                               user: User = Depends(staff_user),
+                               session: AsyncSession = Depends(get_async_session)):
+    try:
+        admission_ids = await assign_scenarios(session=session, user_ids=user_ids, scenario_ids=scenario_ids,
+                                               return_ids=True)
+        if admission_ids:
+            notify_assignments_changed(user_ids)
+        return {"created": admission_ids}
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemy ошибка при массовом назначении задач: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+    except Exception as e:
+        print(f"Ошибка при массовом назначении задач: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/update/{admission_id}", response_class=HTMLResponse)
 async def get_update_admission(
         request: Request,
@@ -144,10 +169,18 @@ async def put_admission(
 ):
     try:
         admission: Admission = await get_admission_for_id_func(admission_id=admission_id, session=session)
+        before = result_contribution(admission)
         Admission.set_rating(admission, rating)
         admission.status = status
+        # Результат задан сотрудником: ключ и номер последней отправки клиента больше не действуют
+        admission.result_key = None
+        admission.result_seq = None
         session.add(admission)
+        await record_result_change(session=session, user_id=admission.user_id, scenario_id=admission.scenario_id,
+                                   before=before, after=result_contribution(admission))
         await session.commit()
+        forget_admission_result(admission_id)
+        notify_assignments_changed([admission.user_id])
 
         return RedirectResponse(url=request.url_for("get_users_page"), status_code=HTTPStatus.MOVED_PERMANENTLY)
     except SQLAlchemyError as e:
@@ -188,8 +221,12 @@ async def delete_admission(admission_id: int, session: AsyncSession = Depends(ge
         if admission is None:
             raise HTTPException(status_code=404, detail="Admission not found")
 
+        await record_result_change(session=session, user_id=admission.user_id, scenario_id=admission.scenario_id,
+                                   before=result_contribution(admission), after=NO_CONTRIBUTION)
         await session.delete(admission)
         await session.commit()
+        forget_admission_result(admission_id)
+        notify_assignments_changed([admission.user_id])
 
         return {"detail": "Admission deleted successfully"}
 
@@ -243,10 +280,8 @@ async def post_task_assignment_for_user(request: Request, user_id: int, tasks_id
                                         current_user: User = Depends(staff_user),
                                         session: AsyncSession = Depends(get_async_session)):
     try:
-        for task_id in tasks_ids:
-            admission = Admission(status=AdmissionStatus.ACTIVE, user_id=user_id, rating="0", scenario_id=task_id)
-            session.add(admission)
-        await session.commit()
+        if await assign_scenarios(session=session, user_ids=[user_id], scenario_ids=tasks_ids):
+            notify_assignments_changed([user_id])
         response = RedirectResponse(url=request.url_for("get_profile_for_id", user_id=user_id),
                                     status_code=HTTPStatus.MOVED_PERMANENTLY)
         return response
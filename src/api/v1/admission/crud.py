@@ -1,13 +1,197 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.models import Admission, AdmissionStatus
+from src.auth.models import Admission, AdmissionStatus, Scenario
+from src.database import EMBEDDED_DB
+from src.stats.crud import result_contribution, record_result_change
+
+RESULT_KEY_MAX_LENGTH = 64
+LAST_RESULTS_SIZE = 1024
+
+
+class AdmissionResultBusy(Exception):
+    """Результат задачи сейчас записывает другой запрос и блокировка не дождалась - отправку нужно повторить."""
+
+
+class ResultState(NamedTuple):
+    """Поля задачи, от которых зависит вклад в итоги (см. src.stats.crud.result_contribution)."""
+    status: AdmissionStatus
+    rating: Decimal | None
+    is_ready: datetime | None
+    assigned_at: datetime | None
+
+
+class ResultOutcome(NamedTuple):
+    admission_id: int
+    user_id: int
+    scenario_name: str
+    rating: Decimal | None
+    key: str
+    sequence: int | None
+    # False - повтор или устаревшая отправка, в БД ничего не записано
+    applied: bool
+
+    def __str__(self):
+        return f"ID: {self.admission_id} | name: {self.scenario_name} | Rating: {self.rating}"
 
 
-async def update_admission_result(session: AsyncSession, admission: Admission, rating: str, status: str) -> None:
+# Последний записанный результат по задаче: повтор той же отправки отвечается без запроса к БД
+_last_results: OrderedDict[int, ResultOutcome] = OrderedDict()
+# Отправки, которые сейчас записываются: одновременные повторы того же отправителя ждут ту же запись
+_inflight: dict[tuple[int, str, int | None], asyncio.Future] = {}
+
+
+def parse_status(value) -> AdmissionStatus:
+    if isinstance(value, AdmissionStatus):
+        return value
     try:
-        admission.status = status
-        admission.rating = rating
-        session.add(admission)
-        await session.commit()
+        return AdmissionStatus[value]
+    except KeyError:
+        pass
+    try:
+        return AdmissionStatus(value)
+    except ValueError:
+        raise ValueError(f"Invalid status: {value}")
+
+
+def result_key_for(rating: Decimal | None, status: AdmissionStatus, key: str | None) -> str:
+    # Без ключа от клиента ключом служит само содержимое: повтор с теми же данными ничего не меняет.
+    # После сброса задачи сотрудником ключ в строке и кэше очищен, и тот же результат пишется снова
+    if key:
+        if len(key) > RESULT_KEY_MAX_LENGTH:
+            raise ValueError(f"Idempotency key is longer than {RESULT_KEY_MAX_LENGTH} characters")
+        return key
+    return "auto:" + hashlib.sha1(f"{status.name}:{rating}".encode()).hexdigest()
+
+
+def _is_superseded(key: str, sequence: int | None, last_key: str | None, last_sequence: int | None) -> bool:
+    if key == last_key:
+        return True
+    return sequence is not None and last_sequence is not None and sequence <= last_sequence
+
+
+def _remember(outcome: ResultOutcome) -> None:
+    _last_results[outcome.admission_id] = outcome
+    _last_results.move_to_end(outcome.admission_id)
+    if len(_last_results) > LAST_RESULTS_SIZE:
+        _last_results.popitem(last=False)
+
+
+def forget_admission_result(admission_id: int) -> None:
+    # Вызывается, когда сотрудник меняет или удаляет задачу: следующая отправка клиента не считается повтором
+    _last_results.pop(admission_id, None)
+
+
+async def submit_admission_result(session: AsyncSession, admission_id: int, rating, status,
+                                  key: str | None = None, sequence: int | None = None,
+                                  user_id: int | None = None) -> ResultOutcome | None:
+    """
+    Идемпотентная запись результата VR сессии. Общий путь для POST /admission-result/update/ и WebSocket сессии.
+
+    key - ключ идемпотентности отправки, sequence - необязательный номер отправки по задаче.
+    Повтор с тем же ключом и отправка с номером не больше уже записанного ничего не пишут
+    и возвращают applied=False. Неверный статус или оценка - ValueError, задачи нет - None.
+    user_id - владелец задачи, если отправитель известен (WebSocket сессия): чужая задача
+    отвечается как несуществующая и не меняется.
+    """
+    status = parse_status(status)
+    rating = Admission.parse_rating(rating)
+    if sequence is not None and (not isinstance(sequence, int) or isinstance(sequence, bool)):
+        raise ValueError(f"Invalid sequence: {sequence}")
+    key = result_key_for(rating, status, key)
+
+    last = _last_results.get(admission_id)
+    if last is not None and _is_superseded(key, sequence, last.key, last.sequence):
+        return last._replace(applied=False) if user_id in (None, last.user_id) else None
+
+    inflight = _inflight.get((admission_id, key, user_id))
+    if inflight is not None:
+        outcome = await asyncio.shield(inflight)
+        return outcome._replace(applied=False) if outcome is not None else None
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[(admission_id, key, user_id)] = future
+    try:
+        outcome = await _write_admission_result(session, admission_id, rating, status, key, sequence, user_id)
+        if outcome is not None:
+            _remember(outcome)
+        future.set_result(outcome)
+        return outcome
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
     except Exception as e:
-        raise Exception(f"An error occurred while update connections: {e}")
\ No newline at end of file
+        future.set_exception(e)
+        # Исключение уже получил этот вызов, ожидающих повторов может и не быть
+        future.exception()
+        raise
+    finally:
+        del _inflight[(admission_id, key, user_id)]
+
+
+def _is_lock_error(error: OperationalError) -> bool:
+    # MySQL: 1205 - истекло ожидание блокировки, 1213 - взаимная блокировка; SQLite: database is locked
+    code = error.orig.args[0] if error.orig is not None and error.orig.args else None
+    return code in (1205, 1213) or "locked" in str(error.orig)
+
+
+async def _write_admission_result(session: AsyncSession, admission_id: int, rating: Decimal | None,
+                                  status: AdmissionStatus, key: str, sequence: int | None,
+                                  user_id: int | None) -> ResultOutcome | None:
+    # Вместо загрузки задачи со всеми связями - одна строка нужных колонок и UPDATE по id.
+    # Строка блокируется до чтения, поэтому параллельная отправка по той же задаче ждет commit
+    # этой и читает уже записанный результат: разница для итогов всегда от действительных значений
+    try:
+        if EMBEDDED_DB:
+            # В SQLite нет SELECT ... FOR UPDATE: блокировку записи берет первый UPDATE транзакции
+            await session.execute(
+                update(Admission)
+                .where(admission_id == Admission.id)
+                .values(result_seq=Admission.result_seq)
+                .execution_options(synchronize_session=False)
+            )
+        query = (
+            select(Admission.user_id, Admission.scenario_id, Admission.status, Admission.rating, Admission.is_ready,
+                   Admission.assigned_at, Admission.result_key, Admission.result_seq, Scenario.name)
+            .join(Scenario, Scenario.id == Admission.scenario_id)
+            .where(admission_id == Admission.id)
+            .with_for_update(of=Admission)
+        )
+        current = (await session.execute(query)).one_or_none()
+        if current is None or user_id not in (None, current.user_id):
+            await session.rollback()
+            return None
+        if _is_superseded(key, sequence, current.result_key, current.result_seq):
+            await session.rollback()
+            return ResultOutcome(admission_id, current.user_id, current.name, current.rating,
+                                 current.result_key, current.result_seq, applied=False)
+
+        before = ResultState(current.status, current.rating, current.is_ready, current.assigned_at)
+        # Время завершения ставится при первой оценке и не сдвигается повторными отправками
+        after = ResultState(status, rating, (current.is_ready or datetime.utcnow()) if rating else None,
+                            current.assigned_at)
+        new_sequence = sequence if sequence is not None else current.result_seq
+        await session.execute(
+            update(Admission)
+            .where(admission_id == Admission.id)
+            .values(status=after.status, rating=after.rating, is_ready=after.is_ready,
+                    result_key=key, result_seq=new_sequence)
+            .execution_options(synchronize_session=False)
+        )
+        await record_result_change(session=session, user_id=current.user_id, scenario_id=current.scenario_id,
+                                   before=result_contribution(before), after=result_contribution(after))
+        await session.commit()
+    except OperationalError as e:
+        await session.rollback()
+        if _is_lock_error(e):
+            raise AdmissionResultBusy(f"Admission {admission_id} result is being saved by another request") from e
+        raise
+    return ResultOutcome(admission_id, current.user_id, current.name, rating, key, new_sequence, applied=True)
@@ -1,25 +1,50 @@
-from fastapi import APIRouter, Body, Depends, Response
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.pages.crud import get_admission_for_id
-from src.api.v1.admission.crud import update_admission_result as update_admission_result_crud
+from src.api.v1.responses import UnityJSONResponse
+from src.api.v1.admission.crud import submit_admission_result, AdmissionResultBusy
+from src.api.v1.session.hub import notify_assignments_changed
 from src.database import get_async_session
+from src.scenario.cache import get_admission_payload
 
 router = APIRouter(
     prefix='/api/v1',
-    tags=['API']
+    tags=['API'],
+    default_response_class=UnityJSONResponse,
 )
 
+# Через сколько секунд повторить отправку результата, если задачу сейчас записывает другой запрос
+RESULT_RETRY_AFTER = 1
+
 
 @router.post("/admission-result/update/")
 async def update_admission_result(rating=Body(embed=True),
                                   admission_id=Body(embed=True),
                                   status=Body(embed=True),
+                                  idempotency_key: Optional[str] = Body(None, embed=True),
+                                  sequence: Optional[int] = Body(None, embed=True),
+                                  idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key"),
                                   session: AsyncSession = Depends(get_async_session)):
     try:
-        admission = await get_admission_for_id(admission_id=admission_id, session=session)
-        await update_admission_result_crud(session=session, rating=rating, admission=admission, status=status)
-        return Response(status_code=201, content=str(admission), media_type="text/plain")
+        outcome = await submit_admission_result(session=session, admission_id=admission_id, rating=rating,
+                                                status=status, key=idempotency_key or idempotency_key_header,
+                                                sequence=sequence)
+        if outcome is None:
+            return Response(status_code=404, content="Admission not found", media_type="text/plain")
+        if not outcome.applied:
+            # Повтор уже записанной отправки: тот же ответ, что и в первый раз
+            return Response(status_code=201, content=str(outcome), media_type="text/plain",
+                            headers={"Idempotent-Replayed": "true"})
+        notify_assignments_changed([outcome.user_id])
+        return Response(status_code=201, content=str(outcome), media_type="text/plain")
+    except ValueError as e:
+        return Response(status_code=400, content=str(e), media_type="text/plain")
+    except AdmissionResultBusy as e:
+        # Клиент повторяет отправку с тем же ключом, повтор уже записанного результата ничего не изменит
+        return Response(status_code=409, content=str(e), media_type="text/plain",
+                        headers={"Retry-After": str(RESULT_RETRY_AFTER)})
     except Exception as e:
         print(e)
         return Response(status_code=500, content=str(e))
@@ -28,8 +53,10 @@ async def update_admission_result(rating=Body(embed=True),
 @router.get("/admission/")
 async def get_admission_data(id: int = Body(embed=True), session: AsyncSession = Depends(get_async_session)):
     try:
-        admission = await get_admission_for_id(admission_id=id, session=session)
-        return admission.json_obj()
+        payload = await get_admission_payload(session=session, admission_id=id)
+        if payload is None:
+            return Response(status_code=404, content="Admission not found", media_type="text/plain")
+        return UnityJSONResponse(status_code=200, content=payload)
     except Exception as e:
         print(e)
         return Response(status_code=500, content=str(e))
\ No newline at end of file
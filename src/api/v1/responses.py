@@ -0,0 +1,32 @@
+import time
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+from src.metrics import record_serialize
+
+
+class UnityJSONResponse(Response):
+    """
+    JSON ответ для VR клиента.
+
+    Готовые байты (например, из кэша сценариев) отдаются как есть, остальное
+    сериализуется через orjson напрямую в bytes, минуя jsonable_encoder.
+    Эндпоинты должны возвращать экземпляр ответа, а не dict.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        start = time.perf_counter()
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        finally:
+            record_serialize(time.perf_counter() - start)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from fastapi import WebSocket
+from sqlalchemy import select
+
+from src.api.v1.responses import dumps
+from src.auth.models import Admission, AdmissionStatus, Scenario, User
+from src.database import async_session_maker
+
+
+class ClientSession:
+    """Одно подключение VR клиента. Прогресс хранится последним событием, история - дело телеметрии."""
+    __slots__ = ("user_id", "websocket", "connected_at", "admission_id", "progress", "last_event_at", "events")
+
+    def __init__(self, user_id: int, websocket: WebSocket):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.connected_at = time.time()
+        self.admission_id: int | None = None
+        self.progress: dict | None = None
+        self.last_event_at: float | None = None
+        self.events = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "admission_id": self.admission_id,
+            "connected_at": self.connected_at,
+            "last_event_at": self.last_event_at,
+            "events": self.events,
+            "progress": self.progress,
+        }
+
+
+class SessionHub:
+    """Реестр открытых WebSocket сессий VR клиентов по пользователям."""
+
+    def __init__(self):
+        self._sessions: dict[int, set[ClientSession]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def register(self, client: ClientSession) -> None:
+        self._sessions.setdefault(client.user_id, set()).add(client)
+
+    def unregister(self, client: ClientSession) -> None:
+        sessions = self._sessions.get(client.user_id)
+        if sessions is None:
+            return
+        sessions.discard(client)
+        if not sessions:
+            del self._sessions[client.user_id]
+
+    def sessions(self) -> list[ClientSession]:
+        return [client for sessions in self._sessions.values() for client in sessions]
+
+    def snapshot(self) -> list[dict]:
+        return [client.as_dict() for client in self.sessions()]
+
+    async def send_to_user(self, user_id: int, message: str) -> None:
+        for client in list(self._sessions.get(user_id, ())):
+            try:
+                await client.websocket.send_text(message)
+            except Exception as e:
+                print(f"Ошибка отправки в сессию пользователя {user_id}: {e}")
+
+    def assignments_changed(self, user_ids: list[int]) -> None:
+        # Вызывается после коммита, ответ на HTTP запрос не ждет рассылки
+        connected = [user_id for user_id in set(user_ids) if user_id in self._sessions]
+        if not connected:
+            return
+        task = asyncio.get_running_loop().create_task(self.push_assignments(connected))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def push_assignments(self, user_ids: list[int]) -> None:
+        async with async_session_maker() as session:
+            assignments = await get_open_assignments(session=session, user_ids=user_ids)
+        for user_id in user_ids:
+            await self.send_to_user(user_id, render_assignments(assignments.get(user_id, [])))
+
+
+async def get_open_assignments(session, user_ids: list[int]) -> dict[int, list[dict]]:
+    query = (
+        select(Admission.user_id, Admission.id, Admission.status, Scenario.id, Scenario.name)
+        .join(Scenario, Scenario.id == Admission.scenario_id)
+        .where(Admission.user_id.in_(user_ids), AdmissionStatus.COMPLETED != Admission.status)
+        .order_by(Admission.id)
+    )
+    result = await session.execute(query)
+    assignments: dict[int, list[dict]] = {}
+    for user_id, admission_id, status, scenario_id, scenario_name in result:
+        assignments.setdefault(user_id, []).append({
+            "id": admission_id,
+            "status": status.name,
+            "scenario": {"id": scenario_id, "name": scenario_name},
+        })
+    return assignments
+
+
+async def is_user_active(session, user_id: int) -> bool:
+    # Токен живет до часа: пользователь, отключенный после входа, не должен открыть сессию
+    result = await session.execute(select(User.is_active).where(user_id == User.id))
+    return bool(result.scalar_one_or_none())
+
+
+async def get_admission_owner(session, admission_id: int) -> int | None:
+    result = await session.execute(select(Admission.user_id).where(admission_id == Admission.id))
+    return result.scalar_one_or_none()
+
+
+def render_assignments(assignments: list[dict]) -> str:
+    return dumps({"type": "assignments", "admissions": assignments}).decode()
+
+
+session_hub = SessionHub()
+
+
+def notify_assignments_changed(user_ids: list[int]) -> None:
+    session_hub.assignments_changed(user_ids)
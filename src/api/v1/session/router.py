@@ -0,0 +1,136 @@
+import time
+
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from src.api.v1.admission.crud import submit_admission_result, AdmissionResultBusy
+from src.api.v1.session.hub import (ClientSession, session_hub, get_open_assignments, render_assignments,
+                                    notify_assignments_changed, is_user_active, get_admission_owner)
+from src.auth.base_config import read_token_claims
+from src.database import async_session_maker
+from src.launcher.handoff import render_handoff_message
+from src.scenario.cache import get_admission_payload
+
+router = APIRouter(
+    prefix='/api/v1',
+    tags=['API'],
+)
+
+
+def get_websocket_token(websocket: WebSocket) -> str | None:
+    # Клиент передает тот же JWT, что и браузер: заголовком, cookie или параметром строки запроса
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return websocket.cookies.get("user-cookie") or websocket.query_params.get("token")
+
+
+@router.websocket("/session/")
+async def session_channel(websocket: WebSocket):
+    """
+    Постоянный канал VR клиента. Аутентификация один раз при подключении.
+
+    Клиент -> сервер: start {admission_id}, progress {admission_id, ...},
+    result {admission_id, rating, status, idempotency_key, sequence}, ping.
+    Сервер -> клиент: assignments (при подключении и при изменении задач), admission (сценарий),
+    result_ack, pong, error.
+    """
+    claims = read_token_claims(get_websocket_token(websocket))
+    if claims is None or not claims.get("is_active", True):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id = int(claims["sub"])
+
+    # Соединение с БД берется только на время обработки сообщения, а не на всю сессию
+    async with async_session_maker() as session:
+        if not await is_user_active(session=session, user_id=user_id):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        assignments = await get_open_assignments(session=session, user_ids=[user_id])
+
+    await websocket.accept()
+    client = ClientSession(user_id=user_id, websocket=websocket)
+    session_hub.register(client)
+    try:
+        await websocket.send_text(render_assignments(assignments.get(user_id, [])))
+
+        while True:
+            try:
+                message = orjson.loads(await websocket.receive_text())
+                message_type = message["type"]
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                await send_error(websocket, "Invalid message")
+                continue
+            client.last_event_at = time.time()
+            client.events += 1
+
+            if message_type == "ping":
+                await websocket.send_text('{"type":"pong"}')
+            elif message_type == "start":
+                await handle_start(client, message)
+            elif message_type == "progress":
+                handle_progress(client, message)
+            elif message_type == "result":
+                await handle_result(client, message)
+            else:
+                await send_error(websocket, f"Unknown message type: {message_type}")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session_hub.unregister(client)
+
+
+async def send_error(websocket: WebSocket, detail: str) -> None:
+    await websocket.send_text(orjson.dumps({"type": "error", "detail": detail}).decode())
+
+
+async def handle_start(client: ClientSession, message: dict) -> None:
+    admission_id = message.get("admission_id")
+    if not isinstance(admission_id, int):
+        await send_error(client.websocket, "admission_id is required")
+        return
+    async with async_session_maker() as session:
+        # Чужая задача отвечается так же, как несуществующая
+        if await get_admission_owner(session=session, admission_id=admission_id) != client.user_id:
+            payload = None
+        else:
+            payload = await get_admission_payload(session=session, admission_id=admission_id)
+    if payload is None:
+        await send_error(client.websocket, "Admission not found")
+        return
+    client.admission_id = admission_id
+    client.progress = None
+    # Тот же кадр, что и в локальном канале запуска, без завершающего перевода строки
+    await client.websocket.send_text(render_handoff_message(admission_id, payload)[:-1].decode())
+
+
+def handle_progress(client: ClientSession, message: dict) -> None:
+    client.admission_id = message.get("admission_id", client.admission_id)
+    client.progress = message
+
+
+async def handle_result(client: ClientSession, message: dict) -> None:
+    admission_id = message.get("admission_id", client.admission_id)
+    if not isinstance(admission_id, int):
+        await send_error(client.websocket, "admission_id is required")
+        return
+    try:
+        async with async_session_maker() as session:
+            outcome = await submit_admission_result(session=session, admission_id=admission_id,
+                                                    rating=message.get("rating"), status=message.get("status"),
+                                                    key=message.get("idempotency_key"),
+                                                    sequence=message.get("sequence"), user_id=client.user_id)
+    except (ValueError, AdmissionResultBusy) as e:
+        await send_error(client.websocket, str(e))
+        return
+    except Exception as e:
+        print(e)
+        await send_error(client.websocket, "Result was not saved")
+        return
+    if outcome is None:
+        await send_error(client.websocket, "Admission not found")
+        return
+    await client.websocket.send_text(orjson.dumps({"type": "result_ack", "admission_id": admission_id,
+                                                   "replayed": not outcome.applied}).decode())
+    if outcome.applied:
+        notify_assignments_changed([outcome.user_id])
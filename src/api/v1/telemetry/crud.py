@@ -0,0 +1,26 @@
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from src.auth.models import Admission
+from src.database import async_session_maker
+
+KNOWN_ADMISSIONS_SIZE = 1024
+
+# Задачи, для которых уже принимали телеметрию. Сессия шлет десятки пачек по одной задаче,
+# проверка в БД нужна только для первой
+_known_admissions: OrderedDict[int, None] = OrderedDict()
+
+
+async def admission_exists(admission_id: int) -> bool:
+    if admission_id in _known_admissions:
+        _known_admissions.move_to_end(admission_id)
+        return True
+    async with async_session_maker() as session:
+        result = await session.execute(select(Admission.id).where(admission_id == Admission.id))
+        if result.scalar_one_or_none() is None:
+            return False
+    _known_admissions[admission_id] = None
+    if len(_known_admissions) > KNOWN_ADMISSIONS_SIZE:
+        _known_admissions.popitem(last=False)
+    return True
@@ -0,0 +1,45 @@
+import asyncio
+
+from fastapi import APIRouter, Request, Response
+
+from src.api.v1.responses import UnityJSONResponse
+from src.api.v1.telemetry.crud import admission_exists
+from src.config import TELEMETRY_MAX_BATCH, TELEMETRY_FLUSH_INTERVAL
+from src.telemetry.batch import decode_batch
+from src.telemetry.buffer import telemetry_buffer, TelemetryBufferFull
+
+# Пачки больше этого размера разбираются в потоке, чтобы не задерживать event loop
+INLINE_DECODE_BYTES = 64 * 1024
+
+router = APIRouter(
+    prefix='/api/v1',
+    tags=['API'],
+    default_response_class=UnityJSONResponse,
+)
+
+
+@router.post("/telemetry/{admission_id}/")
+async def post_telemetry_batch(admission_id: int, request: Request):
+    try:
+        body = await request.body()
+        encoding = request.headers.get("content-encoding")
+        try:
+            if len(body) > INLINE_DECODE_BYTES:
+                rows = await asyncio.to_thread(decode_batch, body, encoding, admission_id, TELEMETRY_MAX_BATCH)
+            else:
+                rows = decode_batch(body, encoding, admission_id, TELEMETRY_MAX_BATCH)
+        except ValueError as e:
+            return Response(status_code=400, content=str(e), media_type="text/plain")
+
+        if not await admission_exists(admission_id):
+            return Response(status_code=404, content="Admission not found", media_type="text/plain")
+
+        try:
+            telemetry_buffer.add(rows)
+        except TelemetryBufferFull:
+            return Response(status_code=503, content="Telemetry buffer is full", media_type="text/plain",
+                            headers={"Retry-After": str(max(int(TELEMETRY_FLUSH_INTERVAL), 1))})
+        return UnityJSONResponse(status_code=202, content={"accepted": len(rows)})
+    except Exception as e:
+        print(e)
+        return Response(status_code=500, content=str(e))
@@ -1,17 +1,73 @@
+from typing import Optional
+
+import jwt
 from fastapi import Depends, HTTPException, status
-from fastapi_users import FastAPIUsers
+from fastapi_users import FastAPIUsers, BaseUserManager, exceptions
 from fastapi_users.authentication import CookieTransport, AuthenticationBackend
 from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
 
+from src.auth.cache import user_identity_cache
 from src.auth.manager import get_user_manager
 from src.auth.models import User
 from src.config import SECRET_KEY
 
 cookie_transport = CookieTransport(cookie_name="user-cookie", cookie_max_age=3600)
 
+ROLE_CLAIMS = ("is_staff", "is_superuser", "is_active")
+
+
+class RoleClaimsJWTStrategy(JWTStrategy):
+    """
+    JWT с ролями пользователя в claims.
+
+    Пользователь по токену берется из кэша (src.auth.cache), в БД идем только при промахе.
+    Роли из токена позволяют проверить доступ вообще без пользователя (см. read_token_claims).
+    """
+
+    async def write_token(self, user: User) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience}
+        for claim in ROLE_CLAIMS:
+            data[claim] = bool(getattr(user, claim))
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    async def read_token(self, token: Optional[str], user_manager: BaseUserManager[User, int]) -> Optional[User]:
+        data = self.read_claims(token)
+        if data is None or not data.get("is_active", True):
+            return None
+        try:
+            user_id = user_manager.parse_id(data["sub"])
+        except exceptions.InvalidID:
+            return None
+
+        user = user_identity_cache.get(user_id)
+        if user is not None:
+            return user
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+        user_identity_cache.set(user)
+        return user
+
+    def read_claims(self, token: Optional[str]) -> Optional[dict]:
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+        except jwt.PyJWTError:
+            return None
+        if data.get("sub") is None:
+            return None
+        return data
+
+
+def get_jwt_strategy() -> RoleClaimsJWTStrategy:
+    return RoleClaimsJWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
+
 
-def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
+def read_token_claims(token: Optional[str]) -> Optional[dict]:
+    return get_jwt_strategy().read_claims(token)
 
 
 auth_backend = AuthenticationBackend(
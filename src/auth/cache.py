@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.auth.models import User
+from src.config import AUTH_USER_CACHE_TTL, AUTH_USER_CACHE_SIZE
+
+# По таблице, а не inspect(User): модуль импортируется до того, как объявлены все модели
+USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class UserIdentityCache:
+    """
+    Кэш пользователей для current_user по id из JWT.
+
+    Хранится не сам объект User (он привязан к сессии запроса, который его загрузил), а снимок
+    его колонок. Каждый запрос получает из снимка свой отсоединенный User без связей, поэтому
+    изменения в одном запросе не видны другим. Записей не больше max_size: при переполнении
+    вытесняется та, к которой дольше всего не обращались, истекшие удаляются при обращении.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+
+    def get(self, user_id: int) -> User | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, columns = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        self._entries.move_to_end(user_id)
+        user = User(**columns)
+        # Отсоединенный, а не новый объект: session.add(user) обновит строку, а не вставит ее еще раз
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User) -> None:
+        columns = {key: getattr(user, key) for key in USER_COLUMNS}
+        self._entries[user.id] = (time.monotonic() + self.ttl, columns)
+        self._entries.move_to_end(user.id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_identity_cache = UserIdentityCache(ttl=AUTH_USER_CACHE_TTL, max_size=AUTH_USER_CACHE_SIZE)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_identity_cache.invalidate(user_id)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from src.config import AUTH_HASH_WORKERS, AUTH_HASH_MAX_QUEUE
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Очередь на хэширование заполнена, вход нужно повторить позже."""
+
+
+class PasswordHashingPool:
+    """
+    Ограниченный пул потоков для Argon2/bcrypt.
+
+    Хэширование занимает десятки миллисекунд CPU и в event loop останавливало бы все запросы,
+    включая API для VR клиента. Здесь одновременно выполняется не больше workers хэшей,
+    еще max_queue ждут своей очереди, остальные сразу получают PasswordHashingBusy.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        executor = self._get_executor()
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusy()
+
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - start
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.running -= 1
+            self.completed += 1
+            self.run_total += elapsed
+            self.run_max = max(self.run_max, elapsed)
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_ms": self.wait_total / self.completed * 1000 if self.completed else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+            "run_avg_ms": self.run_total / self.completed * 1000 if self.completed else 0.0,
+            "run_max_ms": self.run_max * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+
+password_hashing = PasswordHashingPool(workers=AUTH_HASH_WORKERS, max_queue=AUTH_HASH_MAX_QUEUE)
+
+
+async def hash_password(password_helper, password: str) -> str:
+    return await password_hashing.run(password_helper.hash, password)
+
+
+async def verify_and_update_password(password_helper, password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await password_hashing.run(password_helper.verify_and_update, password, hashed_password)
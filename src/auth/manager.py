@@ -6,6 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.hashing import hash_password, verify_and_update_password
 from src.auth.models import User
 from src.auth.utils import get_user_db
 from src.config import SECRET_KEY
@@ -38,7 +39,7 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
             else user_create.create_update_dict_superuser()
         )
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = self.password_helper.hash(password)
+        user_dict["hashed_password"] = await hash_password(self.password_helper, password)
         user_dict["is_staff"] = False
         user_dict["is_superuser"] = False
 
@@ -54,11 +55,12 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
         try:
             user = await self.get_by_email(credentials.username)
         except exceptions.UserNotExists:
-            self.password_helper.hash(credentials.password)
+            # Хэш все равно считается, чтобы время ответа не выдавало существование пользователя
+            await hash_password(self.password_helper, credentials.password)
             return None
 
-        verified, updated_password_hash = self.password_helper.verify_and_update(
-            credentials.password, user.hashed_password
+        verified, updated_password_hash = await verify_and_update_password(
+            self.password_helper, credentials.password, user.hashed_password
         )
         if not verified:
             return None
@@ -79,8 +81,8 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
         if not user:
             return None
 
-        verified, updated_password_hash = self.password_helper.verify_and_update(
-            credentials.password, user.hashed_password
+        verified, updated_password_hash = await verify_and_update_password(
+            self.password_helper, credentials.password, user.hashed_password
         )
         if not verified:
             return None
@@ -1,13 +1,13 @@
-import json
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from enum import Enum
 
+import orjson
 from fastapi_users.db import SQLAlchemyBaseUserTable
 from sqlalchemy import Integer, String, Boolean, ForeignKey, Column, TIMESTAMP, Enum as SQLAEnum, Table, select, func, \
-    Float, DateTime
+    DateTime, Index, Numeric
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from slugify import slugify
 
 from src.database import Base
 
@@ -27,18 +27,18 @@ class User(SQLAlchemyBaseUserTable[int], Base):
 
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=True, doc="Почта")
     username: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, doc="Пользовательское имя")
-    registered_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=datetime.utcnow)
+    registered_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=datetime.utcnow, index=True)
     first_name: Mapped[str] = mapped_column(String(255), doc="Имя")
-    last_name: Mapped[str] = mapped_column(String(255), doc="Фамилия")
+    last_name: Mapped[str] = mapped_column(String(255), index=True, doc="Фамилия")
     patronymic: Mapped[str] = mapped_column(String(50), nullable=True, doc="Отчество")
     is_staff: Mapped[bool] = mapped_column(Boolean, default=False, doc="Сотрудник")
     hashed_password: Mapped[str] = mapped_column(String(1024), nullable=False, doc="Пароль")
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, doc="Активный пользователь")
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, doc="Супер пользователь")
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, doc="Верификация")
-    division: Mapped[str] = mapped_column(String(50), doc="Подразделение")
+    division: Mapped[str] = mapped_column(String(50), index=True, doc="Подразделение")
     #  Обратная совместимость
-    admissions: Mapped["Admission"] = relationship("Admission", back_populates="user", lazy="selectin")
+    admissions: Mapped["Admission"] = relationship("Admission", back_populates="user", lazy="raise")
 
 
 class AdmissionStatus(Enum):
@@ -48,10 +48,20 @@ class AdmissionStatus(Enum):
     EXAMINATION = "Проверяется"
 
 
+RATING_MIN = Decimal(0)
+RATING_MAX = Decimal(10)
+RATING_STEP = Decimal("0.1")
+
+
 class Admission(Base):
     __tablename__ = "admission"
+    __table_args__ = (
+        # Для анти-join "пользователи без сценария" и проверки дублей при назначении задач
+        Index("ix_admission_scenario_id_user_id", "scenario_id", "user_id"),
+    )
 
-    rating: Mapped[str] = mapped_column(String(4), nullable=True, default="0", doc="Рейтинг")
+    # Шкала оценок RATING_MIN..RATING_MAX; в колонке остаются и числа из старой строковой колонки вне шкалы
+    rating: Mapped[Decimal] = mapped_column(Numeric(3, 1), nullable=True, default=0, doc="Рейтинг")
     status: Mapped[AdmissionStatus] = mapped_column(SQLAEnum(AdmissionStatus), default=AdmissionStatus.INACTIVE,
                                                     nullable=False, doc="Статус заявки")
     #  Создание связи ForeignKey
@@ -59,90 +69,73 @@ class Admission(Base):
     scenario_id: Mapped[int] = mapped_column(ForeignKey("scenario.id"), nullable=False)
     # Связь объектов(ForeignKey)
     user = relationship("User", back_populates="admissions", foreign_keys="Admission.user_id",
-                                        lazy="selectin")
+                                        lazy="raise")
     scenario = relationship("Scenario", back_populates="admissions",
-                                                foreign_keys="Admission.scenario_id", lazy="selectin")
+                                                foreign_keys="Admission.scenario_id", lazy="raise")
     is_ready = mapped_column(DateTime, nullable=True, default=None, doc="Время, когда поставили оценку")
+    assigned_at = mapped_column(DateTime, nullable=True, default=datetime.utcnow, doc="Время назначения задачи")
+    # Последняя записанная отправка результата из VR клиента (см. src.api.v1.admission.crud)
+    result_key = mapped_column(String(64), nullable=True, doc="Ключ идемпотентности результата")
+    result_seq = mapped_column(Integer, nullable=True, doc="Номер отправки результата")
 
     @classmethod
     async def get_average_rating_for_user(cls, user_id: int, session: AsyncSession) -> float:
         result = await session.execute(
-            select(func.avg(cls.rating).cast(Float)).where(user_id == cls.user_id)
+            select(func.avg(cls.rating)).where(user_id == cls.user_id)
         )
         average_rating = result.scalar()
-        return average_rating or 0.0
+        return float(average_rating or 0)
 
     @staticmethod
     def set_rating(instance, value):
-        instance.rating = value
-        if value is not None and value != "0":
+        instance.rating = Admission.parse_rating(value)
+        if instance.rating:
             instance.is_ready = datetime.utcnow()
             instance.status = "COMPLETED"
         else:
             instance.is_ready = None
 
+    @staticmethod
+    def parse_rating(value) -> Decimal | None:
+        """
+        Оценка из формы или от VR клиента. Число вне шкалы, NaN и бесконечность - ValueError.
+        Результат уже округлен до десятых, как его сохранит колонка, поэтому итоги считаются
+        по тому же значению, что окажется в строке.
+        """
+        if value is None or value == "":
+            return None
+        if isinstance(value, bool):
+            raise ValueError(f"Invalid rating: {value}")
+        try:
+            rating = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid rating: {value}")
+        if not rating.is_finite() or not RATING_MIN <= rating <= RATING_MAX:
+            raise ValueError(f"Rating must be between {RATING_MIN} and {RATING_MAX}: {value}")
+        return Admission.quantize_rating(rating)
+
+    @staticmethod
+    def quantize_rating(value) -> Decimal | None:
+        # Без проверки шкалы: для уже сохраненных оценок
+        if value is None or value == "":
+            return None
+        return Decimal(str(value)).quantize(RATING_STEP, rounding=ROUND_HALF_UP)
+
     def json_obj(self, dump=False):
         json_object = {
             'response': {
                 'id': self.id,
                 'status': 200,
-                'scenario': {
-                    'id': self.scenario.id,
-                    'name': self.scenario.name,
-                    'location': {
-                        'name': self.scenario.location.name,
-                        'prefab': self.scenario.location.prefab,
-                        'sensors': [
-                            {
-                                'id': sensor.id,
-                                'name': sensor.model.model_type.name,
-                                'KKS': sensor.KKS,
-                                'model': {
-                                    'id': sensor.model.id,
-                                    'name': sensor.model.model_type.name,
-                                    'specification': {
-                                        self.scenario.sensor.model.param_mapping_names[key]: value
-                                        for key, value in self.scenario.sensor.model.specification.items()
-                                    },
-                                }
-                            }
-                            for sensor in self.scenario.location.sensors
-                        ],
-                    },
-                    'sensor': {
-                        'id': self.scenario.sensor.id,
-                        'name': self.scenario.sensor.name,
-                        'KKS': self.scenario.sensor.KKS,
-                        'model': {
-                            'id': self.scenario.sensor.model.id,
-                            'name': self.scenario.sensor.model.model_type.name,
-                            'specification': {
-                                self.scenario.sensor.model.param_mapping_names[key]: value
-                                for key, value in self.scenario.sensor.model.specification.items()
-                            },
-                        }
-                    },
-                    'accidents': [
-                        {
-                            'name': accident.name,
-                            'mechanical_accident': accident.mechanical_accident,
-                            'change_value': {
-                                accident.param_mapping_names[key]: value
-                                for key, value in accident.change_value.items()
-                            },
-                        }
-                        for accident in self.scenario.accidents
-                    ]
-                }
+                'scenario': self.scenario.json_obj(),
             }
         }
         if not dump:
             return json_object
         else:
-            return json.dumps(json_object, ensure_ascii=False)
+            return orjson.dumps(json_object).decode()
 
     def json_id(self):
-        return json.dumps({'id': self.id}, ensure_ascii=False)
+        return orjson.dumps({'id': self.id}).decode()
 
     def __str__(self):
         return f"ID: {self.id} | name: {self.scenario.name} | Rating: {self.rating}"
@@ -151,22 +144,78 @@ class Admission(Base):
 class Scenario(Base):
     __tablename__ = "scenario"
 
-    name = Column(String(255), nullable=False, doc="Название сценария")
+    name = Column(String(255), nullable=False, index=True, doc="Название сценария")
     # Связь с Sensor
     sensor_id: Mapped[int] = mapped_column(ForeignKey("sensor.id"), nullable=False)
     sensor = relationship("Sensor",
                           back_populates="scenarios",
                           foreign_keys='Scenario.sensor_id',
-                          lazy='selectin')
+                          lazy='raise')
 
     # Связь с Location
     location_id: Mapped[int] = mapped_column(ForeignKey("location.id"), nullable=False)
     location = relationship("Location", back_populates="scenarios",
-                            foreign_keys='Scenario.location_id', lazy='selectin')
+                            foreign_keys='Scenario.location_id', lazy='raise')
 
     # Обратная совместимость
-    admissions = relationship("Admission", back_populates="scenario", lazy="selectin")
+    admissions = relationship("Admission", back_populates="scenario", lazy="raise")
     accidents = relationship("Accident",
                              secondary=scenario_accident_association,
                              back_populates="scenarios",
-                             lazy="selectin")
\ No newline at end of file
+                             lazy="raise")
+
+    def location_sensor_json_obj(self, sensor) -> dict:
+        return {
+            'id': sensor.id,
+            'name': sensor.model.model_type.name,
+            'KKS': sensor.KKS,
+            'model': {
+                'id': sensor.model.id,
+                'name': sensor.model.model_type.name,
+                'specification': {
+                    self.sensor.model.param_mapping_names[key]: value
+                    for key, value in self.sensor.model.specification.items()
+                },
+            }
+        }
+
+    def sensor_json_obj(self) -> dict:
+        return {
+            'id': self.sensor.id,
+            'name': self.sensor.name,
+            'KKS': self.sensor.KKS,
+            'model': {
+                'id': self.sensor.model.id,
+                'name': self.sensor.model.model_type.name,
+                'specification': {
+                    self.sensor.model.param_mapping_names[key]: value
+                    for key, value in self.sensor.model.specification.items()
+                },
+            }
+        }
+
+    def accidents_json_obj(self) -> list[dict]:
+        return [
+            {
+                'name': accident.name,
+                'mechanical_accident': accident.mechanical_accident,
+                'change_value': {
+                    accident.param_mapping_names[key]: value
+                    for key, value in accident.change_value.items()
+                },
+            }
+            for accident in self.accidents
+        ]
+
+    def json_obj(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'location': {
+                'name': self.location.name,
+                'prefab': self.location.prefab,
+                'sensors': [self.location_sensor_json_obj(sensor) for sensor in self.location.sensors],
+            },
+            'sensor': self.sensor_json_obj(),
+            'accidents': self.accidents_json_obj(),
+        }
@@ -10,3 +10,56 @@ DB_PORT = os.environ.get("DB_PORT")
 DB_USER = os.environ.get("DB_USER")
 
 SECRET_KEY = os.environ.get("SECRET_KEY")
+
+# Режим отладки: подробные ошибки в ответах и журнал uvicorn уровня debug
+DEBUG = os.environ.get("DEBUG", "true").lower() in ("1", "true", "yes")
+
+# Встроенная БД для автономной станции: DB_ENGINE=sqlite - файл DB_SQLITE_PATH в режиме WAL вместо MySQL.
+# Схема создается по моделям при старте (миграции alembic только для MySQL)
+DB_ENGINE = os.environ.get("DB_ENGINE", "mysql").lower()
+DB_SQLITE_PATH = os.environ.get("DB_SQLITE_PATH", "ispu.sqlite3")
+# Сколько соединение ждет блокировку записи другого соединения, мс
+DB_SQLITE_BUSY_TIMEOUT = int(os.environ.get("DB_SQLITE_BUSY_TIMEOUT", 5000))
+DB_SQLITE_CACHE_MB = int(os.environ.get("DB_SQLITE_CACHE_MB", 64))
+DB_SQLITE_MMAP_MB = int(os.environ.get("DB_SQLITE_MMAP_MB", 256))
+
+# Пул соединений с MySQL
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+# Должен быть меньше wait_timeout MySQL, иначе пул отдает уже закрытые сервером соединения
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", 10))
+
+# Время жизни записи в кэше пользователей (сек). Изменения ролей применяются не позже этого срока
+AUTH_USER_CACHE_TTL = float(os.environ.get("AUTH_USER_CACHE_TTL", 60))
+# Сколько пользователей держит кэш; при переполнении вытесняются давно не заходившие
+AUTH_USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", 1024))
+
+# Хэширование паролей: число потоков (Argon2/bcrypt отпускают GIL) и предел очереди ожидающих входов.
+# Сверх предела вход отклоняется сразу, а не копится в памяти
+AUTH_HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+AUTH_HASH_MAX_QUEUE = int(os.environ.get("AUTH_HASH_MAX_QUEUE", 64))
+
+# VR клиент (Unity) на станции: исполняемый файл и локальный канал передачи задач.
+# Порт передается клиенту аргументом -ispuIpcPort, клиент сам подключается к серверу
+UNITY_EXE_PATH = os.environ.get("UNITY_EXE_PATH", "C:\\Users\\treen\\Desktop\\build\\Myproject.exe")
+UNITY_IPC_HOST = os.environ.get("UNITY_IPC_HOST", "127.0.0.1")
+UNITY_IPC_PORT = int(os.environ.get("UNITY_IPC_PORT", 47800))
+# Файл задачи для клиента, который еще не подключился к каналу (или старой сборки без канала)
+UNITY_SCENARIO_FILE = os.environ.get("UNITY_SCENARIO_FILE", "C:\\Users\\treen\\Desktop\\text.json")
+# Сколько ждать подключения только что запущенного клиента, прежде чем считать его сборкой без канала
+UNITY_CONNECT_TIMEOUT = float(os.environ.get("UNITY_CONNECT_TIMEOUT", 60))
+
+# Телеметрия VR сессий: события копятся в памяти и пишутся в БД пачками.
+# Сверх TELEMETRY_MAX_BUFFER событий новые пачки отклоняются (503), клиент досылает их позже
+TELEMETRY_FLUSH_SIZE = int(os.environ.get("TELEMETRY_FLUSH_SIZE", 2000))
+TELEMETRY_FLUSH_INTERVAL = float(os.environ.get("TELEMETRY_FLUSH_INTERVAL", 1))
+TELEMETRY_MAX_BUFFER = int(os.environ.get("TELEMETRY_MAX_BUFFER", 100000))
+TELEMETRY_MAX_BATCH = int(os.environ.get("TELEMETRY_MAX_BATCH", 10000))
+
+# Бюджет SQL запросов маршрутов и crud (src/query_budget.py): log - печатать превышения,
+# raise - еще и бросать исключение (для тестов), off - не считать. По умолчанию считается только
+# при DEBUG: в рабочем режиме декораторы бюджета не оборачивают функции
+QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "log" if DEBUG else "off").lower()
@@ -1,12 +1,38 @@
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Callable, Sequence
 
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, Table, event
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from src.config import DB_HOST, DB_PORT, DB_USER, DB_NAME, DB_PASS
+from src.config import (DB_HOST, DB_PORT, DB_USER, DB_NAME, DB_PASS, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                        DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_CONNECT_TIMEOUT, DB_ENGINE, DB_SQLITE_PATH,
+                        DB_SQLITE_BUSY_TIMEOUT, DB_SQLITE_CACHE_MB, DB_SQLITE_MMAP_MB)
+from src.metrics import current_request_metrics, record_query
+from src.query_budget import record_statement
 
-DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Автономная станция: SQLite в одном файле рядом с сервером, без службы MySQL и TCP
+EMBEDDED_DB = DB_ENGINE == "sqlite"
+
+if EMBEDDED_DB:
+    DATABASE_URL = f"sqlite+aiosqlite:///{DB_SQLITE_PATH}"
+else:
+    DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# WAL: чтения не ждут запись. synchronous=NORMAL в WAL не теряет целостность, только последние
+# транзакции при отключении питания. Внешние ключи SQLite по умолчанию не проверяет, MySQL проверяет
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    f"PRAGMA busy_timeout={DB_SQLITE_BUSY_TIMEOUT}",
+    f"PRAGMA cache_size=-{DB_SQLITE_CACHE_MB * 1024}",
+    f"PRAGMA mmap_size={DB_SQLITE_MMAP_MB * 1024 * 1024}",
+    "PRAGMA temp_store=MEMORY",
+)
 
 
 class Base(DeclarativeBase):
@@ -24,9 +50,153 @@ class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
 
-engine = create_async_engine(DATABASE_URL)
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.errors = 0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        metrics = current_request_metrics()
+        if metrics is not None:
+            metrics.pool_wait += seconds
+
+    def record_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.connect_total += seconds
+        self.connect_max = max(self.connect_max, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул, который замеряет время получения соединения и время установки нового соединения.
+    Время получения включает и подключение, если свободных соединений не было и пул открыл новое.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            pool_stats.errors += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            pool_stats.record_connect(time.perf_counter() - start)
+
+
+if EMBEDDED_DB:
+    # Файл локальный: соединения не рвутся сервером, recycle и pre_ping не нужны
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        connect_args={"timeout": DB_SQLITE_BUSY_TIMEOUT / 1000},
+    )
+else:
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"connect_timeout": DB_CONNECT_TIMEOUT},
+    )
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+if EMBEDDED_DB:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_started_at = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Число запросов и время в БД текущего HTTP запроса (Server-Timing и /internal/metrics)
+    record_query(time.perf_counter() - context.metrics_started_at)
+    record_statement(statement)
+
+
+def upsert(table: Table, index_elements: Sequence[str], update: Callable, values: dict | None = None):
+    """
+    INSERT, который при конфликте уникального ключа обновляет строку:
+    ON DUPLICATE KEY UPDATE в MySQL, ON CONFLICT (index_elements) DO UPDATE в SQLite.
+
+    update(new) -> [(колонка, выражение), ...], где new - значения вставляемой строки
+    (stmt.inserted в MySQL, stmt.excluded в SQLite). SQLite в выражениях всегда видит старые
+    значения строки, MySQL - уже новые для колонок, обновленных раньше в этом же списке.
+    """
+    if EMBEDDED_DB:
+        stmt = sqlite_insert(table)
+        if values is not None:
+            stmt = stmt.values(values)
+        return stmt.on_conflict_do_update(index_elements=index_elements, set_=dict(update(stmt.excluded)))
+    stmt = mysql_insert(table)
+    if values is not None:
+        stmt = stmt.values(values)
+    return stmt.on_duplicate_key_update(update(stmt.inserted))
+
+
+async def init_embedded_database() -> None:
+    # Создает недостающие таблицы встроенной БД по моделям; существующие не меняет
+    from src.auth.models import User, Admission, Scenario  # noqa: F401
+    from src.sensor.models import Model, ModelType, Accident, Location, Sensor, ModelValue  # noqa: F401
+    from src.stats.models import UserTrainingStats, ScenarioTrainingStats, DivisionTrainingStats  # noqa: F401
+    from src.telemetry.models import TelemetryEvent  # noqa: F401
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+def get_pool_status() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool считает overflow от -pool_size, отрицательное значение - пул еще не заполнен
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+        "recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+        "checkouts": pool_stats.checkouts,
+        "checkout_errors": pool_stats.errors,
+        "wait_avg_ms": pool_stats.wait_total / pool_stats.checkouts * 1000 if pool_stats.checkouts else 0.0,
+        "wait_max_ms": pool_stats.wait_max * 1000,
+        "connects": pool_stats.connects,
+        "connect_avg_ms": pool_stats.connect_total / pool_stats.connects * 1000 if pool_stats.connects else 0.0,
+        "connect_max_ms": pool_stats.connect_max * 1000,
+    }
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
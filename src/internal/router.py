@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from src.api.v1.session.hub import session_hub
+from src.auth.hashing import password_hashing
+from src.database import get_pool_status
+from src.launcher.runtime import unity_runtime
+from src.metrics import route_metrics
+from src.telemetry.buffer import telemetry_buffer
+
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+async def local_only(request: Request):
+    # Служебные эндпоинты доступны только с самой станции
+    if request.client is None or request.client.host not in LOCAL_HOSTS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have access to this resource",
+        )
+
+
+router = APIRouter(
+    prefix='/internal',
+    tags=['Internal'],
+    dependencies=[Depends(local_only)],
+)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    return get_pool_status()
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_stats():
+    return password_hashing.stats()
+
+
+@router.get("/unity-runtime")
+async def get_unity_runtime_stats():
+    return unity_runtime.stats()
+
+
+@router.get("/sessions")
+async def get_client_sessions():
+    # Открытые сессии VR клиентов: кто подключен, какая задача и последний прогресс
+    return session_hub.snapshot()
+
+
+@router.get("/telemetry")
+async def get_telemetry_stats():
+    return telemetry_buffer.stats()
+
+
+@router.get("/metrics")
+async def get_route_metrics():
+    # Гистограммы по маршрутам: время ответа, число запросов к БД, время в БД, рендер и сериализация
+    return route_metrics.snapshot()
+
+
+@router.delete("/metrics")
+async def reset_route_metrics():
+    route_metrics.reset()
+    return {"detail": "Metrics reset"}
@@ -0,0 +1,34 @@
+import contextlib
+import os
+import tempfile
+
+
+def render_handoff_message(admission_id: int, payload: bytes) -> bytes:
+    """
+    Строка канала VR клиента: задача вместе с готовым сценарием.
+
+    payload - ответ GET /api/v1/admission/ из кэша сценариев, клиенту не нужно запрашивать его отдельно.
+    orjson не пишет переводов строк, поэтому одна задача - одна строка.
+    """
+    return b'{"type":"admission","id":%d,"payload":%s}\n' % (admission_id, payload)
+
+
+def render_handoff_file(admission_id: int, payload: bytes) -> bytes:
+    # Поле id оставлено на верхнем уровне для сборок, которые читают из файла только его
+    return b'{"id":%d,%s' % (admission_id, payload[1:])
+
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    """Пишет во временный файл рядом и подменяет целевой, клиент никогда не видит файл наполовину."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".scenario-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
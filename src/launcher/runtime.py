@@ -0,0 +1,220 @@
+import asyncio
+import os
+import subprocess
+import time
+
+from src.config import UNITY_EXE_PATH, UNITY_IPC_HOST, UNITY_IPC_PORT, UNITY_CONNECT_TIMEOUT, UNITY_SCENARIO_FILE
+from src.launcher.handoff import render_handoff_message, render_handoff_file, write_file_atomic
+
+
+def kill_processes_by_name(process_name: str) -> int:
+    # psutil нужен только при запуске клиента, не при старте сервера
+    import psutil
+
+    killed = 0
+    for proc in psutil.process_iter(["name"]):
+        try:
+            if proc.info["name"] == process_name:
+                proc.kill()
+                killed += 1
+                print(f"Процесс {process_name} завершен.")
+        except (psutil.ZombieProcess, psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return killed
+
+
+class LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "last_ms": self.last * 1000,
+        }
+
+
+class UnityRuntime:
+    """
+    Один постоянно запущенный ("теплый") VR клиент на станцию.
+
+    Клиент запускается один раз и подключается к локальному TCP каналу сервера. Следующие задачи
+    передаются ему строкой JSON по этому каналу вместе с готовым сценарием, без перезапуска
+    и без запроса к API. Пока клиент не подключен, задача также пишется в файл.
+    Процесс отслеживается по PID: перезапуск происходит только если он завершился (упал или был
+    закрыт) или еще не подключился к каналу (старая сборка читает задачу только при старте).
+    """
+
+    def __init__(self, path: str, host: str, port: int, connect_timeout: float, scenario_file: str):
+        self.path = path
+        self.scenario_file = scenario_file
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self._process: subprocess.Popen | None = None
+        self._server: asyncio.Server | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock: asyncio.Lock | None = None
+        # Задача, ожидающая подключения только что запущенного клиента
+        self._pending: bytes | None = None
+        self._launched_at: float | None = None
+
+        self.cold_launches = 0
+        self.relaunches = 0
+        self.legacy_relaunches = 0
+        # Перезапуски клиента, который еще загружался (не дольше connect_timeout) и не успел подключиться
+        self.loading_relaunches = 0
+        self.cold_ready = LatencyStats()
+        self.warm_handoff = LatencyStats()
+        self.file_handoff = LatencyStats()
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process is not None else None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def start_ipc(self) -> None:
+        if self._server is None:
+            self._server = await asyncio.start_server(self._on_client, self.host, self.port)
+
+    async def close(self) -> None:
+        # Сам клиент не останавливается: после перезапуска сервера он переподключится к каналу
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def start_admission(self, admission_id: int, payload: bytes) -> str:
+        """Передает задачу клиенту. Возвращает способ: warm или cold."""
+        message = render_handoff_message(admission_id, payload)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            await self.start_ipc()
+
+            if self.is_alive() and self.is_connected():
+                start = time.monotonic()
+                if await self._send(message):
+                    self.warm_handoff.record(time.monotonic() - start)
+                    return "warm"
+
+            # Клиент не подключен: файл пишется в потоке, чтобы диск не задерживал event loop
+            start = time.monotonic()
+            await asyncio.to_thread(write_file_atomic, self.scenario_file, render_handoff_file(admission_id, payload))
+            self.file_handoff.record(time.monotonic() - start)
+
+            if self.is_alive():
+                # Запущенный, но не подключенный клиент уже ждет или прочитал свою задачу: старая сборка
+                # читает файл только при старте, а подмена _pending у еще не подключенного клиента
+                # оставила бы ему прежний сценарий. Поэтому клиент перезапускается, как и до канала
+                if self._launched_at is not None and time.monotonic() - self._launched_at < self.connect_timeout:
+                    self.loading_relaunches += 1
+                else:
+                    self.legacy_relaunches += 1
+                await self._terminate()
+            elif self._process is not None:
+                self.relaunches += 1
+
+            await self._launch()
+            self._pending = message
+            return "cold"
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "pid": self.pid,
+            "alive": self.is_alive(),
+            "connected": self.is_connected(),
+            "cold_launches": self.cold_launches,
+            "relaunches": self.relaunches,
+            "legacy_relaunches": self.legacy_relaunches,
+            "loading_relaunches": self.loading_relaunches,
+            "cold_ready": self.cold_ready.as_dict(),
+            "warm_handoff": self.warm_handoff.as_dict(),
+            "file_handoff": self.file_handoff.as_dict(),
+        }
+
+    async def _launch(self) -> None:
+        if not os.path.exists(self.path):
+            raise IOError("Проект не найден")
+        if self._process is None:
+            # Экземпляр, оставшийся от прошлого запуска сервера, не отслеживается - закрываем его
+            await asyncio.to_thread(kill_processes_by_name, os.path.basename(self.path))
+        print("Начал запуск приложения Unity")
+        self._launched_at = time.monotonic()
+        self._process = await asyncio.to_thread(
+            subprocess.Popen,
+            [self.path, "-ispuIpcPort", str(self.port)],
+            cwd=os.path.dirname(self.path) or None,
+        )
+        self.cold_launches += 1
+        print(f"Запуск завершен, PID {self._process.pid}")
+
+    async def _terminate(self) -> None:
+        process = self._process
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if process is not None and process.poll() is None:
+            process.kill()
+            await asyncio.to_thread(process.wait, 10)
+
+    async def _send(self, message: bytes) -> bool:
+        writer = self._writer
+        try:
+            writer.write(message)
+            await writer.drain()
+            return True
+        except (ConnectionError, OSError) as e:
+            print(f"Канал VR клиента закрыт: {e}")
+            if self._writer is writer:
+                self._writer = None
+            return False
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self._writer is not None and self._writer is not writer:
+            self._writer.close()
+        self._writer = writer
+        if self._launched_at is not None:
+            self.cold_ready.record(time.monotonic() - self._launched_at)
+            self._launched_at = None
+        if self._pending is not None:
+            message, self._pending = self._pending, None
+            await self._send(message)
+        try:
+            while await reader.readline():
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+
+
+unity_runtime = UnityRuntime(
+    path=UNITY_EXE_PATH,
+    host=UNITY_IPC_HOST,
+    port=UNITY_IPC_PORT,
+    connect_timeout=UNITY_CONNECT_TIMEOUT,
+    scenario_file=UNITY_SCENARIO_FILE,
+)
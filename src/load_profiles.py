@@ -0,0 +1,85 @@
+"""
+Профили загрузки связей для запросов.
+
+Все relationship в моделях объявлены с lazy="raise", поэтому страница получает только то,
+что явно перечислено в её профиле. Каждый профиль дает фиксированное число запросов
+(joinedload для many-to-one, selectinload для коллекций) независимо от размера таблиц.
+
+Использование: select(Scenario).options(*SCENARIO_LIST)
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.auth.models import Admission, Scenario
+from src.sensor.models import Location, Model, Sensor
+
+# region Model
+MODEL_LIST = (
+    joinedload(Model.model_type),
+    selectinload(Model.accidents),
+)
+
+MODEL_DETAIL = MODEL_LIST
+
+MODEL_NAME = (
+    joinedload(Model.model_type),
+)
+# endregion
+
+# region Sensor
+SENSOR_LIST = (
+    joinedload(Sensor.model).options(
+        joinedload(Model.model_type),
+        selectinload(Model.accidents),
+    ),
+)
+
+SENSOR_DETAIL = SENSOR_LIST
+# endregion
+
+# region Location
+LOCATION_LIST = (
+    selectinload(Location.sensors).joinedload(Sensor.model).joinedload(Model.model_type),
+)
+
+LOCATION_DETAIL = (
+    selectinload(Location.sensors).joinedload(Sensor.model).options(
+        joinedload(Model.model_type),
+        selectinload(Model.accidents),
+    ),
+)
+# endregion
+
+# region Scenario
+SCENARIO_LIST = (
+    joinedload(Scenario.location),
+    joinedload(Scenario.sensor).joinedload(Sensor.model).joinedload(Model.model_type),
+    selectinload(Scenario.accidents),
+)
+
+SCENARIO_DETAIL = (
+    joinedload(Scenario.location).selectinload(Location.sensors).joinedload(Sensor.model).joinedload(
+        Model.model_type),
+    joinedload(Scenario.sensor).joinedload(Sensor.model).options(
+        joinedload(Model.model_type),
+        selectinload(Model.accidents),
+    ),
+    selectinload(Scenario.accidents),
+)
+
+SCENARIO_VR_PAYLOAD = (
+    joinedload(Scenario.location).selectinload(Location.sensors).joinedload(Sensor.model).joinedload(
+        Model.model_type),
+    joinedload(Scenario.sensor).joinedload(Sensor.model).joinedload(Model.model_type),
+    selectinload(Scenario.accidents),
+)
+# endregion
+
+# region Admission
+ADMISSION_LIST = (
+    joinedload(Admission.scenario).options(*SCENARIO_LIST),
+)
+
+ADMISSION_DETAIL = (
+    joinedload(Admission.scenario),
+)
+# endregion
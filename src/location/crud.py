@@ -1,21 +1,80 @@
-from typing import Sequence
+from typing import NamedTuple, Sequence
 
 from sqlalchemy import select, insert, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.sensor import (Location, LocationStatus, sensor_location_association
+from src.load_profiles import LOCATION_LIST, LOCATION_DETAIL
+from src.pagination import Page, PageParams, paginate
+from src.query_budget import query_budget
+from src.scenario.cache import invalidate_all_scenarios
+from src.sensor import (Location, LocationStatus, sensor_location_association, Sensor, Model, ModelType
                         )
 
 
+LOCATION_SORTS = {
+    "id": Location.id,
+    "name": Location.name,
+}
+
+
+class LocationSensorRow(NamedTuple):
+    name: str
+    KKS: str
+    type_name: str | None
+
+
+class LocationRow(NamedTuple):
+    id: int
+    name: str
+    prefab: str
+    status: LocationStatus
+    sensors: list[LocationSensorRow]
+
+
 async def get_locations(session: AsyncSession) -> Sequence[Location]:
-    query = select(Location)
+    query = select(Location).options(*LOCATION_LIST)
     result = await session.execute(query)
     results = result.scalars().all()
     return results
 
 
+# Страница + оценка числа строк + приборы локаций страницы
+@query_budget(3)
+async def paginate_locations(session: AsyncSession, page: PageParams, q: str | None = None,
+                             status: LocationStatus | None = None) -> Page:
+    # Только колонки, которые показывает список, без ORM объектов и identity map
+    query = select(Location.id, Location.name, Location.prefab, Location.status)
+    if q:
+        query = query.where(Location.name.startswith(q, autoescape=True))
+    if status is not None:
+        query = query.where(status == Location.status)
+    filtered = bool(q) or status is not None
+    locations_page = await paginate(session, query, LOCATION_SORTS, Location.id, page,
+                                    estimate_table=None if filtered else Location.__tablename__, entity=False)
+
+    sensors: dict[int, list[LocationSensorRow]] = {}
+    location_ids = [row[0] for row in locations_page.items]
+    if location_ids:
+        query = (
+            select(sensor_location_association.c.location_id, Sensor.name, Sensor.KKS, ModelType.name)
+            .join(Sensor, Sensor.id == sensor_location_association.c.sensor_id)
+            .join(Model, Model.id == Sensor.model_id)
+            .outerjoin(ModelType, ModelType.id == Model.model_type_id)
+            .where(sensor_location_association.c.location_id.in_(location_ids))
+            .order_by(Sensor.id)
+        )
+        for location_id, name, KKS, type_name in await session.execute(query):
+            sensors.setdefault(location_id, []).append(LocationSensorRow(name, KKS, type_name))
+
+    items = [
+        LocationRow(location_id, name, prefab, location_status, sensors.get(location_id, []))
+        for location_id, name, prefab, location_status, *_ in locations_page.items
+    ]
+    return locations_page._replace(items=items)
+
+
 async def get_location_for_id(location_id: int, session: AsyncSession) -> Location:
-    query = select(Location).where(location_id == Location.id)
+    query = select(Location).options(*LOCATION_DETAIL).where(location_id == Location.id)
     result = await session.execute(query)
     location: Location = result.scalars().first()
     return location
@@ -39,6 +98,7 @@ async def delete_all_connection_location_model(session: AsyncSession, location_i
         query = delete(sensor_location_association).where(sensor_location_association.c.location_id == location_id)
         await session.execute(query)
         await session.commit()
+        invalidate_all_scenarios()
     except Exception as e:
         raise Exception(f"An error occurred while deleting connections: {e}")
 
@@ -55,10 +115,11 @@ async def update_location(location: Location, status: LocationStatus, name: str,
     ]
     await session.execute(insert(sensor_location_association).values(location_model))
     await session.commit()
+    invalidate_all_scenarios()
 
 
 async def get_locations_list(session: AsyncSession) -> Sequence[Location]:
-    query = select(Location)
+    query = select(Location).options(*LOCATION_LIST)
     result = await session.execute(query)
     location_results = result.scalars().all()
     return location_results
\ No newline at end of file
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import APIRouter, Form
 from fastapi import Request, Depends
@@ -10,7 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.base_config import staff_user, administrator_user
 from src.auth.models import User
 from src.database import get_async_session
-from src.location.crud import get_location_for_id as get_location_for_id_func, create_location, get_locations, \
+from src.pagination import PageParams
+from src.location.crud import get_location_for_id as get_location_for_id_func, create_location, paginate_locations, \
     delete_all_connection_location_model, update_location
 from src.pages.router import templates
 from src.pages.utils import (user_menu,
@@ -134,16 +136,24 @@ async def post_create_location(request: Request,
 
 
 @router.get("/", response_class=HTMLResponse)
-async def get_location_page(request: Request, user: User = Depends(staff_user),
+async def get_location_page(request: Request, q: Optional[str] = None, status: Optional[str] = None,
+                            page: PageParams = Depends(), user: User = Depends(staff_user),
                             session: AsyncSession = Depends(get_async_session)):
     try:
-        locations = await get_locations(session=session)
+        # Пустое значение из формы фильтра - "все статусы"
+        status = LocationStatus(status) if status else None
+        locations_page = await paginate_locations(session=session, page=page, q=q, status=status)
         return templates.TemplateResponse(
             "/location/location.html",
             {
                 'request': request,
                 'user': user,
-                "locations": locations,
+                "locations": locations_page.items,
+                "page": locations_page,
+                "params": page,
+                "q": q,
+                "status": status,
+                "statuses": LocationStatus,
                 'title': "ISPU - Локации",
                 'menu': user_menu,
             }
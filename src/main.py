@@ -1,5 +1,7 @@
 import os
 import sys
+import time
+from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI, Request, status
@@ -15,16 +17,37 @@ from src.auth.schemas import UserRead, UserCreate
 from src.pages.router import router as router_pages, templates
 from src.sensor.router import router as router_sensor
 from src.api.v1.admission.router import router as router_api_admission
+from src.api.v1.session.router import router as router_api_session
+from src.api.v1.telemetry.router import router as router_api_telemetry
 from src.users.router import router as router_users
 from src.location.router import router as router_location
 from src.model.router import router as router_model
 from src.scenario.router import router as router_scenario
 from src.admission.router import router as router_admission
+from src.internal.router import router as router_internal
+from src.database import EMBEDDED_DB, init_embedded_database
+from src.metrics import RequestMetrics, request_metrics, route_metrics
+from src.telemetry.buffer import telemetry_buffer
+from src.launcher.runtime import unity_runtime
+from src.config import DEBUG
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Встроенная БД станции: таблицы создаются при первом запуске
+    if EMBEDDED_DB:
+        await init_embedded_database()
+    # Фоновая запись телеметрии; при остановке буфер дописывается в БД
+    telemetry_buffer.start()
+    yield
+    await telemetry_buffer.stop()
+    # Канал VR клиента: порт освобождается для следующего запуска сервера
+    await unity_runtime.close()
 
-DEBUG = True
 
 app = FastAPI(
     title="ISPU App",
+    lifespan=lifespan,
 )
 
 # Определяем базовый каталог
@@ -49,6 +72,40 @@ app.add_middleware(
 )
 
 
+def route_name(request: Request) -> str:
+    # Шаблон пути, а не сам путь: /pages/scenario/{scenario_id}, а не отдельная строка на каждый id
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route is not None else '<unmatched>'}"
+
+
+def timing_headers(metrics: RequestMetrics, total: float) -> dict[str, str]:
+    # Время ожидания соединения из пула БД, по нему подбирается DB_POOL_SIZE
+    return {"X-DB-Pool-Wait": f"{metrics.pool_wait * 1000:.2f}ms", "Server-Timing": metrics.server_timing(total)}
+
+
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    metrics = RequestMetrics()
+    token = request_metrics.set(metrics)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        # Необработанное исключение тоже запрос: без этого упавшие маршруты не попадают в метрики.
+        # Ответ строит generic_exception_handler уже снаружи middleware, заголовки передаются ему
+        # через request.state (общий для всех Request одного запроса)
+        total = time.perf_counter() - start
+        route_metrics.observe(route_name(request), metrics, total, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        request.state.timing_headers = timing_headers(metrics, total)
+        raise
+    finally:
+        request_metrics.reset(token)
+    total = time.perf_counter() - start
+    route_metrics.observe(route_name(request), metrics, total, response.status_code)
+    response.headers.update(timing_headers(metrics, total))
+    return response
+
+
 @app.exception_handler(ValidationException)
 async def validation_exception_handler(request: Request, exc: ValidationException):
     if DEBUG:
@@ -78,8 +135,12 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def generic_exception_handler(request: Request, exc: Exception):
     print(f"An error occurred: {exc}")
     if DEBUG:
-        return templates.TemplateResponse("/support_pages/error.html", {"request": request, "error": str(exc)})
-    return templates.TemplateResponse("/support_pages/error.html", {"request": request, "error": "An unexpected error occurred."})
+        response = templates.TemplateResponse("/support_pages/error.html", {"request": request, "error": str(exc)})
+    else:
+        response = templates.TemplateResponse("/support_pages/error.html",
+                                              {"request": request, "error": "An unexpected error occurred."})
+    response.headers.update(getattr(request.state, "timing_headers", {}))
+    return response
 
 
 @app.exception_handler(404)
@@ -116,6 +177,9 @@ app.include_router(router_model)
 app.include_router(router_scenario)
 app.include_router(router_admission)
 app.include_router(router_api_admission)
+app.include_router(router_api_session)
+app.include_router(router_api_telemetry)
+app.include_router(router_internal)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,137 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Границы корзин гистограмм (включительно, "не больше")
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    """Счетчики одного HTTP запроса. Заполняются по ходу обработки, отдаются в заголовках ответа."""
+    __slots__ = ("pool_wait", "queries", "db_time", "render_time", "serialize_time")
+
+    def __init__(self):
+        self.pool_wait = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.serialize_time = 0.0
+
+    def server_timing(self, total: float) -> str:
+        # Формат заголовка Server-Timing, длительности в миллисекундах; видно во вкладке Network браузера
+        return (f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+                f'pool;dur={self.pool_wait * 1000:.2f}, '
+                f'render;dur={self.render_time * 1000:.2f}, '
+                f'serialize;dur={self.serialize_time * 1000:.2f}, '
+                f'total;dur={total * 1000:.2f}')
+
+
+# Middleware кладет сюда новый объект на каждый запрос. Сам объект изменяемый, поэтому
+# значения видны middleware даже если запись идет из другой задачи/гринлета.
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_request_metrics() -> RequestMetrics | None:
+    return request_metrics.get()
+
+
+def record_query(seconds: float) -> None:
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics.queries += 1
+        metrics.db_time += seconds
+
+
+def record_render(seconds: float) -> None:
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics.render_time += seconds
+
+
+def record_serialize(seconds: float) -> None:
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics.serialize_time += seconds
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        # Последняя корзина - все, что больше верхней границы
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict:
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class RouteMetrics:
+    """Накопленные метрики одного маршрута (метод + шаблон пути)."""
+    __slots__ = ("errors", "latency_ms", "db_ms", "queries", "render_ms", "serialize_ms")
+
+    def __init__(self):
+        self.errors = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.render_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.serialize_ms = Histogram(LATENCY_BUCKETS_MS)
+
+    def observe(self, metrics: RequestMetrics, total: float, status_code: int) -> None:
+        if status_code >= 500:
+            self.errors += 1
+        self.latency_ms.observe(total * 1000)
+        self.db_ms.observe(metrics.db_time * 1000)
+        self.queries.observe(metrics.queries)
+        self.render_ms.observe(metrics.render_time * 1000)
+        self.serialize_ms.observe(metrics.serialize_time * 1000)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.latency_ms.count,
+            "errors": self.errors,
+            "latency_ms": self.latency_ms.as_dict(),
+            "db_ms": self.db_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+            "render_ms": self.render_ms.as_dict(),
+            "serialize_ms": self.serialize_ms.as_dict(),
+        }
+
+
+class RouteMetricsRegistry:
+    def __init__(self):
+        self._routes: dict[str, RouteMetrics] = {}
+
+    def observe(self, route: str, metrics: RequestMetrics, total: float, status_code: int) -> None:
+        route_metrics = self._routes.get(route)
+        if route_metrics is None:
+            route_metrics = self._routes[route] = RouteMetrics()
+        route_metrics.observe(metrics, total, status_code)
+
+    def snapshot(self) -> dict:
+        # Сначала самые "дорогие" по числу запросов к БД маршруты
+        routes = sorted(self._routes.items(), key=lambda item: item[1].queries.max, reverse=True)
+        return {route: route_metrics.as_dict() for route, route_metrics in routes}
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+
+route_metrics = RouteMetricsRegistry()
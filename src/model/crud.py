@@ -1,14 +1,35 @@
-from typing import Sequence
+from typing import NamedTuple, Sequence
 
-from slugify import slugify
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, insert, literal, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.sensor import (Model, ModelValue, ModelType, model_accident_association
+from src.database import upsert, EMBEDDED_DB
+from src.load_profiles import MODEL_LIST, MODEL_DETAIL
+from src.pagination import Page, PageParams, paginate
+from src.query_budget import query_budget
+from src.scenario.cache import invalidate_all_scenarios
+from src.sensor import (Model, ModelValue, ModelType, Accident, model_accident_association
                         )
 
+# Размер пачки для upsert (ON DUPLICATE KEY UPDATE / ON CONFLICT), чтобы не упереться в max_allowed_packet
+MODEL_VALUE_BATCH_SIZE = 1000
+
+MODEL_SORTS = {
+    "id": Model.id,
+    "type": func.coalesce(ModelType.name, ""),
+}
+
+
+class ModelRow(NamedTuple):
+    id: int
+    type_name: str | None
+    specification: dict | None
+    param_mapping_names: dict | None
+    accidents: list[str]
+
+
 async def get_model_for_id(model_id: int, session: AsyncSession) -> Model:
-    query = select(Model).where(model_id == Model.id)
+    query = select(Model).options(*MODEL_DETAIL).where(model_id == Model.id)
     result = await session.execute(query)
     model: Model = result.scalars().first()
     return model
@@ -17,13 +38,17 @@ async def get_model_for_id(model_id: int, session: AsyncSession) -> Model:
 async def get_model_values_group_by_type(session: AsyncSession) -> list[dict]:
     query = select(
         ModelValue.model_type,
-        func.group_concat(func.concat(ModelValue.field, ': ', ModelValue.value, ' ', ModelValue.measurement)).label(
+        func.aggregate_strings(ModelValue.field + ': ' + ModelValue.value + ' ' + ModelValue.measurement, ',').label(
             'combined_values')
     ).group_by(ModelValue.model_type)
     result = await session.execute(query)
-    result = result.all()
+    return parse_model_values(result.all())
+
+
+def parse_model_values(rows) -> list[dict]:
+    # Строки (тип, "поле: значение единица,поле: ...") из GROUP_CONCAT -> [{'name': тип, 'value': {поле: ...}}]
     result_list = []
-    for model_type, combined_values in result:
+    for model_type, combined_values in rows:
         values = combined_values.split(',')
         value_dict = {}
         for value in values:
@@ -76,17 +101,61 @@ async def create_model(session: AsyncSession, fields_id: list[int], model_name:
     return new_model
 
 
+# Модели + selectin ошибок
+@query_budget(2)
 async def get_models(session: AsyncSession) -> Sequence[Model]:
-    query = select(Model)
+    query = select(Model).options(*MODEL_LIST)
     result = await session.execute(query)
     models = result.scalars().all()
     return models
 
+async def get_accident_names_for_models(session: AsyncSession, model_ids: list[int]) -> dict[int, list[str]]:
+    # Ошибки всех моделей страницы одним запросом
+    if not model_ids:
+        return {}
+    query = (
+        select(model_accident_association.c.model_id, Accident.name)
+        .join(Accident, Accident.id == model_accident_association.c.accident_id)
+        .where(model_accident_association.c.model_id.in_(set(model_ids)))
+        .order_by(Accident.id)
+    )
+    result = await session.execute(query)
+    accidents: dict[int, list[str]] = {}
+    for model_id, name in result:
+        accidents.setdefault(model_id, []).append(name)
+    return accidents
+
+
+# Страница + оценка числа строк + ошибки моделей страницы
+@query_budget(3)
+async def paginate_models(session: AsyncSession, page: PageParams, q: str | None = None,
+                          model_type_id: int | None = None) -> Page:
+    # Только колонки, которые показывает список, без ORM объектов и identity map
+    query = (
+        select(Model.id, ModelType.name, Model.specification, Model.param_mapping_names)
+        .outerjoin(ModelType, Model.model_type_id == ModelType.id)
+    )
+    if q:
+        query = query.where(ModelType.name.startswith(q, autoescape=True))
+    if model_type_id is not None:
+        query = query.where(model_type_id == Model.model_type_id)
+    filtered = bool(q) or model_type_id is not None
+    models_page = await paginate(session, query, MODEL_SORTS, Model.id, page,
+                                 estimate_table=None if filtered else Model.__tablename__, entity=False)
+    accidents = await get_accident_names_for_models(session, [row[0] for row in models_page.items])
+    items = [
+        ModelRow(model_id, type_name, specification, param_mapping_names, accidents.get(model_id, []))
+        for model_id, type_name, specification, param_mapping_names, *_ in models_page.items
+    ]
+    return models_page._replace(items=items)
+
+
 async def update_model(model: Model, specification: dict, model_type_id: int, session: AsyncSession):
     model.specification = specification
     model.model_type_id = model_type_id
     session.add(model)
     await session.commit()
+    invalidate_all_scenarios()
 
 
 async def delete_accident_for_model(session: AsyncSession, model_id: int, accident_id: int) -> None:
@@ -104,32 +173,49 @@ async def delete_accident_for_model(session: AsyncSession, model_id: int, accide
 
 
 async def create_model_values_or_update(session: AsyncSession, keys: list[str], values: list[str],
-                                        measurements: list[str], name_eng_params: list[str], name: str):
-    for i in range(len(keys)):
-        name_eng_param = slugify(name_eng_params[i], separator='_')
-
-        query = select(ModelValue).where(
-            keys[i] == ModelValue.field, name == ModelValue.model_type
-        )
-        result = await session.execute(query)
-        model_value = result.scalars().first()
-
-        if model_value:
-            model_value.value = values[i]
-            model_value.measurement = measurements[i]
-            model_value.name_eng_param = name_eng_param
-            session.add(model_value)
-            await session.commit()
-
-        else:
-            new_model_value = ModelValue(value=values[i], field=keys[i], measurement=measurements[i],
-                                         model_type=name, name_eng_param=name_eng_param)
-            session.add(new_model_value)
-
-    query = select(ModelType).where(name == ModelType.name)
-    result = await session.execute(query)
-    model_type = result.scalar_one_or_none()
-    if not model_type:
-        type_model = ModelType(name=name)
-        session.add(type_model)
-    await session.commit()
\ No newline at end of file
+                                        measurements: list[str], name_eng_params: list[str], name: str) -> dict:
+    """
+    Сохраняет параметры типа модели одним INSERT ... ON DUPLICATE KEY UPDATE на пачку и одним коммитом.
+
+    Возвращает {"saved": сколько параметров записано, "changed": у скольких уже существующих
+    изменились значения}. changed считается по числу затронутых строк MySQL: 1 на новую или
+    не изменившуюся строку, 2 на измененную. Встроенная SQLite этого не различает, там changed - None.
+    """
+    # slugify (с таблицами транслитерации) нужен только при импорте параметров, не при старте сервера
+    from slugify import slugify
+
+    columns = [keys or [], values or [], measurements or [], name_eng_params or []]
+    if len({len(column) for column in columns}) > 1:
+        # zip молча отбросил бы параметры без пары
+        raise ValueError(f"Списки параметров разной длины: {[len(column) for column in columns]}")
+
+    rows = {}
+    for key, value, measurement, name_eng_param in zip(*columns):
+        rows[key] = {
+            "model_type": name,
+            "field": key,
+            "value": value,
+            "measurement": measurement,
+            "name_eng_param": slugify(name_eng_param, separator='_'),
+        }
+    if not rows:
+        return {"saved": 0, "changed": 0}
+
+    stmt = upsert(ModelValue.__table__, ["model_type", "field"], lambda new: [
+        ("value", new.value),
+        ("measurement", new.measurement),
+        ("name_eng_param", new.name_eng_param),
+    ]).execution_options(preserve_rowcount=True)
+    values_list = list(rows.values())
+    affected = 0
+    for i in range(0, len(values_list), MODEL_VALUE_BATCH_SIZE):
+        result = await session.execute(stmt, values_list[i:i + MODEL_VALUE_BATCH_SIZE])
+        affected += result.rowcount
+
+    # Тип создается тем же запросом, если его еще нет, без отдельной проверки
+    await session.execute(
+        insert(ModelType.__table__)
+        .from_select(["name"], select(literal(name)).where(~exists().where(name == ModelType.name)))
+    )
+    await session.commit()
+    return {"saved": len(rows), "changed": None if EMBEDDED_DB else affected - len(rows)}
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
@@ -8,10 +9,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.base_config import staff_user, administrator_user
 from src.auth.models import User
 from src.database import get_async_session
+from src.pagination import PageParams
 from src.pages.router import templates
 from src.pages.utils import (user_menu,
                              )
-from src.model.crud import get_model_for_id as get_model_for_id_func, get_models, update_model, get_model_values_for_id, \
+from src.model.crud import get_model_for_id as get_model_for_id_func, paginate_models, update_model, get_model_values_for_id, \
     create_model_values_or_update
 from src.model.crud import (get_model_values_group_by_type, get_model_value_for_name,
                             get_model_values_for_id as get_model_values_for_id_func,
@@ -266,16 +268,20 @@ async def post_add_accident(
 
 
 @router.get("/", response_class=HTMLResponse)
-async def get_model_page(request: Request, user: User = Depends(staff_user),
+async def get_model_page(request: Request, q: Optional[str] = None, model_type_id: Optional[int] = None,
+                         page: PageParams = Depends(), user: User = Depends(staff_user),
                          session: AsyncSession = Depends(get_async_session)):
     try:
-        models = await get_models(session=session)
+        models_page = await paginate_models(session=session, page=page, q=q, model_type_id=model_type_id)
         return templates.TemplateResponse(
             "/staff/get/model/model.html",
             {
                 'request': request,
                 'user': user,
-                "models": models,
+                "models": models_page.items,
+                "page": models_page,
+                "params": page,
+                "q": q,
                 'title': "ISPU - Модели",
                 'menu': user_menu,
             }
@@ -381,8 +387,9 @@ async def post_update_model(request: Request, model_id: int, fields_selected: li
 
 
 @router.get("/model-value/", response_class=HTMLResponse)
-async def get_model_value(request: Request, user: User = Depends(administrator_user),
-                               session: AsyncSession = Depends(get_async_session)):
+async def get_model_value(request: Request, name: Optional[str] = None, saved: Optional[int] = None,
+                          changed: Optional[int] = None, user: User = Depends(administrator_user),
+                          session: AsyncSession = Depends(get_async_session)):
     try:
         model_value = await get_model_values_group_by_type(session=session)
         return templates.TemplateResponse(
@@ -393,6 +400,7 @@ async def get_model_value(request: Request, user: User = Depends(administrator_u
                 'menu': user_menu,
                 'title': "ISPU - Создание исходной модели!",
                 'model_value': model_value,
+                'saved': {"name": name, "count": saved, "changed": changed} if saved is not None else None,
             }
         )
     except SQLAlchemyError as e:
@@ -509,9 +517,20 @@ async def post_create_model_value(
         session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        await create_model_values_or_update(name=name, keys=keys, values=values, measurements=measurement,
-                                            name_eng_params=slug_name, session=session)
-        return RedirectResponse(url=request.url_for("get_model_value"), status_code=HTTPStatus.MOVED_PERMANENTLY)
+        counts = await create_model_values_or_update(name=name, keys=keys, values=values, measurements=measurement,
+                                                     name_eng_params=slug_name, session=session)
+        # Итог сохранения показывается на странице параметров, куда ведет редирект
+        url = request.url_for("get_model_value").include_query_params(
+            name=name, **{key: value for key, value in counts.items() if value is not None})
+        return RedirectResponse(url=url, status_code=HTTPStatus.MOVED_PERMANENTLY)
+    except ValueError as e:
+        print(f"Ошибка в параметрах модели {name}: {e}")
+        return templates.TemplateResponse("profile/index.html", {
+            "request": request,
+            "error": "Для каждого параметра нужно указать значение, единицу измерения и название.",
+            'user': user,
+            'menu': user_menu
+        })
     except SQLAlchemyError as e:
         print(f"SQLAlchemy при добавлении\обновлении параметра модели: {e}")
         await session.rollback()
@@ -1,10 +1,13 @@
-from slugify import slugify
 from sqlalchemy import select, func, insert
 from typing import List, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import delete
 
 from src.auth import Admission, AdmissionStatus, User, Scenario
+from src.load_profiles import (ADMISSION_LIST, ADMISSION_DETAIL, SCENARIO_LIST, SCENARIO_DETAIL, LOCATION_LIST,
+                                LOCATION_DETAIL, MODEL_LIST, MODEL_DETAIL, MODEL_NAME, SENSOR_LIST, SENSOR_DETAIL)
+from src.query_budget import query_budget
+from src.scenario.cache import invalidate_scenario, invalidate_all_scenarios
 from src.sensor import (Location,
                         LocationStatus,
                         Model,
@@ -21,17 +24,17 @@ from src.sensor import (Location,
 async def get_admission_for_user_id(user_id: int, session: AsyncSession, include_completed: bool = True) -> Sequence[
     Admission]:
     if include_completed:
-        query = select(Admission).where(user_id == Admission.user_id)
+        query = select(Admission).options(*ADMISSION_LIST).where(user_id == Admission.user_id)
     else:
-        query = select(Admission).where(user_id == Admission.user_id,
-                                        AdmissionStatus.COMPLETED != Admission.status)
+        query = select(Admission).options(*ADMISSION_LIST).where(user_id == Admission.user_id,
+                                                                 AdmissionStatus.COMPLETED != Admission.status)
     result = await session.execute(query)
     admission = result.scalars().all()
     return admission
 
 
 async def get_admission_for_id(admission_id: int, session: AsyncSession) -> Admission:
-    query = select(Admission).where(admission_id == Admission.id)
+    query = select(Admission).options(*ADMISSION_DETAIL).where(admission_id == Admission.id)
     result = await session.execute(query)
     admission = result.scalar_one_or_none()
     return admission
@@ -44,15 +47,10 @@ async def get_user_for_id(user_id: int, session: AsyncSession) -> User:
     return user
 
 
-async def get_users_without_scenario(scenario_id: int, session: AsyncSession) -> Sequence[User]:
-    subquery = select(Admission.user_id).where(scenario_id == Admission.scenario_id).subquery()
-    result = await session.execute(select(User).where(User.id.not_in(select(subquery))))
-    users_without_scenario = result.scalars().all()
-    return users_without_scenario
-
-
+# Сценарий + selectin: приборы локации, ошибки модели, ошибки сценария (SCENARIO_DETAIL)
+@query_budget(4)
 async def get_scenario_for_id(scenario_id: int, session: AsyncSession) -> Scenario:
-    query = select(Scenario).where(scenario_id == Scenario.id)
+    query = select(Scenario).options(*SCENARIO_DETAIL).where(scenario_id == Scenario.id)
     result = await session.execute(query)
     scenario: Scenario = result.scalars().first()
     return scenario
@@ -61,6 +59,7 @@ async def get_scenario_for_id(scenario_id: int, session: AsyncSession) -> Scenar
 async def get_scenarios_active_list(session: AsyncSession) -> Sequence[Scenario]:
     query = (
         select(Scenario)
+        .options(*SCENARIO_LIST)
         .join(Location)
         .where(LocationStatus.COMPLETED == Location.status)
     )
@@ -71,14 +70,14 @@ async def get_scenarios_active_list(session: AsyncSession) -> Sequence[Scenario]
 
 
 async def get_location_for_id(location_id: int, session: AsyncSession) -> Location:
-    query = select(Location).where(location_id == Location.id)
+    query = select(Location).options(*LOCATION_DETAIL).where(location_id == Location.id)
     result = await session.execute(query)
     location: Location = result.scalars().first()
     return location
 
 
 async def get_model_for_id(model_id: int, session: AsyncSession) -> Model:
-    query = select(Model).where(model_id == Model.id)
+    query = select(Model).options(*MODEL_DETAIL).where(model_id == Model.id)
     result = await session.execute(query)
     model: Model = result.scalars().first()
     return model
@@ -93,14 +92,14 @@ async def get_location_names(session: AsyncSession) -> List[dict]:
 
 
 async def get_location_list(session: AsyncSession) -> Sequence[Location]:
-    locations_query = select(Location)
+    locations_query = select(Location).options(*LOCATION_LIST)
     result = await session.execute(locations_query)
     location_results = result.scalars().all()
     return location_results
 
 
 async def get_model_names(session: AsyncSession) -> List[dict]:
-    models_query = select(Model)
+    models_query = select(Model).options(*MODEL_NAME)
     result = await session.execute(models_query)
     model_results = result.scalars().all()
     model_list = [{"name": str(model), "id": model.id} for model in model_results]
@@ -108,7 +107,7 @@ async def get_model_names(session: AsyncSession) -> List[dict]:
 
 
 async def get_sensor_list(session: AsyncSession) -> Sequence[Sensor]:
-    sensors_query = select(Sensor)
+    sensors_query = select(Sensor).options(*SENSOR_LIST)
     result = await session.execute(sensors_query)
     sensor_results = result.scalars().all()
     return sensor_results
@@ -122,7 +121,7 @@ async def get_accidents_for_model(session: AsyncSession, model_id: int) -> Seque
 
 
 async def get_sensor_for_id(session: AsyncSession, sensor_id: int) -> Sensor:
-    query = select(Sensor).where(sensor_id == Sensor.id)
+    query = select(Sensor).options(*SENSOR_DETAIL).where(sensor_id == Sensor.id)
     result = await session.execute(query)
     sensor = result.scalar_one_or_none()
     return sensor
@@ -164,21 +163,21 @@ async def create_or_get_model_type(session: AsyncSession, sensor_type_name: str)
 
 
 async def get_all_models(session: AsyncSession) -> Sequence[Model]:
-    query = select(Model)
+    query = select(Model).options(*MODEL_LIST)
     result = await session.execute(query)
     models = result.scalars().all()
     return models
 
 
 async def get_all_sensors(session: AsyncSession) -> Sequence[Sensor]:
-    query = select(Sensor)
+    query = select(Sensor).options(*SENSOR_LIST)
     result = await session.execute(query)
     sensors = result.scalars().all()
     return sensors
 
 
 async def get_models_for_id(session: AsyncSession, models_id: list[int]) -> Sequence[Model]:
-    result = await session.execute(select(Model).where(Model.id.in_(models_id)))
+    result = await session.execute(select(Model).options(*MODEL_LIST).where(Model.id.in_(models_id)))
     models = result.scalars().all()
     return models
 
@@ -200,7 +199,7 @@ async def get_all_sensor_values(session: AsyncSession) -> Sequence[ModelValue]:
 async def get_all_sensor_values_group_type(session: AsyncSession) -> list[dict]:
     query = select(
         ModelValue.model_type,
-        func.group_concat(func.concat(ModelValue.field, ': ', ModelValue.value, ' ', ModelValue.measurement)).label(
+        func.aggregate_strings(ModelValue.field + ': ' + ModelValue.value + ' ' + ModelValue.measurement, ',').label(
             'combined_values')
     ).group_by(ModelValue.model_type)
     result = await session.execute(query)
@@ -224,6 +223,7 @@ async def delete_all_connection_location_model(session: AsyncSession, location_i
         query = delete(sensor_location_association).where(sensor_location_association.c.location_id == location_id)
         await session.execute(query)
         await session.commit()
+        invalidate_all_scenarios()
     except Exception as e:
         print(f"An error occurred while deleting connections: {e}")
         raise
@@ -234,6 +234,7 @@ async def delete_all_connection_scenario_accident(session: AsyncSession, scenari
         query = delete(scenario_accident_association).where(scenario_accident_association.c.scenario_id == scenario_id)
         await session.execute(query)
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         print(f"An error occurred while deleting connections: {e}")
         raise
@@ -262,6 +263,7 @@ async def delete_accident_for_scenario(session: AsyncSession, scenario_id: int,
         )
         await session.execute(query)
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         print(f"An error occurred while deleting connections: {e}")
         raise
@@ -277,6 +279,7 @@ async def add_accidents_for_scenario(session: AsyncSession, scenario_id: int, ac
         ]
         await session.execute(insert(scenario_accident_association).values(scenario_accidents))
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         print(f"An error occurred while adding accidents: {e}")
         await session.rollback()
@@ -291,6 +294,8 @@ async def create_sensor(session: AsyncSession, KKS: str, name: str, model_id: in
 # TODO: СТАРОЕ УДАЛИТЬ
 async def create_model_value_or_none(session: AsyncSession, key: str, value: str, name: str, measurement: str,
                                      name_eng_param: str):
+    from slugify import slugify
+
     name_eng_param = slugify(name_eng_param, separator='_')
     query = select(ModelValue).where(
         key == ModelValue.field,
@@ -315,34 +320,3 @@ async def create_model_value_or_none(session: AsyncSession, key: str, value: str
         await session.commit()
         return new_model_value
 
-
-async def create_model_values_or_update(session: AsyncSession, keys: list[str], values: list[str],
-                                        measurements: list[str], name_eng_params: list[str], name: str):
-    for i in range(len(keys)):
-        name_eng_param = slugify(name_eng_params[i], separator='_')
-
-        query = select(ModelValue).where(
-            keys[i] == ModelValue.field, name == ModelValue.model_type
-        )
-        result = await session.execute(query)
-        model_value = result.scalars().first()
-
-        if model_value:
-            model_value.value = values[i]
-            model_value.measurement = measurements[i]
-            model_value.name_eng_param = name_eng_param
-            session.add(model_value)
-            await session.commit()
-
-        else:
-            new_model_value = ModelValue(value=values[i], field=keys[i], measurement=measurements[i],
-                                         model_type=name, name_eng_param=name_eng_param)
-            session.add(new_model_value)
-
-    query = select(ModelType).where(name == ModelType.name)
-    result = await session.execute(query)
-    model_type = result.scalar_one_or_none()
-    if not model_type:
-        type_model = ModelType(name=name)
-        session.add(type_model)
-    await session.commit()
\ No newline at end of file
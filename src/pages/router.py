@@ -1,4 +1,5 @@
 import os
+import time
 from http import HTTPStatus
 
 from fastapi import APIRouter
@@ -13,12 +14,15 @@ from src.auth.models import User, Scenario
 from src.database import get_async_session
 from src.pages.crud import (
     get_scenario_for_id,
-    get_admission_for_id, get_model_for_id, delete_all_connection_scenario_accident, add_accidents_for_scenario,
-    create_model_values_or_update,
+    get_model_for_id, delete_all_connection_scenario_accident, add_accidents_for_scenario,
 )
+from src.model.crud import create_model_values_or_update
+from src.launcher.runtime import unity_runtime
+from src.metrics import record_render
 from src.pages.utils import (user_menu,
-                             create_json_scenario, start_app,
                              )
+from src.scenario.cache import get_admission_payload
+from src.templating import create_template_env
 
 router = APIRouter(
     prefix='/pages',
@@ -26,9 +30,21 @@ router = APIRouter(
 )
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-TEMPLATES_DIR = os.path.join(BASE_DIR, "templates\\")
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
-templates = Jinja2Templates(directory=TEMPLATES_DIR)
+
+class TimedJinja2Templates(Jinja2Templates):
+    """Шаблон рендерится при создании ответа, его время попадает в Server-Timing (render)."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().TemplateResponse(*args, **kwargs)
+        finally:
+            record_render(time.perf_counter() - start)
+
+
+templates = TimedJinja2Templates(env=create_template_env(TEMPLATES_DIR))
 
 
 # region StartApp
@@ -40,9 +56,11 @@ async def start_admission_app(
         session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        admission = await get_admission_for_id(admission_id=admission_id, session=session)
-        create_json_scenario(admission_json=admission.json_id())
-        start_app()
+        payload = await get_admission_payload(session=session, admission_id=admission_id)
+        if payload is None:
+            raise IOError("Задача не найдена")
+        # Теплый клиент получает задачу со сценарием по каналу, перезапуск только если процесса нет
+        await unity_runtime.start_admission(admission_id=admission_id, payload=payload)
         return RedirectResponse(url=request.url_for('get_tasks'),
                                 status_code=HTTPStatus.SEE_OTHER)
     except SQLAlchemyError as e:
@@ -1,6 +1,4 @@
 import contextlib
-import os
-import subprocess
 
 from fastapi import HTTPException, Request
 from fastapi.responses import Response
@@ -10,11 +8,11 @@ from datetime import datetime
 
 from sqlalchemy import Sequence
 import json
-import psutil
 
 from src.auth.models import Admission, User, Scenario
 from src.auth.base_config import auth_backend, get_jwt_strategy
 from src.auth.manager import get_user_manager
+from src.auth.hashing import PasswordHashingBusy
 from src.auth.utils import get_user_db
 from src.database import get_async_session
 from src.auth.schemas import UserCreate
@@ -48,6 +46,8 @@ user_menu = [
         "access": "staff",
         "urls": [
             ("Пользователи", "get_users_page"),
+            ("Рейтинг обучаемых", "get_leaderboard_page"),
+            ("Отчет по подразделениям", "get_division_report_page"),
         ]
     },
     {
@@ -76,6 +76,8 @@ async def authenticate(email: str, password: str):
                     response: Response = await auth_backend.login(strategy=get_jwt_strategy(), user=user)
                     print(f"User auth {user.username} | Response {response.status_code}")
                     return user
+    except PasswordHashingBusy:
+        raise HTTPException(status_code=503, detail="Слишком много одновременных входов, повторите попытку.")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -91,6 +93,8 @@ async def authenticate_for_username(username: str, password: str):
                     response: Response = await auth_backend.login(strategy=get_jwt_strategy(), user=user)
                     print(f"User auth {user.username} | Response {response.status_code}")
                     return user
+    except PasswordHashingBusy:
+        raise HTTPException(status_code=503, detail="Слишком много одновременных входов, повторите попытку.")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -121,6 +125,8 @@ async def create(username: str, password: str, first_name: str, last_name: str,
                                           username=username)
                     user = await user_manager.create(new_user)
                     return user
+    except PasswordHashingBusy:
+        raise HTTPException(status_code=503, detail="Слишком много одновременных запросов, повторите попытку.")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -134,36 +140,3 @@ def get_last_admission_task(list_admission_tasks: Sequence[Admission]) -> Admiss
     last_admission = max(filtered_admissions, key=lambda admission: admission.is_ready)
     return last_admission
 
-
-def create_json_scenario(admission_json, path="C:\\Users\\treen\\Desktop\\text.json"):
-    with open(path, "w", encoding="utf-8") as file:
-        file.write(admission_json)
-
-def kill_existing_process(process_name):
-    for proc in psutil.process_iter():
-        try:
-            if proc.name() == process_name:
-                proc.kill()
-                print(f"Процесс {process_name} завершен.")
-        except psutil.ZombieProcess:
-            pass
-        except psutil.NoSuchProcess:
-            pass
-        except psutil.AccessDenied:
-            pass
-
-
-def start_app(path="C:\\Users\\treen\\Desktop\\build\\Myproject.exe"):
-    process_name = path.split('\\')[-1]
-    print(process_name)
-    try:
-        if os.path.exists(path):
-            kill_existing_process(process_name)
-
-            print("Начал запуск приложения Unity")
-            subprocess.Popen(path, shell=True)
-            print("Запуск завершен")
-        else:
-            raise IOError("Проект не найден")
-    except Exception as e:
-        raise Exception(str(e))
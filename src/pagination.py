@@ -0,0 +1,121 @@
+"""
+Курсорная (keyset) пагинация для списочных страниц.
+
+Вместо OFFSET следующая страница начинается строго после последней строки предыдущей:
+WHERE (sort, id) > (последнее значение, последний id) ORDER BY sort, id LIMIT n + 1.
+Запрос идет по индексу сортируемой колонки, поэтому время страницы не зависит от ее номера
+и размера таблицы. Лишняя (n + 1) строка только показывает, есть ли следующая страница.
+
+Использование в crud: paginate(session, select(User).where(...), USER_SORTS, User.id, page)
+"""
+import base64
+from datetime import datetime
+from enum import Enum
+from typing import Any, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import and_, func, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from src.database import EMBEDDED_DB
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """Параметры страницы из query string. Подключается в роутере как page: PageParams = Depends()."""
+
+    def __init__(self, cursor: Optional[str] = None, sort: str = "id", order: str = "asc", limit: int = PAGE_SIZE):
+        self.cursor = cursor or None
+        self.sort = sort
+        self.descending = order == "desc"
+        self.order = "desc" if self.descending else "asc"
+        self.limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: str | None
+    # Оценка по статистике таблицы, только для страницы без фильтров
+    estimated_total: int | None
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, Enum):
+        value = value.name
+    return base64.urlsafe_b64encode(orjson.dumps([value, row_id])).decode()
+
+
+def decode_cursor(cursor: str, expression) -> tuple[Any, int] | None:
+    # Испорченный или устаревший курсор не ошибка - просто начинаем с первой страницы
+    try:
+        value, row_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        return None
+    try:
+        python_type = expression.type.python_type
+    except NotImplementedError:
+        return value, row_id
+    try:
+        if issubclass(python_type, Enum):
+            value = python_type[value]
+        elif python_type is datetime and value is not None:
+            value = datetime.fromisoformat(value)
+    except (KeyError, ValueError, TypeError):
+        return None
+    return value, row_id
+
+
+async def estimate_row_count(session: AsyncSession, table_name: str) -> int | None:
+    if EMBEDDED_DB:
+        # information_schema в SQLite нет, а таблицы станции маленькие - точный COUNT(*) дешев
+        result = await session.execute(select(func.count()).select_from(table(table_name)))
+        return result.scalar_one()
+    # TABLE_ROWS в InnoDB - оценка из статистики, без COUNT(*) по всей таблице
+    query = text(
+        "SELECT TABLE_ROWS FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+    )
+    result = await session.execute(query, {"table_name": table_name})
+    return result.scalar_one_or_none()
+
+
+async def paginate(session: AsyncSession, query: Select, sorts: dict, id_column, page: PageParams,
+                   estimate_table: str | None = None, entity: bool = True) -> Page:
+    """
+    Выполняет запрос страницы.
+
+    sorts - разрешенные для сортировки выражения (не NULL), неизвестное имя сортирует по id.
+    entity - запрос выбирает ORM объект, в items попадают объекты, иначе строки.
+    estimate_table - таблица для оценки общего числа строк; передается, только если фильтров нет.
+    """
+    sort_expression = sorts.get(page.sort, id_column)
+    query = query.add_columns(sort_expression.label("page_sort_key"), id_column.label("page_row_id"))
+
+    cursor = decode_cursor(page.cursor, sort_expression) if page.cursor else None
+    if cursor is not None:
+        value, row_id = cursor
+        if page.descending:
+            query = query.where(or_(sort_expression < value, and_(sort_expression == value, id_column < row_id)))
+        else:
+            query = query.where(or_(sort_expression > value, and_(sort_expression == value, id_column > row_id)))
+
+    if page.descending:
+        query = query.order_by(sort_expression.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_expression, id_column)
+
+    result = await session.execute(query.limit(page.limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1].page_sort_key, rows[-1].page_row_id)
+
+    estimated_total = await estimate_row_count(session, estimate_table) if estimate_table else None
+    items = [row[0] for row in rows] if entity else rows
+    return Page(items=items, next_cursor=next_cursor, estimated_total=estimated_total)
@@ -0,0 +1,126 @@
+"""
+Бюджет SQL запросов для маршрутов и crud функций.
+
+Профили загрузки (src/load_profiles.py) дают фиксированное число запросов на страницу.
+Бюджет фиксирует это число, чтобы новая связь в профиле или лишний запрос в crud
+сразу были заметны:
+
+    @query_budget(3)
+    async def paginate_sensors(...): ...
+
+    # В тестах
+    with budget_scope(3, "get_sensor_page") as budget:
+        await paginate_sensors(...)
+
+При превышении QUERY_BUDGET_MODE=log печатает отчет: сколько запросов, их текст и какие
+связи (selectin/lazy загрузки) их вызвали; raise - дополнительно бросает QueryBudgetExceeded;
+off - декоратор ничего не делает. Маршруты перехватывают Exception и показывают страницу
+ошибки, поэтому все превышения также копятся в budget_violations - тестам достаточно
+проверить, что список пуст.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, RelationshipProperty
+
+from src.config import QUERY_BUDGET_MODE
+
+STATEMENT_PREVIEW_LENGTH = 300
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Функция выполнила больше SQL запросов, чем разрешено ее бюджетом."""
+
+
+class QueryBudget:
+    __slots__ = ("name", "max_statements", "statements", "relationship_loads")
+
+    def __init__(self, name: str, max_statements: int):
+        self.name = name
+        self.max_statements = max_statements
+        self.statements: list[str] = []
+        # Путь связи -> сколько раз ее загружали отдельным запросом
+        self.relationship_loads: dict[str, int] = {}
+
+    @property
+    def exceeded(self) -> bool:
+        return len(self.statements) > self.max_statements
+
+    def report(self) -> str:
+        lines = [f"Превышен бюджет запросов: {self.name} - {len(self.statements)} из {self.max_statements}"]
+        if self.relationship_loads:
+            lines.append("Загрузки связей:")
+            lines.extend(f"  {path} x{count}" for path, count in self.relationship_loads.items())
+        lines.append("Запросы:")
+        lines.extend(f"  {index}. {statement}" for index, statement in enumerate(self.statements, 1))
+        return "\n".join(lines)
+
+
+# Открытые бюджеты текущей задачи; вложенные (маршрут и его crud) считают одни и те же запросы
+_active_budgets: ContextVar[tuple[QueryBudget, ...]] = ContextVar("active_query_budgets", default=())
+budget_violations: list[str] = []
+
+
+def record_statement(statement: str) -> None:
+    budgets = _active_budgets.get()
+    if budgets:
+        statement = " ".join(statement.split())[:STATEMENT_PREVIEW_LENGTH]
+        for budget in budgets:
+            budget.statements.append(statement)
+
+
+def _relationship_path(orm_execute_state) -> str:
+    path = orm_execute_state.loader_strategy_path
+    names = [str(element) for element in path.path if isinstance(element, RelationshipProperty)] if path else []
+    label = " -> ".join(names) or "?"
+    if orm_execute_state.lazy_loaded_from is not None:
+        label += " (lazy)"
+    return label
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(orm_execute_state):
+    budgets = _active_budgets.get()
+    if budgets and orm_execute_state.is_relationship_load:
+        path = _relationship_path(orm_execute_state)
+        for budget in budgets:
+            budget.relationship_loads[path] = budget.relationship_loads.get(path, 0) + 1
+
+
+@contextmanager
+def budget_scope(max_statements: int, name: str, mode: str | None = None):
+    mode = mode or QUERY_BUDGET_MODE
+    budget = QueryBudget(name, max_statements)
+    token = _active_budgets.set(_active_budgets.get() + (budget,))
+    try:
+        yield budget
+    finally:
+        _active_budgets.reset(token)
+    if budget.exceeded and mode != "off":
+        report = budget.report()
+        budget_violations.append(report)
+        print("!" * 80)
+        print(report)
+        print("!" * 80)
+        if mode == "raise":
+            raise QueryBudgetExceeded(report)
+
+
+def query_budget(max_statements: int, name: str | None = None):
+    """Декоратор бюджета для async функции (crud или обработчика маршрута)."""
+
+    def decorator(func):
+        if QUERY_BUDGET_MODE == "off":
+            return func
+        budget_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with budget_scope(max_statements, budget_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,93 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.responses import dumps
+from src.auth.models import Admission, Scenario
+from src.load_profiles import SCENARIO_VR_PAYLOAD
+
+
+class ScenarioPayloadCache:
+    """
+    Кэш готовых (сериализованных) сценариев для VR клиента.
+
+    Ключ записи - id сценария и версия. Версия складывается из общей версии кэша
+    (меняется при изменении локаций, приборов, моделей) и версии конкретного сценария.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._scenario_versions: dict[int, int] = {}
+        self._payloads: dict[int, tuple[tuple[int, int], bytes]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def version(self, scenario_id: int) -> tuple[int, int]:
+        return self._version, self._scenario_versions.get(scenario_id, 0)
+
+    def invalidate_scenario(self, scenario_id: int) -> None:
+        self._scenario_versions[scenario_id] = self._scenario_versions.get(scenario_id, 0) + 1
+        self._payloads.pop(scenario_id, None)
+
+    def invalidate_all(self) -> None:
+        self._version += 1
+        self._payloads.clear()
+
+    async def get(self, session: AsyncSession, scenario_id: int) -> bytes | None:
+        payload = self._lookup(scenario_id)
+        if payload is not None:
+            return payload
+
+        # Один запрос к БД на сценарий, даже если его одновременно запросил весь класс
+        lock = self._locks.setdefault(scenario_id, asyncio.Lock())
+        async with lock:
+            payload = self._lookup(scenario_id)
+            if payload is not None:
+                return payload
+
+            version = self.version(scenario_id)
+            query = select(Scenario).options(*SCENARIO_VR_PAYLOAD).where(scenario_id == Scenario.id)
+            result = await session.execute(query)
+            scenario: Scenario = result.scalars().first()
+            if scenario is None:
+                return None
+            # Сериализуется один раз на версию сценария, дальше отдаются готовые байты
+            payload = dumps(scenario.json_obj())
+            self._payloads[scenario_id] = (version, payload)
+            return payload
+
+    def _lookup(self, scenario_id: int) -> bytes | None:
+        entry = self._payloads.get(scenario_id)
+        if entry is None:
+            return None
+        version, payload = entry
+        if version != self.version(scenario_id):
+            return None
+        return payload
+
+
+scenario_payload_cache = ScenarioPayloadCache()
+
+
+def invalidate_scenario(scenario_id: int) -> None:
+    scenario_payload_cache.invalidate_scenario(scenario_id)
+
+
+def invalidate_all_scenarios() -> None:
+    scenario_payload_cache.invalidate_all()
+
+
+def render_admission_payload(admission_id: int, scenario_payload: bytes) -> bytes:
+    # Та же структура, что и Admission.json_obj(), но без повторной сериализации сценария
+    return b'{"response":{"id":%d,"status":200,"scenario":%s}}' % (admission_id, scenario_payload)
+
+
+async def get_admission_payload(session: AsyncSession, admission_id: int) -> bytes | None:
+    result = await session.execute(select(Admission.scenario_id).where(admission_id == Admission.id))
+    scenario_id = result.scalar_one_or_none()
+    if scenario_id is None:
+        return None
+    scenario_payload = await scenario_payload_cache.get(session=session, scenario_id=scenario_id)
+    if scenario_payload is None:
+        return None
+    return render_admission_payload(admission_id=admission_id, scenario_payload=scenario_payload)
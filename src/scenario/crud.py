@@ -1,14 +1,22 @@
+from typing import NamedTuple
+
 from sqlalchemy import select, insert, Sequence, delete
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import Scenario
-from src.sensor import scenario_accident_association, Location, LocationStatus
+from src.load_profiles import SCENARIO_LIST, SCENARIO_DETAIL
+from src.pagination import Page, PageParams, paginate
+from src.query_budget import query_budget
+from src.scenario.cache import invalidate_scenario
+from src.sensor import scenario_accident_association, Location, LocationStatus, Sensor, Model, ModelType, Accident
 
 
+# Сценарий + selectin: приборы локации, ошибки модели, ошибки сценария (SCENARIO_DETAIL)
+@query_budget(4)
 async def get_scenario_for_id(scenario_id: int, session: AsyncSession) -> Scenario:
     try:
-        query = select(Scenario).where(scenario_id == Scenario.id)
+        query = select(Scenario).options(*SCENARIO_DETAIL).where(scenario_id == Scenario.id)
         result = await session.execute(query)
         scenario: Scenario = result.scalars().first()
         return scenario
@@ -34,6 +42,7 @@ async def create_scenario(location_id: int, sensor_id: int, name: str,
 async def get_active_scenarios(session: AsyncSession) -> Sequence[Scenario]:
     query = (
         select(Scenario)
+        .options(*SCENARIO_LIST)
         .join(Location)
         .where(LocationStatus.COMPLETED == Location.status)
     )
@@ -43,17 +52,69 @@ async def get_active_scenarios(session: AsyncSession) -> Sequence[Scenario]:
     return scenarios
 
 
-async def get_scenarios(session: AsyncSession) -> Sequence[Scenario]:
-    query = select(Scenario).order_by(Scenario.id)
-    result = await session.execute(query)
-    scenarios = result.scalars().all()
-    return scenarios
+SCENARIO_SORTS = {
+    "id": Scenario.id,
+    "name": Scenario.name,
+}
+
+
+class ScenarioRow(NamedTuple):
+    id: int
+    name: str
+    location_name: str
+    location_status: LocationStatus
+    sensor_name: str
+    sensor_KKS: str
+    sensor_type_name: str | None
+    accidents: list[str]
+
+
+# Страница + оценка числа строк + ошибки сценариев страницы
+@query_budget(3)
+async def paginate_scenarios(session: AsyncSession, page: PageParams, q: str | None = None,
+                             location_id: int | None = None) -> Page:
+    # Только колонки, которые показывает список, без ORM объектов и identity map
+    query = (
+        select(Scenario.id, Scenario.name, Location.name, Location.status, Sensor.name, Sensor.KKS, ModelType.name)
+        .join(Location, Location.id == Scenario.location_id)
+        .join(Sensor, Sensor.id == Scenario.sensor_id)
+        .join(Model, Model.id == Sensor.model_id)
+        .outerjoin(ModelType, ModelType.id == Model.model_type_id)
+    )
+    if q:
+        query = query.where(Scenario.name.startswith(q, autoescape=True))
+    if location_id is not None:
+        query = query.where(location_id == Scenario.location_id)
+    filtered = bool(q) or location_id is not None
+    scenarios_page = await paginate(session, query, SCENARIO_SORTS, Scenario.id, page,
+                                    estimate_table=None if filtered else Scenario.__tablename__, entity=False)
+
+    accidents: dict[int, list[str]] = {}
+    scenario_ids = [row[0] for row in scenarios_page.items]
+    if scenario_ids:
+        query = (
+            select(scenario_accident_association.c.scenario_id, Accident.name)
+            .join(Accident, Accident.id == scenario_accident_association.c.accident_id)
+            .where(scenario_accident_association.c.scenario_id.in_(scenario_ids))
+            .order_by(Accident.id)
+        )
+        for scenario_id, name in await session.execute(query):
+            accidents.setdefault(scenario_id, []).append(name)
+
+    items = [
+        ScenarioRow(scenario_id, name, location_name, location_status, sensor_name, sensor_KKS, sensor_type_name,
+                    accidents.get(scenario_id, []))
+        for scenario_id, name, location_name, location_status, sensor_name, sensor_KKS, sensor_type_name, *_
+        in scenarios_page.items
+    ]
+    return scenarios_page._replace(items=items)
 
 async def delete_all_connection_scenario_accident(session: AsyncSession, scenario_id: int) -> None:
     try:
         query = delete(scenario_accident_association).where(scenario_accident_association.c.scenario_id == scenario_id)
         await session.execute(query)
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         raise Exception(f"An error occurred while deleting connections: {e}")
 
@@ -72,6 +133,7 @@ async def update_scenario(scenario_id: int, name: str, sensor: int,
     ]
     await session.execute(insert(scenario_accident_association).values(sensor_accident))
     await session.commit()
+    invalidate_scenario(scenario_id)
 
 
 async def delete_accident(session: AsyncSession, scenario_id: int, accident_id: int) -> None:
@@ -83,6 +145,7 @@ async def delete_accident(session: AsyncSession, scenario_id: int, accident_id:
         )
         await session.execute(query)
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         print(f"An error occurred while deleting connections: {e}")
         raise
@@ -98,6 +161,7 @@ async def add_accidents_for_scenario(session: AsyncSession, scenario_id: int, ac
         ]
         await session.execute(insert(scenario_accident_association).values(scenario_accidents))
         await session.commit()
+        invalidate_scenario(scenario_id)
     except Exception as e:
         print(f"An error occurred while adding accidents: {e}")
         await session.rollback()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Form, HTTPException, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.exc import SQLAlchemyError
@@ -7,10 +9,11 @@ from http import HTTPStatus
 from src.auth.base_config import staff_user, administrator_user, current_user
 from src.auth.models import User, Scenario
 from src.database import get_async_session
+from src.pagination import PageParams
 from src.pages.router import templates
 from src.pages.utils import (user_menu,
                              )
-from src.scenario.crud import get_scenario_for_id as get_scenario_for_id_func, create_scenario, get_scenarios, \
+from src.scenario.crud import get_scenario_for_id as get_scenario_for_id_func, create_scenario, paginate_scenarios, \
     delete_all_connection_scenario_accident, update_scenario, delete_accident, add_accidents_for_scenario
 from src.location.crud import get_location_for_id as get_location_for_id_func, get_locations as get_locations_func
 from src.sensor.crud import get_sensor_for_id as get_sensor_for_id_func
@@ -226,16 +229,20 @@ async def post_create_scenario(request: Request, location_id: int, sensor_id: in
 
 
 @router.get("/", response_class=HTMLResponse)
-async def get_scenario(request: Request, user: User = Depends(staff_user),
+async def get_scenario(request: Request, q: Optional[str] = None, location_id: Optional[int] = None,
+                       page: PageParams = Depends(), user: User = Depends(staff_user),
                        session: AsyncSession = Depends(get_async_session)):
     try:
-        scenarios = await get_scenarios(session=session)
+        scenarios_page = await paginate_scenarios(session=session, page=page, q=q, location_id=location_id)
         return templates.TemplateResponse(
             "/staff/get/scenario/scenario.html",
             {
                 'request': request,
                 'user': user,
-                "scenarios": scenarios,
+                "scenarios": scenarios_page.items,
+                "page": scenarios_page,
+                "params": page,
+                "q": q,
                 'title': "ISPU - Сценарии",
                 'menu': user_menu,
             }
@@ -1,13 +1,34 @@
-from typing import Sequence
+from typing import NamedTuple, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.sensor import (Sensor)
+from src.load_profiles import SENSOR_LIST, SENSOR_DETAIL
+from src.model.crud import get_accident_names_for_models
+from src.pagination import Page, PageParams, paginate
+from src.query_budget import query_budget
+from src.scenario.cache import invalidate_all_scenarios
+from src.sensor import (Sensor, Model, ModelType)
+
+SENSOR_SORTS = {
+    "id": Sensor.id,
+    "name": Sensor.name,
+    "KKS": Sensor.KKS,
+}
+
+
+class SensorRow(NamedTuple):
+    id: int
+    name: str
+    KKS: str
+    model_id: int
+    model_type_name: str | None
+    specification: dict | None
+    accidents: list[str]
 
 
 async def get_sensor_for_id(session: AsyncSession, sensor_id: int) -> Sensor:
-    query = select(Sensor).where(sensor_id == Sensor.id)
+    query = select(Sensor).options(*SENSOR_DETAIL).where(sensor_id == Sensor.id)
     result = await session.execute(query)
     sensor: Sensor = result.scalar_one_or_none()
     return sensor
@@ -20,15 +41,42 @@ async def create_sensor(session: AsyncSession, KKS: str, name: str, model_id: in
 
 
 async def get_sensors(session: AsyncSession) -> Sequence[Sensor]:
-    query = select(Sensor)
+    query = select(Sensor).options(*SENSOR_LIST)
     result = await session.execute(query)
     sensors = result.scalars().all()
     return sensors
 
+# Страница + оценка числа строк + ошибки моделей страницы
+@query_budget(3)
+async def paginate_sensors(session: AsyncSession, page: PageParams, q: str | None = None,
+                           model_id: int | None = None) -> Page:
+    query = (
+        select(Sensor.id, Sensor.name, Sensor.KKS, Sensor.model_id, ModelType.name, Model.specification)
+        .join(Model, Model.id == Sensor.model_id)
+        .outerjoin(ModelType, ModelType.id == Model.model_type_id)
+    )
+    if q:
+        query = query.where(or_(Sensor.name.startswith(q, autoescape=True),
+                                Sensor.KKS.startswith(q, autoescape=True)))
+    if model_id is not None:
+        query = query.where(model_id == Sensor.model_id)
+    filtered = bool(q) or model_id is not None
+    sensors_page = await paginate(session, query, SENSOR_SORTS, Sensor.id, page,
+                                  estimate_table=None if filtered else Sensor.__tablename__, entity=False)
+    accidents = await get_accident_names_for_models(session, [row[3] for row in sensors_page.items])
+    items = [
+        SensorRow(sensor_id, name, KKS, sensor_model_id, model_type_name, specification,
+                  accidents.get(sensor_model_id, []))
+        for sensor_id, name, KKS, sensor_model_id, model_type_name, specification, *_ in sensors_page.items
+    ]
+    return sensors_page._replace(items=items)
+
+
 async def update_sensor(sensor: Sensor, model_id: int, name: str, KKS: str, session: AsyncSession) -> Sensor:
     sensor.KKS = KKS
     sensor.name = name
     sensor.model_id = model_id
     session.add(sensor)
     await session.commit()
+    invalidate_all_scenarios()
     return sensor
\ No newline at end of file
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Table, JSON, Enum as SQLAEnum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Table, JSON, Enum as SQLAEnum, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from src.database import Base
@@ -42,20 +42,20 @@ class Model(Base):
     param_mapping_names: Mapped[dict] = mapped_column(JSON, nullable=True)
 
     # Связь с Sensor (один ко многим)
-    sensors = relationship("Sensor", back_populates="model")
+    sensors = relationship("Sensor", back_populates="model", lazy="raise")
 
     # Связь с SensorType (sensor_type_id, sensor_type)
     model_type_id: Mapped[int] = mapped_column(ForeignKey('model_type.id'))
     model_type = relationship("ModelType",
                               back_populates="models",
                               foreign_keys='Model.model_type_id',
-                              lazy='selectin')
+                              lazy='raise')
 
     # Связь many-to-many через промежуточную таблицу
     accidents = relationship("Accident",
                              secondary=model_accident_association,
                              back_populates="models",
-                             lazy="subquery")
+                             lazy="raise")
 
     def __str__(self):
         return f"ID: {self.id} | Имя: {self.model_type.name}"
@@ -66,7 +66,7 @@ class ModelType(Base):
 
     name = Column(String(255), doc="Тип датчика")
     #  Обратная совместимость
-    models = relationship("Model", back_populates="model_type", lazy="selectin")
+    models = relationship("Model", back_populates="model_type", lazy="raise")
 
 
 class Accident(Base):
@@ -79,10 +79,10 @@ class Accident(Base):
 
     # Связь many-to-many(промежуточная таблица)
     models = relationship("Model", secondary=model_accident_association, back_populates="accidents",
-                          lazy="subquery")
+                          lazy="raise")
 
     scenarios = relationship("Scenario", secondary=scenario_accident_association, back_populates="accidents",
-                             lazy="subquery")
+                             lazy="raise")
 
 
 class LocationStatus(Enum):
@@ -96,16 +96,16 @@ class Location(Base):
 
     status: Mapped[LocationStatus] = mapped_column(SQLAEnum(LocationStatus), default=LocationStatus.INACTIVE,
                                                     nullable=False, doc="Статус локации")
-    name: Mapped[str] = mapped_column(String(255), doc="Название локации")
+    name: Mapped[str] = mapped_column(String(255), index=True, doc="Название локации")
     prefab: Mapped[str] = mapped_column(String(300), doc="Путь до префаба")
 
     # Связь many-to-many через промежуточную таблицу с Sensor
     sensors = relationship("Sensor",
                            secondary="sensor_location_association",
-                           back_populates="locations",lazy='selectin')
+                           back_populates="locations",lazy='raise')
 
     # Обратная связь с Scenario
-    scenarios = relationship("Scenario", back_populates="location", lazy="selectin")
+    scenarios = relationship("Scenario", back_populates="location", lazy="raise")
 
     def __str__(self):
         return f"ID:{self.id} | {self.name}"
@@ -113,6 +113,9 @@ class Location(Base):
 
 class ModelValue(Base):
     __tablename__ = "model_value"
+    __table_args__ = (
+        UniqueConstraint("model_type", "field", name="uq_model_value_model_type_field"),
+    )
 
     model_type = Column(String(255), doc="Тип датчика")
     field = Column(String(128), doc="Поле датчика")
@@ -127,20 +130,21 @@ class ModelValue(Base):
 class Sensor(Base):
     __tablename__ = "sensor"
 
-    KKS: Mapped[str] = mapped_column(String(64), nullable=False, doc="Код ККС")
-    name: Mapped[str] = mapped_column(String(255), doc="Название датчика")
+    KKS: Mapped[str] = mapped_column(String(64), nullable=False, index=True, doc="Код ККС")
+    name: Mapped[str] = mapped_column(String(255), index=True, doc="Название датчика")
 
     # Связь с Model (один ко многим)
     model_id: Mapped[int] = mapped_column(ForeignKey("model.id"), nullable=False)
     model = relationship("Model", back_populates="sensors",
                          foreign_keys='Sensor.model_id',
-                         lazy='selectin')
+                         lazy='raise')
 
     # Связь с Location (многие ко многим через промежуточную таблицу)
-    locations = relationship("Location", secondary="sensor_location_association", back_populates="sensors")
+    locations = relationship("Location", secondary="sensor_location_association", back_populates="sensors",
+                             lazy="raise")
 
     # Связь с Scenario (многие к одному)
-    scenarios = relationship("Scenario", back_populates="sensor")
+    scenarios = relationship("Scenario", back_populates="sensor", lazy="raise")
 
     def __str__(self):
         return f"ID: {self.id} | {self.name} | {self.model_id}"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
@@ -8,11 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.base_config import staff_user, administrator_user
 from src.auth.models import User
 from src.database import get_async_session
+from src.pagination import PageParams
+from src.query_budget import query_budget
 from src.pages.router import templates
 from src.pages.utils import (user_menu,
                              )
 from src.sensor.crud import get_sensor_for_id as get_sensor_for_id_func, create_sensor as create_sensor_func, \
-    get_sensors, update_sensor
+    paginate_sensors, update_sensor
 from src.model.crud import get_models
 
 router = APIRouter(
@@ -120,16 +123,21 @@ async def post_create_sensor(request: Request, selected_model: int = Form(None),
 
 
 @router.get("/", response_class=HTMLResponse)
-async def get_sensor_page(request: Request, user: User = Depends(staff_user),
+@query_budget(3)
+async def get_sensor_page(request: Request, q: Optional[str] = None, model_id: Optional[int] = None,
+                          page: PageParams = Depends(), user: User = Depends(staff_user),
                           session: AsyncSession = Depends(get_async_session)):
     try:
-        sensors = await get_sensors(session=session)
+        sensors_page = await paginate_sensors(session=session, page=page, q=q, model_id=model_id)
         return templates.TemplateResponse(
             "/location/sensors.html",
             {
                 'request': request,
                 'user': user,
-                "sensors": sensors,
+                "sensors": sensors_page.items,
+                "page": sensors_page,
+                "params": page,
+                "q": q,
                 'title': "ISPU - Прибор КИП",
                 'menu': user_menu,
             }
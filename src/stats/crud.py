@@ -0,0 +1,192 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple, Sequence
+
+from sqlalchemy import select, func, case
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import Admission, AdmissionStatus, User, Scenario
+from src.database import upsert
+from src.stats.models import UserTrainingStats, ScenarioTrainingStats, DivisionTrainingStats
+
+LEADERBOARD_SIZE = 50
+
+
+class ResultContribution(NamedTuple):
+    completed: int = 0
+    rated: int = 0
+    rating: Decimal = Decimal(0)
+    timed: int = 0
+    seconds: int = 0
+    completed_at: datetime | None = None
+
+
+NO_CONTRIBUTION = ResultContribution()
+
+
+def _is_completed(status) -> bool:
+    # Статус приходит как enum (страницы), так и строкой с именем или значением (API)
+    if isinstance(status, str):
+        return status in (AdmissionStatus.COMPLETED.name, AdmissionStatus.COMPLETED.value)
+    return status == AdmissionStatus.COMPLETED
+
+
+def result_contribution(admission: Admission) -> ResultContribution:
+    """Вклад одной задачи в итоги. Снимается до и после изменения результата."""
+    if not _is_completed(admission.status):
+        return NO_CONTRIBUTION
+    rating = Admission.quantize_rating(admission.rating)
+    seconds = None
+    if admission.is_ready is not None and admission.assigned_at is not None:
+        seconds = int((admission.is_ready - admission.assigned_at).total_seconds())
+        if seconds < 0:
+            seconds = None
+    return ResultContribution(
+        completed=1,
+        rated=int(rating is not None),
+        rating=rating or Decimal(0),
+        timed=int(seconds is not None),
+        seconds=seconds or 0,
+        completed_at=admission.is_ready,
+    )
+
+
+def _stats_contribution(stats: UserTrainingStats) -> ResultContribution:
+    """Все итоги пользователя как один вклад: так они переносятся между подразделениями."""
+    return ResultContribution(
+        completed=stats.completed_count,
+        rated=stats.rated_count,
+        rating=stats.rating_sum,
+        timed=stats.timed_count,
+        seconds=stats.completion_seconds,
+        completed_at=stats.last_completed_at,
+    )
+
+
+def _upsert_stats(table, key: str, key_value, before: ResultContribution, after: ResultContribution,
+                  users: int | None = None):
+    rated = after.rated - before.rated
+    rating = after.rating - before.rating
+    values = {
+        key: key_value,
+        "completed_count": after.completed - before.completed,
+        "rated_count": rated,
+        "rating_sum": rating,
+        "average_rating": rating / rated if rated > 0 else None,
+        "timed_count": after.timed - before.timed,
+        "completion_seconds": after.seconds - before.seconds,
+        "last_completed_at": after.completed_at,
+    }
+    if users is not None:
+        values["users_count"] = users
+
+    def update(new):
+        rated_count = table.c.rated_count + new.rated_count
+        # average_rating первым: и MySQL, и SQLite вычисляют его по старым суммам строки
+        columns = [
+            ("average_rating", case((rated_count > 0, (table.c.rating_sum + new.rating_sum) / rated_count),
+                                    else_=None)),
+            ("completed_count", table.c.completed_count + new.completed_count),
+            ("rated_count", rated_count),
+            ("rating_sum", table.c.rating_sum + new.rating_sum),
+            ("timed_count", table.c.timed_count + new.timed_count),
+            ("completion_seconds", table.c.completion_seconds + new.completion_seconds),
+            # Более поздняя из дат, NULL с любой стороны не затирает другую
+            ("last_completed_at", case((new.last_completed_at > table.c.last_completed_at, new.last_completed_at),
+                                       else_=func.coalesce(table.c.last_completed_at, new.last_completed_at))),
+        ]
+        if users is not None:
+            columns.append(("users_count", table.c.users_count + new.users_count))
+        return columns
+
+    return upsert(table, [key], update, values)
+
+
+async def record_result_change(session: AsyncSession, user_id: int, scenario_id: int,
+                               before: ResultContribution, after: ResultContribution) -> None:
+    # Выполняется в транзакции изменения задачи, коммит делает вызывающий код
+    if before == after:
+        return
+    # Строка пользователя блокируется: параллельные первые результаты одного пользователя
+    # иначе оба не нашли бы строку итогов и посчитали бы его в подразделении дважды
+    query = (
+        select(User.division, UserTrainingStats.id)
+        .outerjoin(UserTrainingStats, User.id == UserTrainingStats.user_id)
+        .where(user_id == User.id)
+        .with_for_update(of=User)
+    )
+    owner = (await session.execute(query)).one()
+    await session.execute(_upsert_stats(UserTrainingStats.__table__, "user_id", user_id, before, after))
+    await session.execute(_upsert_stats(ScenarioTrainingStats.__table__, "scenario_id", scenario_id, before, after))
+    await session.execute(_upsert_stats(DivisionTrainingStats.__table__, "division", owner.division, before, after,
+                                        users=int(owner.id is None)))
+
+
+async def move_user_division(session: AsyncSession, user_id: int, division: str) -> None:
+    """
+    Переносит итоги пользователя в другое подразделение. Вызывается до изменения User.division,
+    в той же транзакции; коммит делает вызывающий код.
+    """
+    query = (
+        select(User.division, UserTrainingStats)
+        .outerjoin(UserTrainingStats, User.id == UserTrainingStats.user_id)
+        .where(user_id == User.id)
+        .with_for_update(of=User)
+    )
+    owner = (await session.execute(query)).one_or_none()
+    if owner is None or owner.UserTrainingStats is None or owner.division == division:
+        return
+    totals = _stats_contribution(owner.UserTrainingStats)
+    # Дата последнего завершения у прежнего подразделения остается: по суммам ее не пересчитать
+    await session.execute(_upsert_stats(DivisionTrainingStats.__table__, "division", owner.division,
+                                        totals, NO_CONTRIBUTION, users=-1))
+    await session.execute(_upsert_stats(DivisionTrainingStats.__table__, "division", division,
+                                        NO_CONTRIBUTION, totals, users=1))
+
+
+async def get_leaderboard(session: AsyncSession, limit: int = LEADERBOARD_SIZE) -> Sequence[Row]:
+    query = (
+        select(
+            User.id, User.first_name, User.last_name, User.patronymic, User.division,
+            UserTrainingStats.average_rating,
+            UserTrainingStats.completed_count,
+            UserTrainingStats.completion_seconds,
+            UserTrainingStats.timed_count,
+            UserTrainingStats.last_completed_at,
+        )
+        .join(User, User.id == UserTrainingStats.user_id)
+        .where(UserTrainingStats.average_rating.is_not(None))
+        .order_by(UserTrainingStats.average_rating.desc(), UserTrainingStats.completed_count.desc())
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def get_division_report(session: AsyncSession) -> Sequence[DivisionTrainingStats]:
+    # Одна готовая строка на подразделение; опустевшие после переноса пользователей не показываются
+    query = (
+        select(DivisionTrainingStats)
+        .where(DivisionTrainingStats.users_count > 0)
+        .order_by(DivisionTrainingStats.division)
+    )
+    result = await session.execute(query)
+    return result.scalars().all()
+
+
+async def get_scenario_report(session: AsyncSession) -> Sequence[Row]:
+    query = (
+        select(
+            Scenario.id, Scenario.name,
+            ScenarioTrainingStats.average_rating,
+            ScenarioTrainingStats.completed_count,
+            ScenarioTrainingStats.completion_seconds,
+            ScenarioTrainingStats.timed_count,
+            ScenarioTrainingStats.last_completed_at,
+        )
+        .join(Scenario, Scenario.id == ScenarioTrainingStats.scenario_id)
+        .order_by(Scenario.id)
+    )
+    result = await session.execute(query)
+    return result.all()
@@ -0,0 +1,64 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Integer, BigInteger, Numeric, DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class TrainingStatsMixin:
+    """
+    Накопленные итоги по завершенным задачам.
+
+    Строки не пересчитываются из admission, а меняются на разницу "было/стало"
+    при каждом изменении результата (см. src.stats.crud.record_result_change).
+    """
+    completed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0",
+                                                 doc="Завершено задач")
+    rated_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0",
+                                             doc="Оценено задач")
+    rating_sum: Mapped[Decimal] = mapped_column(Numeric(12, 1), nullable=False, default=0, server_default="0",
+                                                doc="Сумма оценок")
+    average_rating: Mapped[Decimal] = mapped_column(Numeric(4, 2), nullable=True, doc="Средняя оценка")
+    timed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0",
+                                             doc="Задач с известным временем выполнения")
+    completion_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0",
+                                                    doc="Суммарное время выполнения, сек")
+    last_completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, doc="Последнее завершение")
+
+    @property
+    def average_completion_seconds(self) -> float | None:
+        if not self.timed_count:
+            return None
+        return self.completion_seconds / self.timed_count
+
+
+class UserTrainingStats(TrainingStatsMixin, Base):
+    __tablename__ = "user_training_stats"
+    __table_args__ = (
+        # Таблица лидеров читается по индексу, без сортировки всех строк
+        Index("ix_user_training_stats_average_rating", "average_rating", "completed_count"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), nullable=False, unique=True)
+
+
+class ScenarioTrainingStats(TrainingStatsMixin, Base):
+    __tablename__ = "scenario_training_stats"
+
+    scenario_id: Mapped[int] = mapped_column(ForeignKey("scenario.id", ondelete="CASCADE"), nullable=False,
+                                             unique=True)
+
+
+class DivisionTrainingStats(TrainingStatsMixin, Base):
+    """
+    Итоги подразделения: сумма итогов его пользователей.
+
+    При смене подразделения пользователя его итоги переносятся (см. src.stats.crud.move_user_division).
+    """
+    __tablename__ = "division_training_stats"
+
+    division: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, doc="Подразделение")
+    users_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0",
+                                             doc="Пользователей со строкой итогов")
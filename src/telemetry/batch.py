@@ -0,0 +1,92 @@
+"""
+Разбор пачки телеметрии от VR клиента.
+
+Тело запроса - JSON массив событий, по желанию сжатый (Content-Encoding: gzip или deflate):
+    [{"t": 12.5, "kind": "action", "sensor_id": 3, "value": 1.0, "data": {...}}, ...]
+t - секунды от начала сессии, kind - тип события; sensor_id, value и data необязательны.
+"""
+import math
+import zlib
+from datetime import datetime
+
+import orjson
+
+KIND_MAX_LENGTH = 32
+# Диапазоны колонок telemetry_event: sensor_id - INT, client_time и value - FLOAT (4 байта) в MySQL
+SENSOR_ID_MIN, SENSOR_ID_MAX = -2 ** 31, 2 ** 31 - 1
+FLOAT_MAX = 3.4e38
+# Предел распакованного тела, чтобы маленькая сжатая пачка не развернулась в гигабайты
+MAX_DECODED_BYTES = 32 * 1024 * 1024
+
+_WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def decompress(body: bytes, encoding: str | None) -> bytes:
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding not in _WBITS:
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+    decompressor = zlib.decompressobj(_WBITS[encoding])
+    try:
+        data = decompressor.decompress(body, MAX_DECODED_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Invalid {encoding} body: {e}")
+    if decompressor.unconsumed_tail:
+        raise ValueError("Decoded batch is too large")
+    return data
+
+
+def parse_float(value) -> float:
+    if isinstance(value, bool):
+        raise ValueError("bool")
+    value = float(value)
+    if not math.isfinite(value) or abs(value) > FLOAT_MAX:
+        raise ValueError("float range")
+    return value
+
+
+def parse_sensor_id(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        raise ValueError("sensor_id")
+    value = int(value)
+    if not SENSOR_ID_MIN <= value <= SENSOR_ID_MAX:
+        raise ValueError("sensor_id range")
+    return value
+
+
+def decode_batch(body: bytes, encoding: str | None, admission_id: int, max_events: int) -> list[dict]:
+    """Возвращает строки для вставки в telemetry_event. Ошибка формата - ValueError, пачка не принимается целиком."""
+    try:
+        events = orjson.loads(decompress(body, encoding))
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(events, list):
+        raise ValueError("Batch must be a JSON array")
+    if len(events) > max_events:
+        raise ValueError(f"Batch is larger than {max_events} events")
+
+    received_at = datetime.utcnow()
+    rows = []
+    for index, event in enumerate(events):
+        try:
+            kind = event["kind"]
+            if not isinstance(kind, str) or not kind or len(kind) > KIND_MAX_LENGTH:
+                raise ValueError("kind")
+            sensor_id = event.get("sensor_id")
+            value = event.get("value")
+            rows.append({
+                "admission_id": admission_id,
+                "client_time": parse_float(event["t"]),
+                "kind": kind,
+                "sensor_id": parse_sensor_id(sensor_id) if sensor_id is not None else None,
+                "value": parse_float(value) if value is not None else None,
+                "data": event.get("data"),
+                "received_at": received_at,
+            })
+        except (KeyError, TypeError, ValueError, AttributeError, OverflowError):
+            raise ValueError(f"Invalid event at index {index}")
+    return rows
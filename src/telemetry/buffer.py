@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, DBAPIError, StatementError
+
+from src.config import TELEMETRY_FLUSH_SIZE, TELEMETRY_FLUSH_INTERVAL, TELEMETRY_MAX_BUFFER
+from src.database import async_session_maker
+from src.telemetry.models import TelemetryEvent
+
+
+def is_data_error(error: Exception) -> bool:
+    """
+    Ошибка из-за самих строк (значение вне диапазона, нарушение ограничения), а не из-за БД.
+    Такая пачка не запишется и при повторе: ее нужно разделить и отбросить плохие строки.
+    """
+    if isinstance(error, (DataError, IntegrityError, OverflowError, ValueError, TypeError)):
+        return True
+    # Ошибка Python при подготовке параметров, обернутая SQLAlchemy (например, int вне диапазона драйвера)
+    return isinstance(error, StatementError) and not isinstance(error, DBAPIError)
+
+
+class TelemetryBufferFull(Exception):
+    """В буфере нет места для пачки, ее нужно отправить повторно позже."""
+
+
+class TelemetryBuffer:
+    """
+    Буфер событий телеметрии в памяти.
+
+    Запрос только кладет строки в буфер и сразу получает ответ. Фоновая задача раз в
+    flush_interval (или как только набралось flush_size событий) пишет их в БД одним
+    многострочным INSERT на пачку, занимая одно соединение из пула на время записи.
+    Если БД не успевает или недоступна, события остаются в буфере, а когда он заполнен,
+    новые пачки отклоняются (TelemetryBufferFull) - клиент хранит их у себя и досылает позже.
+    Пачка, которую БД отвергла из-за данных, делится пополам до отдельных строк; строки,
+    которые не записываются и поодиночке, отбрасываются (dropped), чтобы не держать очередь.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, max_events: int):
+        self.flush_size = max(flush_size, 1)
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self._events: list[dict] = []
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.dropped = 0
+        self.flush_total = 0.0
+        self.flush_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, rows: list[dict]) -> None:
+        if len(self._events) + len(rows) > self.max_events:
+            self.rejected += len(rows)
+            raise TelemetryBufferFull()
+        self._events.extend(rows)
+        self.accepted += len(rows)
+        if len(self._events) >= self.flush_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        # При остановке сервера дописываем все, что успели принять
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = 0
+        async with self._flush_lock:
+            while self._events:
+                batch = self._events[:self.flush_size]
+                del self._events[:len(batch)]
+                start = time.perf_counter()
+                # Стек частей пачки: при ошибке данных часть заменяется двумя половинами
+                pending = [batch]
+                while pending:
+                    chunk = pending.pop()
+                    try:
+                        async with async_session_maker() as session:
+                            await session.execute(insert(TelemetryEvent.__table__), chunk)
+                            await session.commit()
+                    except Exception as e:
+                        self.flush_errors += 1
+                        if not is_data_error(e):
+                            print(f"Ошибка записи телеметрии: {e}")
+                            # Незаписанные строки возвращаются в начало буфера до следующей попытки
+                            self._events[:0] = chunk + [row for part in reversed(pending) for row in part]
+                            return written
+                        if len(chunk) == 1:
+                            print(f"Событие телеметрии отброшено: {e}")
+                            self.dropped += 1
+                            continue
+                        middle = len(chunk) // 2
+                        pending.append(chunk[middle:])
+                        pending.append(chunk[:middle])
+                        continue
+                    self.flushed += len(chunk)
+                    written += len(chunk)
+                elapsed = time.perf_counter() - start
+                self.flushes += 1
+                self.flush_total += elapsed
+                self.flush_max = max(self.flush_max, elapsed)
+        return written
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._events),
+            "max_events": self.max_events,
+            "flush_size": self.flush_size,
+            "flush_interval": self.flush_interval,
+            "running": self._task is not None and not self._task.done(),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "dropped": self.dropped,
+            "flush_avg_ms": self.flush_total / self.flushes * 1000 if self.flushes else 0.0,
+            "flush_max_ms": self.flush_max * 1000,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+telemetry_buffer = TelemetryBuffer(
+    flush_size=TELEMETRY_FLUSH_SIZE,
+    flush_interval=TELEMETRY_FLUSH_INTERVAL,
+    max_events=TELEMETRY_MAX_BUFFER,
+)
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, String, Float, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class TelemetryEvent(Base):
+    """
+    Событие VR сессии: действие обучаемого или показание имитируемого датчика.
+
+    Таблица только дописывается пачками (см. src.telemetry.buffer). Внешнего ключа на admission
+    нет намеренно: задача проверяется при приеме пачки, а вставка не тратит время на проверку
+    каждой строки и не падает целиком, если задачу удалили, пока события ждали записи.
+    """
+    __tablename__ = "telemetry_event"
+
+    # В SQLite автоинкремент есть только у INTEGER PRIMARY KEY (он и так 64-битный)
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    admission_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    client_time: Mapped[float] = mapped_column(Float, nullable=False, doc="Время события на клиенте, сек от начала")
+    kind: Mapped[str] = mapped_column(String(32), nullable=False, doc="Тип события")
+    sensor_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    value: Mapped[float] = mapped_column(Float, nullable=True)
+    data: Mapped[dict] = mapped_column(JSON, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
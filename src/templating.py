@@ -0,0 +1,51 @@
+"""
+Загрузка шаблонов Jinja для страниц.
+
+Из исходников шаблон компилируется при первом рендере. В собранном exe (PyInstaller) шаблоны
+уже скомпилированы в байткод при сборке: .spec вызывает compile_templates и кладет результат
+в src/compiled_templates, поэтому станция после запуска не тратит время на компиляцию страниц.
+Модуль зависит только от jinja2, чтобы его можно было импортировать из .spec.
+"""
+import os
+import py_compile
+import shutil
+import sys
+
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, ModuleLoader
+
+COMPILED_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "compiled_templates")
+
+# Как в Jinja2Templates starlette: от autoescape зависит скомпилированный код
+TEMPLATE_ENV_OPTIONS = {"autoescape": True}
+
+
+class PrecompiledLoader(ModuleLoader):
+    # Страницы передают имена и со слэшем в начале ("/auth/loginUser.html"), а при компиляции
+    # имена берутся из каталога без него
+    @staticmethod
+    def get_template_key(name: str) -> str:
+        return ModuleLoader.get_template_key(name.lstrip("/"))
+
+
+def create_template_env(directory: str) -> Environment:
+    loader = FileSystemLoader(directory)
+    if getattr(sys, "frozen", False) and os.path.isdir(COMPILED_TEMPLATES_DIR):
+        # Шаблон, которого нет среди скомпилированных, читается из исходника
+        loader = ChoiceLoader([PrecompiledLoader(COMPILED_TEMPLATES_DIR), loader])
+    return Environment(loader=loader, **TEMPLATE_ENV_OPTIONS)
+
+
+def compile_templates(source_dir: str, target_dir: str) -> int:
+    """Компилирует все шаблоны source_dir в .pyc модули для PrecompiledLoader. Возвращает их число."""
+    shutil.rmtree(target_dir, ignore_errors=True)
+    os.makedirs(target_dir)
+    env = Environment(loader=FileSystemLoader(source_dir), **TEMPLATE_ENV_OPTIONS)
+    env.compile_templates(target_dir, zip=None, ignore_errors=False)
+    # Рядом с модулем только .pyc: импорт не перечитывает и не компилирует исходник
+    compiled = 0
+    for name in os.listdir(target_dir):
+        path = os.path.join(target_dir, name)
+        py_compile.compile(path, cfile=path + "c", doraise=True)
+        os.remove(path)
+        compiled += 1
+    return compiled
@@ -1,8 +1,17 @@
-from sqlalchemy import select, Sequence
+from sqlalchemy import select, Sequence, exists, Row, or_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import User, Admission
+from src.pagination import Page, PageParams, paginate
+from src.query_budget import query_budget
+
+USER_SORTS = {
+    "id": User.id,
+    "last_name": User.last_name,
+    "registered_at": User.registered_at,
+    "division": User.division,
+}
 
 
 async def get_user_for_id(user_id: int, session: AsyncSession) -> User:
@@ -17,14 +26,39 @@ async def get_user_for_id(user_id: int, session: AsyncSession) -> User:
         raise Exception(f"Ошибка при получении пользователя {e}")
 
 
-async def get_users_without_scenario(scenario_id: int, session: AsyncSession) -> Sequence[User]:
-    subquery = select(Admission.user_id).where(scenario_id == Admission.scenario_id).subquery()
-    result = await session.execute(select(User).where(User.id.not_in(select(subquery))))
-    users_without_scenario = result.scalars().all()
-    return users_without_scenario
+USERS_PAGE_SIZE = 100
+
 
-async def get_users(session: AsyncSession) -> Sequence[User]:
-    query = select(User).where(False == User.is_superuser, False == User.is_staff)
+async def get_users_without_scenario(scenario_id: int, session: AsyncSession, after_id: int | None = None,
+                                     limit: int = USERS_PAGE_SIZE) -> Sequence[Row]:
+    # NOT EXISTS по индексу admission(scenario_id, user_id), только нужные странице колонки
+    has_scenario = exists().where(scenario_id == Admission.scenario_id, Admission.user_id == User.id)
+    query = (
+        select(User.id, User.username, User.first_name, User.last_name, User.patronymic, User.registered_at,
+               User.division)
+        .where(~has_scenario)
+        .order_by(User.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        query = query.where(User.id > after_id)
     result = await session.execute(query)
-    users = result.scalars().all()
-    return users
\ No newline at end of file
+    users_without_scenario = result.all()
+    return users_without_scenario
+
+# Страница + оценка числа строк
+@query_budget(2)
+async def paginate_users(session: AsyncSession, page: PageParams, q: str | None = None,
+                         division: str | None = None) -> Page:
+    query = (
+        select(User.id, User.first_name, User.last_name, User.patronymic, User.registered_at, User.division)
+        .where(False == User.is_superuser, False == User.is_staff)
+    )
+    if q:
+        query = query.where(or_(User.last_name.startswith(q, autoescape=True),
+                                User.username.startswith(q, autoescape=True)))
+    if division:
+        query = query.where(division == User.division)
+    filtered = bool(q or division)
+    return await paginate(session, query, USER_SORTS, User.id, page,
+                          estimate_table=None if filtered else User.__tablename__, entity=False)
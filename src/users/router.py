@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import APIRouter, HTTPException
 from fastapi import Request, Form, Depends
@@ -8,11 +9,12 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.base_config import get_jwt_strategy, current_user
-from src.auth.models import User, Admission
+from src.auth.cache import invalidate_user
+from src.auth.models import User
+from src.pagination import PageParams
 from src.database import get_async_session
 from src.admission.crud import (
-    get_admissions_by_user,
-    get_last_admission_task, get_admissions
+    get_admissions_with_statistics, get_admissions
 )
 from src.pages.router import templates
 from src.pages.utils import (authenticate,
@@ -21,7 +23,9 @@ from src.pages.utils import (authenticate,
                              create,
                              logout as logout_func, )
 from src.auth.base_config import staff_user
-from src.users.crud import get_user_for_id, get_users
+from src.users.crud import get_user_for_id, paginate_users
+from src.stats.crud import (get_leaderboard, get_division_report, get_scenario_report, move_user_division,
+                            LEADERBOARD_SIZE)
 
 router = APIRouter(
     prefix='/pages/users213123123',
@@ -61,6 +65,11 @@ async def post_login_admin(request: Request, email: str = Form(...), password: s
 
     except HTTPException as e:
         print(e.detail)
+        if e.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+            return templates.TemplateResponse("/auth/loginAdmin.html", {
+                'request': request,
+                'error': e.detail
+            }, status_code=e.status_code)
         return templates.TemplateResponse("/auth/loginAdmin.html", {
             'request': request,
             'error': "Ошибка при авторизации!"
@@ -112,6 +121,17 @@ async def post_login_user(request: Request, username: str = Form(...), password:
         response.set_cookie(key="user-cookie", value=token, httponly=True, path="/")
         return response
 
+    except HTTPException as e:
+        print(e.detail)
+        if e.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+            return templates.TemplateResponse("/auth/loginUser.html", {
+                'request': request,
+                'error': e.detail
+            }, status_code=e.status_code)
+        return templates.TemplateResponse("/auth/loginUser.html", {
+            'request': request,
+            'error': "Такого пользователя не существует."
+        })
     except Exception as e:
         print(e)
         return templates.TemplateResponse("/auth/loginUser.html", {
@@ -169,9 +189,8 @@ async def post_registration(request: Request,
 async def get_home_page(request: Request, user: User = Depends(current_user),
                         session: AsyncSession = Depends(get_async_session)):
     try:
-        admission = await get_admissions_by_user(user_id=user.id, session=session)
-        sum_rating = await Admission.get_average_rating_for_user(user_id=user.id, session=session)
-        last_admission = get_last_admission_task(list_admission_tasks=admission)
+        admission, statistics = await get_admissions_with_statistics(user_id=user.id, session=session)
+        last_admission = next((item for item in admission if item.id == statistics['last_admission_id']), None)
         return templates.TemplateResponse(
             "/profile/home.html",
             {
@@ -181,7 +200,8 @@ async def get_home_page(request: Request, user: User = Depends(current_user),
                 'last_admission': last_admission,
                 'title': "ISPU - Главная страница!",
                 'menu': user_menu,
-                'sum_rating': sum_rating,
+                'sum_rating': statistics['average_rating'],
+                'statistics': statistics,
             }
         )
     except SQLAlchemyError as e:
@@ -207,15 +227,15 @@ async def get_profile_for_id(request: Request, user_id: int, user: User = Depend
                              session: AsyncSession = Depends(get_async_session)):
     try:
         curr_user = await get_user_for_id(user_id, session)
-        admission = await get_admissions_by_user(user_id, session)
-        sum_rating = await Admission.get_average_rating_for_user(user_id=user_id, session=session)
+        admission, statistics = await get_admissions_with_statistics(user_id=user_id, session=session)
         return templates.TemplateResponse(
             "/profile/profile_user_for_admin.html",
             {
                 'request': request,
                 'user': user,
                 "user_for_id": curr_user,
-                "sum_rating": sum_rating,
+                "sum_rating": statistics['average_rating'],
+                "statistics": statistics,
                 "admissions": admission,
                 'title': "ISPU - User Profile!",
                 'menu': user_menu,
@@ -279,6 +299,7 @@ async def put_user(request: Request, user_id: int,
                    patronymic=Form(...), division=Form(...),
                    user: User = Depends(staff_user), session: AsyncSession = Depends(get_async_session)):
     try:
+        await move_user_division(session=session, user_id=user_id, division=division)
         stmt = update(User).where(User.id == user_id).values(first_name=first_name,
                                                              last_name=last_name,
                                                              patronymic=patronymic,
@@ -286,6 +307,7 @@ async def put_user(request: Request, user_id: int,
                                                              username=username)
         await session.execute(stmt)
         await session.commit()
+        invalidate_user(user_id)
         return RedirectResponse(url=request.url_for("get_users_page"),
                                 status_code=HTTPStatus.MOVED_PERMANENTLY)
     except SQLAlchemyError as e:
@@ -309,16 +331,21 @@ async def put_user(request: Request, user_id: int,
 
 
 @router.get("/", response_class=HTMLResponse)
-async def get_users_page(request: Request, user: User = Depends(staff_user),
+async def get_users_page(request: Request, q: Optional[str] = None, division: Optional[str] = None,
+                         page: PageParams = Depends(), user: User = Depends(staff_user),
                          session: AsyncSession = Depends(get_async_session)):
     try:
-        users = await get_users(session=session)
+        users_page = await paginate_users(session=session, page=page, q=q, division=division)
         return templates.TemplateResponse(
             "/staff/user.html",
             {
                 "request": request,
                 'user': user,
-                "users": users,
+                "users": users_page.items,
+                "page": users_page,
+                "params": page,
+                "q": q,
+                "division": division,
                 'title': "ISPU - Пользователи",
                 'menu': user_menu,
             }
@@ -341,6 +368,74 @@ async def get_users_page(request: Request, user: User = Depends(staff_user),
         })
 
 
+@router.get("/leaderboard", response_class=HTMLResponse)
+async def get_leaderboard_page(request: Request, limit: int = LEADERBOARD_SIZE, user: User = Depends(staff_user),
+                               session: AsyncSession = Depends(get_async_session)):
+    try:
+        leaders = await get_leaderboard(session=session, limit=min(max(limit, 1), LEADERBOARD_SIZE))
+        return templates.TemplateResponse(
+            "/staff/stats/leaderboard.html",
+            {
+                "request": request,
+                'user': user,
+                "leaders": leaders,
+                'title': "ISPU - Рейтинг обучаемых",
+                'menu': user_menu,
+            }
+        )
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemy ошибка при открытии рейтинга обучаемых: {e}")
+        return templates.TemplateResponse("profile/index.html", {
+            "request": request,
+            "error": "Ошибка при открытии рейтинга обучаемых.",
+            'user': user,
+            'menu': user_menu
+        })
+    except Exception as e:
+        print(f"Ошибка при открытии рейтинга обучаемых: {e}")
+        return templates.TemplateResponse("profile/index.html", {
+            "request": request,
+            "error": "Ошибка при открытии рейтинга обучаемых.",
+            'user': user,
+            'menu': user_menu
+        })
+
+
+@router.get("/divisions", response_class=HTMLResponse)
+async def get_division_report_page(request: Request, user: User = Depends(staff_user),
+                                   session: AsyncSession = Depends(get_async_session)):
+    try:
+        divisions = await get_division_report(session=session)
+        scenarios = await get_scenario_report(session=session)
+        return templates.TemplateResponse(
+            "/staff/stats/divisions.html",
+            {
+                "request": request,
+                'user': user,
+                "divisions": divisions,
+                "scenarios": scenarios,
+                'title': "ISPU - Отчет по подразделениям",
+                'menu': user_menu,
+            }
+        )
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemy ошибка при открытии отчета по подразделениям: {e}")
+        return templates.TemplateResponse("profile/index.html", {
+            "request": request,
+            "error": "Ошибка при открытии отчета по подразделениям.",
+            'user': user,
+            'menu': user_menu
+        })
+    except Exception as e:
+        print(f"Ошибка при открытии отчета по подразделениям: {e}")
+        return templates.TemplateResponse("profile/index.html", {
+            "request": request,
+            "error": "Ошибка при открытии отчета по подразделениям.",
+            'user': user,
+            'menu': user_menu
+        })
+
+
 @router.get("/tasks", response_class=HTMLResponse)
 async def get_tasks(request: Request, user: User = Depends(current_user),
                     session: AsyncSession = Depends(get_async_session)):
@@ -0,0 +1,91 @@
+"""
+Общие фикстуры тестов.
+
+Тесты идут на встроенной БД (SQLite): схема создается по моделям во временном файле, данные -
+небольшой справочник приборов. Бюджет запросов включен в режиме raise, поэтому лишний запрос
+в crud или маршруте роняет тест. Запуск из корня проекта: python -m pytest
+"""
+import itertools
+import os
+import tempfile
+from datetime import datetime
+
+# Окружение задается до первого импорта src: настройки читаются при импорте src.config
+os.environ["DB_ENGINE"] = "sqlite"
+os.environ["DB_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ispu-tests-"), "ispu.sqlite3")
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+os.environ.setdefault("SECRET_KEY", "tests")
+
+import pytest  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from src.auth.models import Admission, AdmissionStatus, Scenario, User  # noqa: E402
+from src.database import async_session_maker, init_embedded_database  # noqa: E402
+from src.query_budget import budget_violations  # noqa: E402
+from src.sensor.models import Accident, Location, Model, ModelType, Sensor, model_accident_association  # noqa: E402
+
+SENSORS = 12
+_names = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database(anyio_backend):
+    await init_embedded_database()
+    async with async_session_maker() as session:
+        model_type = ModelType(name="Датчик давления")
+        session.add(model_type)
+        await session.flush()
+        models = [Model(model_type_id=model_type.id, specification={"p0": "10"}, param_mapping_names={"p0": "P0"})
+                  for _ in range(3)]
+        session.add_all(models)
+        accident = Accident(name="Обрыв", mechanical_accident=True, change_value={"p0": 0})
+        session.add(accident)
+        await session.flush()
+        await session.execute(insert(model_accident_association),
+                              [{"model_id": model.id, "accident_id": accident.id} for model in models])
+        session.add_all(Sensor(KKS=f"10LAB{index:02d}CP001", name=f"Прибор {index}",
+                               model_id=models[index % len(models)].id)
+                        for index in range(SENSORS))
+        await session.commit()
+
+
+@pytest.fixture
+async def session(database):
+    async with async_session_maker() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clean_budget_violations():
+    budget_violations.clear()
+    yield
+    budget_violations.clear()
+
+
+@pytest.fixture
+def new_admission(session):
+    """Фабрика: новая активная задача нового пользователя по новому сценарию."""
+
+    async def create() -> Admission:
+        index = next(_names)
+        user = User(username=f"trainee{index}", email=f"trainee{index}@test.local", first_name="Test",
+                    last_name=f"trainee{index}", division="test", hashed_password="-")
+        location = Location(name=f"Помещение {index}", prefab="Prefabs/Locations/Test")
+        session.add_all([user, location])
+        await session.flush()
+        sensor_id = await session.scalar(select(Sensor.id).limit(1))
+        scenario = Scenario(name=f"Сценарий {index}", location_id=location.id, sensor_id=sensor_id)
+        session.add(scenario)
+        await session.flush()
+        admission = Admission(user_id=user.id, scenario_id=scenario.id, status=AdmissionStatus.ACTIVE, rating=0,
+                              assigned_at=datetime.utcnow())
+        session.add(admission)
+        await session.commit()
+        return admission
+
+    return create
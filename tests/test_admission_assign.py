@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.admission import crud
+from src.admission.crud import assign_scenarios
+from src.auth.models import Admission, Scenario, User
+from src.query_budget import budget_scope
+from src.sensor.models import Location, Sensor
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_users_and_scenarios(session, prefix: str, users: int, scenarios: int):
+    user_rows = [User(username=f"{prefix}{index}", email=f"{prefix}{index}@test.local", first_name="Test",
+                      last_name=prefix, division="test", hashed_password="-") for index in range(users)]
+    location = Location(name=f"Помещение {prefix}", prefab="Prefabs/Locations/Assign")
+    session.add_all([*user_rows, location])
+    await session.flush()
+    sensor_id = await session.scalar(select(Sensor.id).limit(1))
+    scenario_rows = [Scenario(name=f"{prefix} {index}", location_id=location.id, sensor_id=sensor_id)
+                     for index in range(scenarios)]
+    session.add_all(scenario_rows)
+    await session.commit()
+    return [user.id for user in user_rows], [scenario.id for scenario in scenario_rows]
+
+
+async def count_admissions(session, user_ids: list[int]) -> int:
+    return await session.scalar(select(func.count(Admission.id)).where(Admission.user_id.in_(user_ids)))
+
+
+async def test_one_statement_per_batch(session, monkeypatch):
+    monkeypatch.setattr(crud, "ASSIGN_BATCH_SIZE", 2)
+    user_ids, scenario_ids = await create_users_and_scenarios(session, "assign_batch", users=5, scenarios=3)
+
+    with budget_scope(3, "assign_scenarios", mode="raise") as budget:
+        created = await assign_scenarios(session=session, user_ids=user_ids, scenario_ids=scenario_ids)
+    assert created == 15
+    assert len(budget.statements) == 3
+    assert all(statement.startswith("INSERT INTO admission") for statement in budget.statements)
+    assert await count_admissions(session, user_ids) == 15
+
+
+async def test_existing_pairs_are_skipped_and_ids_returned(session):
+    user_ids, scenario_ids = await create_users_and_scenarios(session, "assign_ids", users=2, scenarios=2)
+    first = await assign_scenarios(session=session, user_ids=user_ids[:1], scenario_ids=scenario_ids,
+                                   return_ids=True)
+    second = await assign_scenarios(session=session, user_ids=user_ids, scenario_ids=scenario_ids,
+                                    return_ids=True)
+    again = await assign_scenarios(session=session, user_ids=user_ids, scenario_ids=scenario_ids,
+                                   return_ids=True)
+
+    assert len(first) == 2 and len(second) == 2 and again == []
+    result = await session.execute(select(Admission.id, Admission.user_id).where(Admission.id.in_(second)))
+    assert {user_id for _, user_id in result} == {user_ids[1]}
+    assert await count_admissions(session, user_ids) == 4
@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from src.api.v1.admission.crud import submit_admission_result
+from src.auth.models import Admission
+from src.stats.models import UserTrainingStats
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("4.75", Decimal("4.8")),
+    ("4.74", Decimal("4.7")),
+    (10, Decimal("10.0")),
+    (" 3 ", Decimal("3.0")),
+    (0, Decimal("0.0")),
+    ("", None),
+    (None, None),
+])
+def test_parse_rating_rounds_to_the_column_scale(value, expected):
+    assert Admission.parse_rating(value) == expected
+
+
+@pytest.mark.parametrize("value", ["NaN", "inf", "-Infinity", "abc", 15, "10.1", -1, True])
+def test_parse_rating_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        Admission.parse_rating(value)
+
+
+async def test_stats_use_the_stored_rating(session, new_admission):
+    admission = await new_admission()
+    await submit_admission_result(session=session, admission_id=admission.id, rating="4.75", status="COMPLETED",
+                                  key="rating-scale")
+    await session.refresh(admission)
+    stats = await session.scalar(select(UserTrainingStats).where(admission.user_id == UserTrainingStats.user_id))
+    assert admission.rating == Decimal("4.8")
+    assert stats.rating_sum == admission.rating
+
+
+async def test_invalid_rating_is_rejected_before_writing(session, new_admission):
+    admission = await new_admission()
+    with pytest.raises(ValueError):
+        await submit_admission_result(session=session, admission_id=admission.id, rating="NaN", status="COMPLETED")
+    await session.refresh(admission)
+    assert admission.rating == 0
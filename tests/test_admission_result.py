@@ -0,0 +1,89 @@
+import asyncio
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from src.api.v1.admission.crud import forget_admission_result, submit_admission_result
+from src.auth.base_config import staff_user
+from src.auth.models import AdmissionStatus, User
+from src.database import async_session_maker
+from src.main import app
+from src.stats.models import UserTrainingStats
+
+pytestmark = pytest.mark.anyio
+
+
+async def user_stats(user_id: int) -> UserTrainingStats:
+    async with async_session_maker() as session:
+        return await session.scalar(select(UserTrainingStats).where(user_id == UserTrainingStats.user_id))
+
+
+async def submit(admission_id: int, rating, status="COMPLETED", **kwargs):
+    async with async_session_maker() as session:
+        return await submit_admission_result(session=session, admission_id=admission_id, rating=rating,
+                                             status=status, **kwargs)
+
+
+async def test_keyless_retry_is_replayed(session, new_admission):
+    admission = await new_admission()
+    first = await submit(admission.id, "4.0")
+    second = await submit(admission.id, "4.0")
+    # Без кэша процесса повтор узнается по ключу, записанному в строке
+    forget_admission_result(admission.id)
+    third = await submit(admission.id, "4.0")
+
+    assert first.applied and not second.applied and not third.applied
+    assert first.key == second.key == third.key
+    stats = await user_stats(admission.user_id)
+    assert stats.completed_count == 1
+    assert stats.rating_sum == Decimal("4.0")
+
+
+async def test_older_sequence_is_superseded(session, new_admission):
+    admission = await new_admission()
+    newer = await submit(admission.id, "5.0", key="attempt-2", sequence=2)
+    older = await submit(admission.id, "3.0", key="attempt-1", sequence=1)
+
+    assert newer.applied and not older.applied
+    assert older.rating == Decimal("5.0")
+    await session.refresh(admission)
+    assert admission.rating == Decimal("5.0")
+    assert (await user_stats(admission.user_id)).rating_sum == Decimal("5.0")
+
+
+async def test_same_result_after_staff_reset_is_written(session, new_admission):
+    admission = await new_admission()
+    assert (await submit(admission.id, "4.0")).applied
+
+    staff = User(id=admission.user_id, username="reset_staff", is_staff=True, is_superuser=True, is_active=True)
+    app.dependency_overrides[staff_user] = lambda: staff
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(f"/pages/admission/update/{admission.id}/",
+                                         data={"rating": "0", "status": AdmissionStatus.ACTIVE.value})
+    finally:
+        app.dependency_overrides.pop(staff_user)
+    assert response.status_code == 301
+    assert (await user_stats(admission.user_id)).completed_count == 0
+
+    again = await submit(admission.id, "4.0")
+    assert again.applied
+    stats = await user_stats(admission.user_id)
+    assert stats.completed_count == 1
+    assert stats.rating_sum == Decimal("4.0")
+
+
+async def test_concurrent_submissions_are_serialized(session, new_admission):
+    admission = await new_admission()
+    ratings = ["1.0", "2.0", "3.0", "4.0", "5.0", "4.5"]
+    outcomes = await asyncio.gather(*(submit(admission.id, rating, key=f"concurrent-{index}")
+                                      for index, rating in enumerate(ratings)))
+
+    assert all(outcome.applied for outcome in outcomes)
+    await session.refresh(admission)
+    stats = await user_stats(admission.user_id)
+    assert stats.completed_count == 1
+    assert stats.rating_sum == admission.rating
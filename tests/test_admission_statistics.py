@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from src.admission.crud import get_admissions_with_statistics
+from src.auth.models import Admission, AdmissionStatus, Scenario, User
+from src.query_budget import budget_scope
+from src.sensor.models import Location, Sensor
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_user(session, username: str) -> User:
+    user = User(username=username, email=f"{username}@test.local", first_name="Test", last_name=username,
+                division="test", hashed_password="-", is_active=True, is_verified=True)
+    session.add(user)
+    await session.flush()
+    return user
+
+
+async def test_admissions_and_statistics_in_one_query(session):
+    user = await create_user(session, "statistics_user")
+    other = await create_user(session, "statistics_other")
+    location = Location(name="Помещение статистики", prefab="Prefabs/Locations/Stats")
+    session.add(location)
+    await session.flush()
+    sensor_id = await session.scalar(select(Sensor.id).limit(1))
+    scenarios = [Scenario(name=f"Статистика {index}", location_id=location.id, sensor_id=sensor_id)
+                 for index in range(4)]
+    session.add_all(scenarios)
+    await session.flush()
+    finished = datetime(2026, 10, 1, 12, 0)
+    admissions = [
+        Admission(user_id=user.id, scenario_id=scenarios[0].id, status=AdmissionStatus.COMPLETED,
+                  rating=Decimal("4.0"), is_ready=finished),
+        Admission(user_id=user.id, scenario_id=scenarios[1].id, status=AdmissionStatus.COMPLETED,
+                  rating=Decimal("5.0"), is_ready=finished + timedelta(days=1)),
+        Admission(user_id=user.id, scenario_id=scenarios[2].id, status=AdmissionStatus.ACTIVE, rating=0),
+        Admission(user_id=other.id, scenario_id=scenarios[3].id, status=AdmissionStatus.COMPLETED,
+                  rating=Decimal("2.0"), is_ready=finished + timedelta(days=2)),
+    ]
+    session.add_all(admissions)
+    await session.commit()
+
+    # Задачи со сценариями и итоги - один запрос, второй - selectin загрузка ошибок сценариев
+    with budget_scope(2, "get_admissions_with_statistics", mode="raise"):
+        loaded, statistics = await get_admissions_with_statistics(user_id=user.id, session=session)
+
+    assert sorted(admission.id for admission in loaded) == sorted(admission.id for admission in admissions[:3])
+    assert statistics["count"] == 3
+    assert statistics["average_rating"] == 3.0
+    assert statistics["last_completed_at"] == finished + timedelta(days=1)
+    assert statistics["last_admission_id"] == admissions[1].id
+    assert statistics["statuses"][AdmissionStatus.COMPLETED] == 2
+    assert statistics["statuses"][AdmissionStatus.ACTIVE] == 1
+    assert statistics["statuses"][AdmissionStatus.INACTIVE] == 0
+
+
+async def test_statistics_without_admissions(session):
+    user = await create_user(session, "statistics_empty")
+    await session.commit()
+    with budget_scope(1, "get_admissions_with_statistics", mode="raise"):
+        loaded, statistics = await get_admissions_with_statistics(user_id=user.id, session=session)
+    assert list(loaded) == []
+    assert statistics["count"] == 0
+    assert statistics["last_admission_id"] is None
+    assert set(statistics["statuses"].values()) == {0}
@@ -0,0 +1,42 @@
+from sqlalchemy import inspect
+
+from src.auth.cache import UserIdentityCache
+from src.auth.models import User
+
+
+def make_user(user_id: int, username: str = "cached") -> User:
+    return User(id=user_id, username=username, email=f"{username}@test.local", first_name="Test",
+                last_name=username, division="test", hashed_password="-", is_staff=False, is_active=True,
+                is_superuser=False, is_verified=True)
+
+
+def test_get_returns_detached_copy():
+    cache = UserIdentityCache(ttl=60, max_size=10)
+    user = make_user(1)
+    cache.set(user)
+    user.username = "changed"
+
+    first, second = cache.get(1), cache.get(1)
+    assert first is not user and first is not second
+    assert first.username == "cached"
+    assert inspect(first).detached
+    first.is_staff = True
+    assert cache.get(1).is_staff is False
+
+
+def test_size_is_capped_least_recently_used_first():
+    cache = UserIdentityCache(ttl=60, max_size=2)
+    cache.set(make_user(1))
+    cache.set(make_user(2))
+    cache.get(1)
+    cache.set(make_user(3))
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_expired_entry_is_dropped():
+    cache = UserIdentityCache(ttl=-1, max_size=2)
+    cache.set(make_user(1))
+    assert cache.get(1) is None
+    assert len(cache) == 0
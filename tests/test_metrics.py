@@ -0,0 +1,40 @@
+import httpx
+import pytest
+from sqlalchemy import select
+
+from src.database import async_session_maker
+from src.main import app
+from src.metrics import route_metrics
+from src.sensor.models import Sensor
+
+pytestmark = pytest.mark.anyio
+
+FAILING_PATH = "/tests/failing-route"
+
+
+async def failing_route():
+    async with async_session_maker() as session:
+        await session.execute(select(Sensor.id))
+    raise RuntimeError("сбой маршрута")
+
+
+@pytest.fixture
+def failing_app():
+    app.add_api_route(FAILING_PATH, failing_route)
+    route_metrics.reset()
+    yield app
+    app.router.routes[:] = [route for route in app.router.routes if getattr(route, "path", None) != FAILING_PATH]
+    route_metrics.reset()
+
+
+async def test_unhandled_exception_is_recorded_as_500(database, failing_app):
+    # ServerErrorMiddleware отдает ответ обработчика и затем пробрасывает исключение дальше
+    transport = httpx.ASGITransport(app=failing_app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(FAILING_PATH)
+    route = route_metrics.snapshot()[f"GET {FAILING_PATH}"]
+    assert route["requests"] == 1
+    assert route["errors"] == 1
+    assert route["queries"]["max"] == 1
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+    assert "X-DB-Pool-Wait" in response.headers
@@ -0,0 +1,65 @@
+import httpx
+import pytest
+from sqlalchemy import select, func
+
+from src.auth.base_config import administrator_user
+from src.auth.models import User
+from src.database import async_session_maker
+from src.main import app
+from src.model.crud import create_model_values_or_update
+from src.query_budget import budget_scope
+from src.sensor.models import ModelType, ModelValue
+
+pytestmark = pytest.mark.anyio
+
+
+async def model_values(name: str) -> dict:
+    async with async_session_maker() as session:
+        result = await session.execute(select(ModelValue.field, ModelValue.value).where(name == ModelValue.model_type))
+        return dict(result.all())
+
+
+async def test_values_and_type_saved_without_lookups(session):
+    with budget_scope(2, "create_model_values_or_update", mode="raise") as budget:
+        counts = await create_model_values_or_update(
+            session=session, name="Импорт", keys=["P", "T"], values=["1", "2"], measurements=["МПа", "°C"],
+            name_eng_params=["Давление", "Температура"])
+    # Пачка параметров и тип модели, без предварительных SELECT
+    assert len(budget.statements) == 2
+    assert counts["saved"] == 2
+
+    await create_model_values_or_update(session=session, name="Импорт", keys=["P"], values=["3"],
+                                        measurements=["МПа"], name_eng_params=["Давление"])
+    assert await model_values("Импорт") == {"P": "3", "T": "2"}
+    assert await session.scalar(select(func.count(ModelType.id)).where("Импорт" == ModelType.name)) == 1
+
+
+async def test_lists_of_different_length_are_rejected(session):
+    with pytest.raises(ValueError):
+        await create_model_values_or_update(session=session, name="Неполный", keys=["P", "T"], values=["1"],
+                                            measurements=["МПа", "°C"], name_eng_params=["Давление", "Температура"])
+    assert await model_values("Неполный") == {}
+
+
+async def test_saved_count_is_shown_after_redirect(database):
+    admin = User(id=1, username="model_admin", first_name="Admin", last_name="Test", is_staff=True,
+                 is_superuser=True, is_active=True)
+    app.dependency_overrides[administrator_user] = lambda: admin
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(app.url_path_for("post_create_model_value"), data={
+                "name": "Страница", "keys": ["P", "T"], "values": ["1", "2"],
+                "slug_name": ["Давление", "Температура"], "measurement": ["МПа", "°C"],
+            })
+            assert response.status_code == 301
+            page = await client.get(response.headers["location"])
+            rejected = await client.post(app.url_path_for("post_create_model_value"), data={
+                "name": "Страница", "keys": ["P", "T"], "values": ["1"],
+                "slug_name": ["Давление", "Температура"], "measurement": ["МПа", "°C"],
+            })
+    finally:
+        app.dependency_overrides.pop(administrator_user)
+    assert "Страница: сохранено параметров 2" in page.text
+    assert rejected.status_code == 200
+    assert "Для каждого параметра нужно указать" in rejected.text
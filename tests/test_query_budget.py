@@ -0,0 +1,79 @@
+import importlib
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+import src.config
+from src.auth.base_config import staff_user
+from src.auth.models import User
+from src.main import app
+from src.pagination import PageParams
+from src.query_budget import QueryBudgetExceeded, budget_scope, budget_violations
+from src.sensor.crud import paginate_sensors
+from src.sensor.models import Sensor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_paginate_sensors_within_budget(session):
+    with budget_scope(3, "paginate_sensors", mode="raise") as budget:
+        page = await paginate_sensors(session=session, page=PageParams(limit=5))
+    assert len(page.items) == 5
+    assert page.next_cursor is not None
+    assert all(row.accidents == ["Обрыв"] for row in page.items)
+    assert len(budget.statements) <= 3
+    assert budget.relationship_loads == {}
+
+
+async def test_paginate_sensors_filtered_within_budget(session):
+    with budget_scope(3, "paginate_sensors", mode="raise"):
+        page = await paginate_sensors(session=session, page=PageParams(), q="10LAB01")
+    assert [row.KKS for row in page.items] == ["10LAB01CP001"]
+
+
+async def test_get_sensor_page_within_budget(database):
+    staff = User(id=1, username="staff", email="staff@test.local", first_name="Staff", last_name="Test",
+                 division="test", is_staff=True, is_superuser=True, is_active=True, is_verified=True)
+    app.dependency_overrides[staff_user] = lambda: staff
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Маршрут перехватывает исключения и показывает страницу ошибки, поэтому превышение
+            # проверяется по внешнему бюджету и по budget_violations
+            with budget_scope(3, "get_sensor_page", mode="raise"):
+                response = await client.get("/pages/sensors12321/", params={"limit": 5})
+    finally:
+        app.dependency_overrides.pop(staff_user)
+    assert response.status_code == 200
+    assert "10LAB00CP001" in response.text
+    assert budget_violations == []
+
+
+async def test_relationship_load_over_budget_is_reported(session):
+    with pytest.raises(QueryBudgetExceeded) as error:
+        with budget_scope(1, "sensors_with_models", mode="raise") as budget:
+            result = await session.execute(select(Sensor).options(selectinload(Sensor.model)))
+            result.scalars().all()
+    assert budget.relationship_loads == {"Sensor.model": 1}
+    assert "Sensor.model x1" in str(error.value)
+    assert budget_violations == [str(error.value)]
+
+
+async def test_over_budget_in_log_mode_does_not_raise(session):
+    with budget_scope(0, "sensors", mode="log") as budget:
+        await session.execute(select(Sensor.id))
+    assert budget.exceeded
+    assert len(budget_violations) == 1
+
+
+@pytest.mark.parametrize(("debug", "expected"), [("true", "log"), ("false", "off")])
+def test_query_budget_mode_default_follows_debug(monkeypatch, debug, expected):
+    monkeypatch.setenv("DEBUG", debug)
+    monkeypatch.delenv("QUERY_BUDGET_MODE")
+    try:
+        assert importlib.reload(src.config).QUERY_BUDGET_MODE == expected
+    finally:
+        monkeypatch.undo()
+        importlib.reload(src.config)
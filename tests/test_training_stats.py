@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from src.auth.models import Admission, AdmissionStatus, User
+from src.database import async_session_maker
+from src.stats.crud import (NO_CONTRIBUTION, get_division_report, move_user_division, record_result_change,
+                            result_contribution)
+from src.stats.models import DivisionTrainingStats, ScenarioTrainingStats, UserTrainingStats
+
+pytestmark = pytest.mark.anyio
+
+
+async def stats_row(model, column, value):
+    async with async_session_maker() as session:
+        return await session.scalar(select(model).where(column == value))
+
+
+async def own_division(session, admission: Admission, division: str) -> None:
+    # У пользователей фабрики общее подразделение, для проверки итогов нужно свое
+    await session.execute(update(User).where(admission.user_id == User.id).values(division=division))
+    await session.commit()
+
+
+async def change_result(admission_id: int, status: AdmissionStatus, rating) -> None:
+    async with async_session_maker() as session:
+        admission = await session.get(Admission, admission_id)
+        before = result_contribution(admission)
+        admission.status = status
+        admission.rating = rating
+        admission.is_ready = admission.is_ready or admission.assigned_at + timedelta(minutes=10)
+        await record_result_change(session=session, user_id=admission.user_id, scenario_id=admission.scenario_id,
+                                   before=before, after=result_contribution(admission))
+        await session.commit()
+
+
+def test_contribution_of_unfinished_and_completed():
+    assigned = datetime(2026, 10, 1, 12, 0)
+    active = Admission(status=AdmissionStatus.ACTIVE, rating=Decimal("4.0"), assigned_at=assigned)
+    assert result_contribution(active) == NO_CONTRIBUTION
+
+    completed = Admission(status=AdmissionStatus.COMPLETED, rating=Decimal("4.25"), assigned_at=assigned,
+                          is_ready=assigned + timedelta(minutes=5))
+    contribution = result_contribution(completed)
+    assert (contribution.completed, contribution.rated, contribution.rating) == (1, 1, Decimal("4.3"))
+    assert (contribution.timed, contribution.seconds) == (1, 300)
+
+    # Завершение раньше назначения (часы клиента) не портит среднее время
+    early = Admission(status="COMPLETED", rating=None, assigned_at=assigned, is_ready=assigned - timedelta(minutes=1))
+    contribution = result_contribution(early)
+    assert (contribution.completed, contribution.rated, contribution.timed) == (1, 0, 0)
+
+
+async def test_rating_change_applies_only_the_difference(session, new_admission):
+    admission = await new_admission()
+    await own_division(session, admission, "delta")
+
+    await change_result(admission.id, AdmissionStatus.COMPLETED, Decimal("4.0"))
+    await change_result(admission.id, AdmissionStatus.COMPLETED, Decimal("5.0"))
+
+    for model, column, value in (
+            (UserTrainingStats, UserTrainingStats.user_id, admission.user_id),
+            (ScenarioTrainingStats, ScenarioTrainingStats.scenario_id, admission.scenario_id),
+            (DivisionTrainingStats, DivisionTrainingStats.division, "delta"),
+    ):
+        stats = await stats_row(model, column, value)
+        assert (stats.completed_count, stats.rated_count) == (1, 1)
+        assert stats.rating_sum == Decimal("5.0")
+        assert stats.average_rating == Decimal("5.00")
+        assert (stats.timed_count, stats.completion_seconds) == (1, 600)
+    # Повторная оценка того же пользователя не считает его в подразделении еще раз
+    assert (await stats_row(DivisionTrainingStats, DivisionTrainingStats.division, "delta")).users_count == 1
+
+
+async def test_reopened_result_is_subtracted(session, new_admission):
+    admission = await new_admission()
+    await own_division(session, admission, "reopen")
+
+    await change_result(admission.id, AdmissionStatus.COMPLETED, Decimal("3.0"))
+    await change_result(admission.id, AdmissionStatus.ACTIVE, Decimal("0"))
+
+    user = await stats_row(UserTrainingStats, UserTrainingStats.user_id, admission.user_id)
+    division = await stats_row(DivisionTrainingStats, DivisionTrainingStats.division, "reopen")
+    for stats in (user, division):
+        assert (stats.completed_count, stats.rated_count, stats.timed_count) == (0, 0, 0)
+        assert stats.rating_sum == 0
+        assert stats.average_rating is None
+    # Строка итогов пользователя остается, поэтому он по-прежнему учтен в подразделении
+    assert division.users_count == 1
+
+
+async def test_user_totals_move_with_division(session, new_admission):
+    first = await new_admission()
+    second = await new_admission()
+    await own_division(session, first, "move-from")
+    await own_division(session, second, "move-from")
+    await change_result(first.id, AdmissionStatus.COMPLETED, Decimal("2.0"))
+    await change_result(second.id, AdmissionStatus.COMPLETED, Decimal("4.0"))
+
+    await move_user_division(session=session, user_id=first.user_id, division="move-to")
+    await own_division(session, first, "move-to")
+
+    source = await stats_row(DivisionTrainingStats, DivisionTrainingStats.division, "move-from")
+    target = await stats_row(DivisionTrainingStats, DivisionTrainingStats.division, "move-to")
+    assert (source.users_count, source.completed_count, source.rating_sum) == (1, 1, Decimal("4.0"))
+    assert source.average_rating == Decimal("4.00")
+    assert (target.users_count, target.completed_count, target.rating_sum) == (1, 1, Decimal("2.0"))
+    assert target.average_completion_seconds == 600
+
+    await move_user_division(session=session, user_id=second.user_id, division="move-to")
+    await own_division(session, second, "move-to")
+
+    report = {row.division: row for row in await get_division_report(session=session)}
+    assert "move-from" not in report
+    assert (report["move-to"].users_count, report["move-to"].completed_count) == (2, 2)
+    assert report["move-to"].average_rating == Decimal("3.00")